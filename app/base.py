@@ -1,33 +1,125 @@
 import os
+import sys
 import uuid
+from array import array
+from collections.abc import Mapping, MutableMapping
 from enum import Enum
+from bisect import bisect_left
 from functools import reduce
-from typing import NamedTuple, List, Set, Dict, Tuple, Optional
-from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import NamedTuple, List, Set, Dict, Tuple, Optional, FrozenSet, Union, Sequence, Iterable
+from dataclasses import dataclass, field, replace
 
 import logging
 
+from app.hexgrid import HexGrid, grid_for
+from app.revenue import RevenueTable, tile_revenue
+
 STOCK_PRESIDENT_CERTIFICATE = 20
 STOCK_CERTIFICATE = 10
 
+# When True, Player.getCertificateCount cross-checks its running total against a full recount.
+DEBUG_CERTIFICATE_COUNT = False
+
+
+class ValidationFailure:
+    """A failed check returned by ``err``.  The message is only formatted when the failure is reported, since
+    most callers (bots, move generators) only need to know that a check failed."""
+    __slots__ = ("error_msg", "params")
+
+    def __init__(self, error_msg: str, params: tuple):
+        self.error_msg = error_msg
+        self.params = params
+
+    def __str__(self) -> str:
+        return self.error_msg.format(*self.params)
+
+    def __repr__(self) -> str:
+        return "ValidationFailure({!r})".format(str(self))
+
 
-def err(validate: bool, error_msg: str, *format_error_msg_params):
+def err(validate: bool, error_msg: str, *format_error_msg_params) -> Optional[ValidationFailure]:
     if not validate:
-        return error_msg.format(*format_error_msg_params)
+        return ValidationFailure(error_msg, format_error_msg_params)
+
+
+class EntityRegistry(list):
+    """A list of game entities (players, companies...) that also indexes them by a key such as their id.
+
+    Behaves exactly like the list it replaces, but ``find`` is a dict lookup.  The index is updated on every
+    mutation: additions are indexed in place, removals rebuild the index (they are rare)."""
+
+    def __init__(self, entities=(), key=attrgetter("id")):
+        super().__init__(entities)
+        self.key = key
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._by_key = {}
+        for entity in self:
+            self._by_key.setdefault(self.key(entity), entity)
+
+    def _index(self, entities) -> None:
+        for entity in entities:
+            self._by_key.setdefault(self.key(entity), entity)
+
+    def find(self, key, default=None):
+        return self._by_key.get(key, default)
+
+    def append(self, entity) -> None:
+        super().append(entity)
+        self._index([entity])
+
+    def insert(self, position: int, entity) -> None:
+        super().insert(position, entity)
+        self._index([entity])
+
+    def extend(self, entities) -> None:
+        entities = list(entities)
+        super().extend(entities)
+        self._index(entities)
+
+    def __iadd__(self, entities):
+        self.extend(entities)
+        return self
+
+    def remove(self, entity) -> None:
+        super().remove(entity)
+        self._reindex()
+
+    def pop(self, position: int = -1):
+        entity = super().pop(position)
+        self._reindex()
+        return entity
+
+    def clear(self) -> None:
+        super().clear()
+        self._by_key = {}
+
+    def __setitem__(self, position, entity) -> None:
+        super().__setitem__(position, entity)
+        self._reindex()
+
+    def __delitem__(self, position) -> None:
+        super().__delitem__(position)
+        self._reindex()
 
 
 class MutableGameState:
     """This is state that needs to be accessed or modified by the minigames.
     We are initially putting all of that into this one object, but this will be refactored once the
-    minigames are ready (and we can distinguish between mutable & non-mutable game state)"""
+    minigames are ready (and we can distinguish between mutable & non-mutable game state)
+
+    ``players``, ``public_companies`` and ``private_companies`` are EntityRegistry lists, so moves can look up
+    players and public companies by id (and private companies by order) in constant time."""
     def __init__(self):
         """
         players: All the players who are playing the game, from "right to left" (ie: in relative order for the stock round)
         """
         self.auction: List[Tuple[str, int]] = None # All bids on current auction; (player_id, amount)
         self.auctioned_private_company: PrivateCompany = None
-        self.sales:List[Dict[Player, List[PublicCompany]]] = [] # Full list of things you sell in each stock round.
-        self.purchases: List[Dict[Player, List[PublicCompany]]] = [] # Full list of things you buy in each stock round.
+        self.sales: TradeLog = TradeLog()  # Everything each player sold, per stock round
+        self.purchases: TradeLog = TradeLog()  # Everything each player bought, per stock round
         self.public_companies: List["PublicCompany"] = None
         self.private_companies: List["PrivateCompany"] = None
         self.stock_round_passed: int = 0  # If every player passes during the stock round, the round is over.
@@ -35,11 +127,65 @@ class MutableGameState:
         self.stock_round_count: int = 0
         self.players: List[Player] = None
         self.priority_deal_player: Player = None
+        self.share_ledger: ShareLedger = None  # Optional players × companies share matrix; see ShareLedger
         # Track which public companies have laid track during the current
         # operating round. Keys are company ids.
         self.track_laid: Set[str] = set()
 
-    pass
+    @staticmethod
+    def _registry(entities, key) -> Optional[EntityRegistry]:
+        if entities is None or isinstance(entities, EntityRegistry):
+            return entities
+        return EntityRegistry(entities, key)
+
+    @property
+    def sales(self) -> "TradeLog":
+        return self._sales
+
+    @sales.setter
+    def sales(self, rounds: List[Dict["Player", List["PublicCompany"]]]) -> None:
+        self._sales = rounds if isinstance(rounds, TradeLog) else TradeLog(rounds)
+
+    @property
+    def purchases(self) -> "TradeLog":
+        return self._purchases
+
+    @purchases.setter
+    def purchases(self, rounds: List[Dict["Player", List["PublicCompany"]]]) -> None:
+        self._purchases = rounds if isinstance(rounds, TradeLog) else TradeLog(rounds)
+
+    @property
+    def players(self) -> EntityRegistry:
+        return self._players
+
+    @players.setter
+    def players(self, players: List["Player"]) -> None:
+        self._players = self._registry(players, attrgetter("id"))
+
+    @property
+    def public_companies(self) -> EntityRegistry:
+        return self._public_companies
+
+    @public_companies.setter
+    def public_companies(self, companies: List["PublicCompany"]) -> None:
+        self._public_companies = self._registry(companies, attrgetter("id"))
+
+    @property
+    def private_companies(self) -> EntityRegistry:
+        return self._private_companies
+
+    @private_companies.setter
+    def private_companies(self, companies: List["PrivateCompany"]) -> None:
+        self._private_companies = self._registry(companies, attrgetter("order"))
+
+    def findPlayer(self, player_id: str) -> Optional["Player"]:
+        return self.players.find(player_id) if self.players is not None else None
+
+    def findPublicCompany(self, company_id: str) -> Optional["PublicCompany"]:
+        return self.public_companies.find(company_id) if self.public_companies is not None else None
+
+    def findPrivateCompany(self, order: int) -> Optional["PrivateCompany"]:
+        return self.private_companies.find(order) if self.private_companies is not None else None
 
 
 class Color(Enum):
@@ -56,6 +202,13 @@ class Train:
         self.cost = cost
         self.rusts_on = rusts_on
 
+    @property
+    def capacity(self) -> Optional[int]:
+        """How many stops the train can run to: the number in its type, or None (no limit) for diesels."""
+        if self.type.upper() == "D":
+            return None
+        return int(''.join(filter(str.isdigit, self.type)) or 0)
+
 
 class Route(NamedTuple):
     stops: List[str]
@@ -77,6 +230,7 @@ class Tile:
     slots: int = 1
     tokens: List[str] = field(default_factory=list)
     extra_slots_cost: Optional[int] = None
+    revenue: Union[int, Tuple[int, ...], None] = None  # Stop value, or one per phase; see app.revenue
 
 
 class Direction(Enum):
@@ -100,11 +254,47 @@ class Cell(NamedTuple):
     arrow: Direction = None
 
 
+class MarketEvent(Enum):
+    PAYOUT = 1
+    WITHHOLD = 2
+    SOLD_OUT = 3
+    SALE = 4  # Moves down a row per share sold
+
+
+# A market event, or (event, shares) for sales of more than nothing
+MarketStep = Union[MarketEvent, Tuple[MarketEvent, int]]
+
+
+class MarketProjection(NamedTuple):
+    stock_pos: Tuple[int, int]
+    price: int
+
+
 class StockMarket:
-    """Represents the 12×5 stock market grid."""
+    """Represents the 12×5 stock market grid.
+
+    The grid is compiled once into destination tables: cells are numbered row by row, and for every event (and
+    every number of shares sold) a flat array holds where a marker on each cell ends up.  Moving a marker is then a
+    single lookup, and ``applyMany`` moves many markers with one gather.
+    """
 
     def __init__(self, grid: List[List[Cell]]):
         self.grid = grid
+        self.width = len(grid[0]) if grid else 0
+        self.cells = self.width * len(grid)
+        # Cell number -> (row, column)
+        self.coords: List[Tuple[int, int]] = [(row, col) for row in range(len(grid)) for col in range(self.width)]
+        self._steps: Dict[Direction, array] = {
+            direction: array("i", (self._step(row, col, direction) for row, col in self.coords))
+            for direction in Direction}
+        self._walks: Dict[Tuple[Direction, int], array] = {}
+        # One row of ``cells`` destinations per event: payout, withhold, sold out, then sales of 0..rows-1 shares.
+        self.table = array("i")
+        self.table.extend(array("i", (self._payout(*coord) for coord in self.coords)))
+        self.table.extend(array("i", (self._withhold(*coord) for coord in self.coords)))
+        self.table.extend(self._steps[Direction.UP])
+        for shares in range(len(grid)):
+            self.table.extend(self.walk(Direction.DOWN, shares))
 
     def cell(self, row: int, col: int) -> Cell:
         return self.grid[row][col]
@@ -133,43 +323,124 @@ class StockMarket:
             return row + 1, col - 1
         return row, col
 
-    def move_marker(self, company: "PublicCompany", direction: Direction, steps: int = 1) -> None:
-        row, col = company.stock_pos
-        for _ in range(steps):
-            nr, nc = self.next_coord(row, col, direction)
-            if not self.in_bounds(nr, nc):
-                break
-            row, col = nr, nc
-        company.stock_pos = (row, col)
+    def index(self, row: int, col: int) -> int:
+        return row * self.width + col
+
+    def _step(self, row: int, col: int, direction: Direction) -> int:
+        """Cell number one step from (row, col), or the same cell at the edge of the market."""
+        nr, nc = self.next_coord(row, col, direction)
+        return self.index(nr, nc) if self.in_bounds(nr, nc) else self.index(row, col)
+
+    def _payout(self, row: int, col: int) -> int:
+        cell = self.cell(row, col)
+        if cell.arrow:
+            direction = cell.arrow
+        else:
+            if cell.band == Band.YELLOW:
+                return self.index(row, col)
+            direction = Direction.UP_RIGHT if cell.band == Band.BROWN else Direction.RIGHT
+        return self._steps[direction][self.index(row, col)]
+
+    def _withhold(self, row: int, col: int) -> int:
+        cell = self.cell(row, col)
+        direction = cell.arrow if cell.arrow == Direction.DOWN_LEFT else Direction.LEFT
+        return self._steps[direction][self.index(row, col)]
+
+    def walk(self, direction: Direction, steps: int) -> array:
+        """Destinations ``steps`` steps in ``direction``.  A marker stops at the edge of the market."""
+        walk = self._walks.get((direction, steps))
+        if walk is None:
+            step = self._steps[direction]
+            walk = array("i", range(self.cells))
+            for _ in range(steps):
+                walk = array("i", (step[cell] for cell in walk))
+            self._walks[direction, steps] = walk
+        return walk
+
+    def offset(self, event: MarketEvent, shares: int = 0) -> int:
+        """Where ``event``'s destinations start in ``table``."""
+        if event == MarketEvent.SALE:
+            return (3 + min(max(shares, 0), len(self.grid) - 1)) * self.cells
+        return (event.value - 1) * self.cells
+
+    def destination(self, row: int, col: int, event: MarketEvent, shares: int = 0) -> Tuple[int, int]:
+        return self.coords[self.table[self.offset(event, shares) + self.index(row, col)]]
+
+    def _place(self, company: "PublicCompany", cell: int) -> None:
+        company.stock_pos = self.coords[cell]
         company.update_price_from_pos()
 
+    def apply(self, company: "PublicCompany", event: MarketEvent, shares: int = 0) -> None:
+        self._place(company, self.table[self.offset(event, shares) + self.index(*company.stock_pos)])
+
+    def applyMany(self, moves: Sequence[Tuple["PublicCompany", MarketEvent, int]]) -> None:
+        """Applies (company, event, shares) for many companies at once: one gather over ``table``, with NumPy when
+        it is installed.  Each company should appear once."""
+        lookups = [self.offset(event, shares) + self.index(*company.stock_pos) for company, event, shares in moves]
+        try:
+            import numpy
+        except ImportError:
+            cells = [self.table[lookup] for lookup in lookups]
+        else:
+            table = numpy.frombuffer(self.table, dtype="i{}".format(self.table.itemsize))
+            cells = table[numpy.array(lookups, dtype=numpy.intp)].tolist()
+        for (company, _, _), cell in zip(moves, cells):
+            self._place(company, cell)
+
+    def _offsets(self, events: Sequence[MarketStep]) -> List[int]:
+        return [self.offset(*event) if isinstance(event, tuple) else self.offset(event) for event in events]
+
+    def project(self, row: int, col: int, events: Sequence[MarketStep]) -> MarketProjection:
+        """Where a marker on (row, col) would end up after ``events``, in order.  Moves nothing."""
+        return self.projectMany([(row, col)], [events])[0]
+
+    def projectMany(self, starts: Sequence[Tuple[int, int]],
+                    sequences: Sequence[Sequence[MarketStep]]) -> List[MarketProjection]:
+        """``project`` for many (start, events) pairs at once, eg. every company's marker or many what-ifs for one.
+        Each step of every sequence is taken together, as one gather over ``table`` with NumPy when it is
+        installed; shorter sequences are padded with a sale of no shares, which leaves a marker where it is."""
+        cells = [self.index(*start) for start in starts]
+        offsets = [self._offsets(events) for events in sequences]
+        try:
+            import numpy
+        except ImportError:
+            for i, steps in enumerate(offsets):
+                cell = cells[i]
+                for offset in steps:
+                    cell = self.table[offset + cell]
+                cells[i] = cell
+        else:
+            table = numpy.frombuffer(self.table, dtype="i{}".format(self.table.itemsize))
+            padded = numpy.full((len(offsets), max(map(len, offsets), default=0)),
+                                self.offset(MarketEvent.SALE, 0), dtype=numpy.intp)
+            for i, steps in enumerate(offsets):
+                padded[i, :len(steps)] = steps
+            current = numpy.array(cells, dtype=numpy.intp)
+            for column in padded.T:
+                current = table[column + current]
+            cells = current.tolist()
+        return [MarketProjection(self.coords[cell], self.cell(*self.coords[cell]).price) for cell in cells]
+
+    def move_marker(self, company: "PublicCompany", direction: Direction, steps: int = 1) -> None:
+        self._place(company, self.walk(direction, steps)[self.index(*company.stock_pos)])
+
     def on_sale(self, company: "PublicCompany", percentage: int) -> None:
         steps = percentage // 10
         if steps > 0:
-            self.move_marker(company, Direction.DOWN, steps)
+            self.apply(company, MarketEvent.SALE, steps)
 
     def on_withhold(self, company: "PublicCompany") -> None:
-        cell = self.cell(*company.stock_pos)
-        direction = cell.arrow if cell.arrow == Direction.DOWN_LEFT else Direction.LEFT
-        self.move_marker(company, direction)
+        self.apply(company, MarketEvent.WITHHOLD)
 
     def move(self, company: "PublicCompany", direction: Direction) -> None:
         """Move ``company`` one step in ``direction`` respecting board edges."""
         self.move_marker(company, direction)
 
     def on_payout(self, company: "PublicCompany") -> None:
-        cell = self.cell(*company.stock_pos)
-        if cell.arrow:
-            direction = cell.arrow
-        else:
-            if cell.band == Band.YELLOW:
-                return
-            direction = Direction.UP_RIGHT if cell.band == Band.BROWN else Direction.RIGHT
-        self.move_marker(company, direction)
+        self.apply(company, MarketEvent.PAYOUT)
 
     def on_sold_out(self, company: "PublicCompany") -> None:
-        if company.stock_pos[0] > 0:
-            self.move_marker(company, Direction.UP)
+        self.apply(company, MarketEvent.SOLD_OUT)
 
     def sort_companies(self, companies: List["PublicCompany"]) -> List["PublicCompany"]:
         return sorted(
@@ -181,15 +452,376 @@ class StockMarket:
         )
 
 
-class Player:
+class OperatingOrder:
+    """Floated, solvent companies in the order they operate: highest stock price first, then the higher row of the
+    market, then the order they operated in last round.
+
+    The order is kept sorted as it changes rather than sorted from scratch each round.  Companies report their own
+    changes (a stock marker moving, floating, going bankrupt), and only the company that changed is moved to its new
+    place.
+    """
+
+    def __init__(self, companies: List["PublicCompany"], market: StockMarket = None, previous: List[str] = ()):
+        self.companies = companies  # The game's companies, operating or not
+        self.market = market
+        self.operating: List["PublicCompany"] = []  # In operating order
+        self._keys: List[tuple] = []  # Sort key of each of ``operating``
+        self._index: Dict[str, int] = {}  # Company id -> position in ``companies`` (the final tie-break)
+        # Company id -> position in the order last committed (``previous`` to begin with)
+        self._rank: Dict[str, int] = {company_id: rank for rank, company_id in enumerate(previous)}
+        self._positions: Optional[Dict[str, int]] = None  # Company id -> position in ``operating``, rebuilt lazily
+        for index, company in enumerate(companies):
+            self._index[company.id] = index
+            company._operating_order = self
+            self.update(company)
+
+    def key(self, company: "PublicCompany") -> tuple:
+        if self.market is not None:
+            price = self.market.cell(*company.stock_pos).price
+        else:
+            price = company.stockPrice[StockPurchaseSource.BANK]
+        return -price, company.stock_pos[0], self._rank.get(company.id, 0), self._index[company.id]
+
+    def update(self, company: "PublicCompany") -> None:
+        """Moves ``company`` to its place after its price, float or bankruptcy changed."""
+        position = self.position(company.id)
+        if position is not None:
+            del self.operating[position]
+            del self._keys[position]
+        if company.isFloated() and not company.bankrupt:
+            key = self.key(company)
+            position = bisect_left(self._keys, key)
+            self.operating.insert(position, company)
+            self._keys.insert(position, key)
+        self._positions = None
+
+    def position(self, company_id: str) -> Optional[int]:
+        if self._positions is None:
+            self._positions = {company.id: position for position, company in enumerate(self.operating)}
+        return self._positions.get(company_id)
+
+    def after(self, company_id: str) -> Optional["PublicCompany"]:
+        """The company that operates after ``company_id``, or None if it is last (or not operating)."""
+        position = self.position(company_id)
+        if position is None or position + 1 == len(self.operating):
+            return None
+        return self.operating[position + 1]
+
+    def commit(self) -> List[str]:
+        """Fixes the current order as the tie-break for the next round, and returns it as company ids."""
+        order = [company.id for company in self.operating]
+        self._rank = {company_id: rank for rank, company_id in enumerate(order)}
+        # Ranks follow the current order, so the keys stay sorted.
+        self._keys = [key[:2] + (rank,) + key[3:] for rank, key in enumerate(self._keys)]
+        return order
+
+
+class Identity:
+    """Gives an entity a constant-time hash derived from its id.
+
+    Players and companies are used as dict keys and set members all over the engine (``owners``, ``portfolio``,
+    ``sold_this_round``...).  The id is interned and its hash cached whenever it is assigned, so lookups never
+    have to look at the id string again."""
+    __slots__ = ("_id", "_hash")
+
+    def __new__(cls, id: str = None):
+        # Copies and unpickled objects get their id (and hash) back before anything else, since the copy of a
+        # cross-linked object graph may need to hash them before their state has been restored.
+        entity = super().__new__(cls)
+        entity.id = id
+        return entity
+
+    def __getnewargs__(self):
+        return (self._id,)
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @id.setter
+    def id(self, value: str) -> None:
+        if isinstance(value, str):
+            value = sys.intern(value)
+        self._id = value
+        self._hash = hash(value)
+
+
+class ShareLedger:
+    """Game-wide players × companies matrix of share percentages.
+
+    When attached to a game it becomes the single source of truth for share ownership: ``PublicCompany.owners``
+    turns into a column view and ``Player.portfolio`` is derived from the player's row, so the two can no longer
+    drift apart.  The matrix is a flat row-major ``array`` (one row per player), which lets rows and columns be
+    read as slices and can be wrapped by NumPy without copying (see ``as_numpy``)."""
+
+    def __init__(self, players: List["Player"], companies: List["PublicCompany"]):
+        self.players: List[Player] = list(players)
+        self.companies: List[PublicCompany] = list(companies)
+        self.width = len(self.companies)
+        self.shares = array("i", bytes(array("i").itemsize * len(self.players) * self.width))
+
+    @staticmethod
+    def attach(players: List["Player"], companies: List["PublicCompany"]) -> "ShareLedger":
+        """Build a ledger for ``players`` and ``companies``, moving any existing holdings into it."""
+        ledger = ShareLedger(players, companies)
+        holdings = [(company, list(company.owners.items())) for company in ledger.companies]
+
+        for index, player in enumerate(ledger.players):
+            player._ledger = ledger
+            player._ledger_index = index
+        for index, company in enumerate(ledger.companies):
+            company._ledger = ledger
+            company._ledger_index = index
+            company._owners = LedgerColumn(ledger, company)
+
+        for company, owners in holdings:
+            for player, amount in owners:
+                ledger.set(player, company, amount)
+        return ledger
+
+    def _cell(self, player: "Player", company: "PublicCompany") -> int:
+        if player._ledger is not self:
+            raise KeyError("{} is not part of this share ledger".format(player))
+        return player._ledger_index * self.width + company._ledger_index
+
+    def get(self, player: "Player", company: "PublicCompany") -> int:
+        return self.shares[self._cell(player, company)]
+
+    def set(self, player: "Player", company: "PublicCompany", amount: int) -> None:
+        self.shares[self._cell(player, company)] = amount
+
+    def add(self, player: "Player", company: "PublicCompany", amount: int) -> None:
+        self.shares[self._cell(player, company)] += amount
+
+    def row(self, player: "Player") -> array:
+        start = player._ledger_index * self.width
+        return self.shares[start:start + self.width]
+
+    def column(self, company: "PublicCompany") -> array:
+        return self.shares[company._ledger_index::self.width]
+
+    def holders(self, company: "PublicCompany") -> List[Tuple["Player", int]]:
+        """Players holding shares in ``company`` and how much they hold, in player order."""
+        return [(self.players[index], amount) for index, amount in enumerate(self.column(company)) if amount]
+
+    def holdings(self, player: "Player") -> List[Tuple["PublicCompany", int]]:
+        return [(self.companies[index], amount) for index, amount in enumerate(self.row(player)) if amount]
+
+    def as_numpy(self):
+        """Zero-copy ``(players, companies)`` NumPy view of the matrix.  Requires NumPy to be installed."""
+        import numpy
+        return numpy.frombuffer(self.shares, dtype="i{}".format(self.shares.itemsize)).reshape(
+            len(self.players), self.width)
+
+
+class LedgerColumn(MutableMapping):
+    """``PublicCompany.owners`` when the company is attached to a ``ShareLedger``.
+
+    Behaves like the Player → percentage dict it replaces.  Iteration only yields players currently holding
+    shares, while looking up any player in the game returns their holding (0 if they have none)."""
+    __slots__ = ("ledger", "company")
+
+    def __init__(self, ledger: ShareLedger, company: "PublicCompany"):
+        self.ledger = ledger
+        self.company = company
+
+    def __getitem__(self, player: "Player") -> int:
+        if not isinstance(player, Player):
+            raise KeyError(player)
+        return self.ledger.get(player, self.company)
+
+    def __setitem__(self, player: "Player", amount: int) -> None:
+        self.ledger.set(player, self.company, amount)
+
+    def __delitem__(self, player: "Player") -> None:
+        self.ledger.set(player, self.company, 0)
+
+    def __contains__(self, player) -> bool:
+        return isinstance(player, Player) and player._ledger is self.ledger and self.ledger.get(player, self.company) > 0
+
+    def __iter__(self):
+        return iter([player for player, amount in self.ledger.holders(self.company)])
+
+    def __len__(self) -> int:
+        return sum(1 for amount in self.ledger.column(self.company) if amount)
+
+    def items(self):
+        return self.ledger.holders(self.company)
+
+    def values(self):
+        return [amount for amount in self.ledger.column(self.company) if amount]
+
+    def clear(self) -> None:
+        for player, amount in self.ledger.holders(self.company):
+            self.ledger.set(player, self.company, 0)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+class TradeLog:
+    """Every purchase (or sale) of every stock round, as ``MutableGameState.purchases`` and ``sales``.
+
+    Trades are appended to a columnar log: three ``array`` columns holding the round, the player and the company of
+    each trade, with players and companies numbered as they are first seen.  Rounds are appended in order, so each
+    round is a contiguous slice of the log.  Each round's (player, company) pairs are also kept in a set, so the
+    question the stock round asks ("did this player buy this company in that round?") is a constant-time lookup
+    for any round.
+
+    Indexing the log by round gives a ``TradeRound``, which reads like the ``{player: [companies]}`` dict of each
+    round it replaces.  The log only grows: trades can be added to the latest round, never removed.
+    """
+
+    def __init__(self, rounds: Iterable[Dict["Player", List["PublicCompany"]]] = ()):
+        self.players: List[Player] = []
+        self.companies: List[PublicCompany] = []
+        self._player_numbers: Dict[Player, int] = {}
+        self._company_numbers: Dict[PublicCompany, int] = {}
+        self.round = array("i")
+        self.player = array("i")
+        self.company = array("i")
+        self._starts = array("i")  # Log position where each round starts
+        self._pairs: List[Set[Tuple[int, int]]] = []  # (player, company) numbers traded in each round
+        for trades in rounds:
+            self.append(trades)
+
+    def copy(self, get=lambda entity: entity) -> "TradeLog":
+        """A copy whose players and companies are ``get(entity)`` (eg. a fork's copies)."""
+        log = TradeLog()
+        log.players = [get(player) for player in self.players]
+        log.companies = [get(company) for company in self.companies]
+        log._player_numbers = {player: number for number, player in enumerate(log.players)}
+        log._company_numbers = {company: number for number, company in enumerate(log.companies)}
+        log.round, log.player, log.company = array("i", self.round), array("i", self.player), array("i", self.company)
+        log._starts = array("i", self._starts)
+        log._pairs = [set(pairs) for pairs in self._pairs]
+        return log
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __getitem__(self, round: int) -> "TradeRound":
+        if round < 0:
+            round += len(self)
+        if not 0 <= round < len(self):
+            raise IndexError(round)
+        return TradeRound(self, round)
+
+    def __iter__(self):
+        return (TradeRound(self, round) for round in range(len(self)))
+
+    def append(self, trades: Dict["Player", List["PublicCompany"]] = None) -> None:
+        """Starts a new round, optionally with some trades already in it."""
+        self._starts.append(len(self.round))
+        self._pairs.append(set())
+        for player, companies in (trades or {}).items():
+            for company in companies:
+                self.record(len(self) - 1, player, company)
+
+    def ensure(self, round: int) -> None:
+        """Makes sure rounds up to ``round`` exist."""
+        while len(self) <= round:
+            self.append()
+
+    def record(self, round: int, player: "Player", company: "PublicCompany") -> None:
+        self.ensure(round)
+        if round != len(self) - 1:
+            raise ValueError("Trades can only be added to the latest round ({}), not {}".format(len(self) - 1, round))
+        player_number = self._player_numbers.get(player)
+        if player_number is None:
+            player_number = self._player_numbers[player] = len(self.players)
+            self.players.append(player)
+        company_number = self._company_numbers.get(company)
+        if company_number is None:
+            company_number = self._company_numbers[company] = len(self.companies)
+            self.companies.append(company)
+        self.round.append(round)
+        self.player.append(player_number)
+        self.company.append(company_number)
+        self._pairs[round].add((player_number, company_number))
+
+    def _slice(self, round: int) -> range:
+        if not 0 <= round < len(self):
+            return range(0)
+        end = self._starts[round + 1] if round + 1 < len(self) else len(self.round)
+        return range(self._starts[round], end)
+
+    def contains(self, round: int, player: "Player", company: "PublicCompany") -> bool:
+        """Whether ``player`` traded ``company`` in ``round``."""
+        player_number = self._player_numbers.get(player)
+        company_number = self._company_numbers.get(company)
+        if player_number is None or company_number is None or not 0 <= round < len(self):
+            return False
+        return (player_number, company_number) in self._pairs[round]
+
+    def trades(self, round: int) -> List[Tuple["Player", "PublicCompany"]]:
+        """(player, company) of every trade in ``round``, in the order they happened."""
+        return [(self.players[self.player[i]], self.companies[self.company[i]]) for i in self._slice(round)]
+
+    def as_numpy(self):
+        """Zero-copy (round, player, company) NumPy columns.  Requires NumPy to be installed."""
+        import numpy
+        dtype = "i{}".format(self.round.itemsize)
+        return tuple(numpy.frombuffer(column, dtype=dtype) for column in (self.round, self.player, self.company))
+
+
+class TradeRound(Mapping):
+    """One round of a ``TradeLog``, read like a ``{player: [companies]}`` dict.  Setting a player's companies may
+    only add to the end of what is already listed."""
+    __slots__ = ("log", "round")
+
+    def __init__(self, log: TradeLog, round: int):
+        self.log = log
+        self.round = round
+
+    def _byPlayer(self) -> Dict["Player", List["PublicCompany"]]:
+        trades: Dict[Player, List[PublicCompany]] = {}
+        for player, company in self.log.trades(self.round):
+            trades.setdefault(player, []).append(company)
+        return trades
+
+    def __getitem__(self, player: "Player") -> List["PublicCompany"]:
+        log = self.log
+        number = log._player_numbers.get(player)
+        companies = [log.companies[log.company[i]] for i in log._slice(self.round) if log.player[i] == number]
+        if not companies:
+            raise KeyError(player)
+        return companies
+
+    def __setitem__(self, player: "Player", companies: List["PublicCompany"]) -> None:
+        listed = self.get(player, [])
+        if companies[:len(listed)] != listed:
+            raise ValueError("Trades already recorded for {} can't be changed".format(player))
+        for company in companies[len(listed):]:
+            self.log.record(self.round, player, company)
+
+    def __contains__(self, player) -> bool:
+        return player in self._byPlayer()
+
+    def __iter__(self):
+        return iter(self._byPlayer())
+
+    def __len__(self) -> int:
+        return len(self._byPlayer())
+
+    def contains(self, player: "Player", company: "PublicCompany") -> bool:
+        return self.log.contains(self.round, player, company)
+
+    def __repr__(self) -> str:
+        return repr(self._byPlayer())
+
+
+class Player(Identity):
     """This is the individual player.
     Warning: There is no authorization at this level.  You do not check emails or passwords.  This is the character in the game."""
+    __slots__ = ("name", "cash", "order", "_portfolio", "private_companies", "sold_this_round", "_ledger",
+                 "_ledger_index", "_share_percent", "_presidencies")
 
     def __hash__(self) -> int:
-        return int("".join(str(ord(char)) for char in self.id))
+        return self._hash
 
     def __eq__(self, o: "Player") -> bool:
-        return isinstance(o, Player) and self.id == o.id
+        return self is o or (isinstance(o, Player) and self._id == o._id)
 
     def __str__(self):
         return "{}:{}({})".format(self.id, self.name, self.cash)
@@ -199,7 +831,12 @@ class Player:
         self.name: str = ""
         self.cash: int = 0
         self.order: int = 0
+        self._ledger: ShareLedger = None
+        self._ledger_index: int = None
         self.portfolio: Set['PublicCompany'] = set()
+        # Running totals behind getCertificateCount, maintained by PublicCompany as shares and presidencies move
+        self._share_percent: int = 0
+        self._presidencies: int = 0
         # Track private companies owned by this player for certificate limits
         self.private_companies: Set['PrivateCompany'] = set()
         # Corporations this player sold stock in during the current stock round
@@ -216,17 +853,44 @@ class Player:
         ret.sold_this_round = set()
         return ret
 
+    @property
+    def portfolio(self) -> Set["PublicCompany"]:
+        """Companies this player holds stock in.  Derived from the share ledger when the game has one."""
+        if self._ledger is not None:
+            return set(company for company, amount in self._ledger.holdings(self))
+        return self._portfolio
+
+    @portfolio.setter
+    def portfolio(self, companies: Set["PublicCompany"]) -> None:
+        self._portfolio = companies
+
     def addToPortfolio(self, company: "PublicCompany", amount: int, price: int):
-        """TODO: Is there a way to avoid cross-linking between Player and Public Company?
-        Wouldn't that cause problems when trying to calculate a player's total wealth?"""
-        self.portfolio.add(company)
+        """Pays for stock granted by ``company``.  The company itself is linked to the portfolio by
+        ``PublicCompany.grantStock`` (or derived from the share ledger), so this only moves cash."""
         self.cash = self.cash - amount  / STOCK_CERTIFICATE * price
 
     def getCertificateCount(self):
+        """Certificates held, from running totals kept up to date by ``PublicCompany``.
+        A president's 20% share is a single certificate, and each private company counts as one."""
+        total = self._share_percent / STOCK_CERTIFICATE - self._presidencies + len(self.private_companies)
+        if DEBUG_CERTIFICATE_COUNT:
+            expected = self.recountCertificates()
+            if total != expected:
+                raise AssertionError("Certificate count for {} is {} but a full recount gives {}".format(
+                    self, total, expected))
+        return total
+
+    def recountCertificates(self):
+        """Recomputes the certificate count from scratch.  Used to verify the running totals."""
         total_stock_certificates = 0
 
-        for public_company in self.portfolio:
-            total_stock_certificates += public_company.owners[self] / 10
+        if self._ledger is not None:
+            holdings = self._ledger.holdings(self)
+        else:
+            holdings = [(public_company, public_company.owners.get(self, 0)) for public_company in self.portfolio]
+
+        for public_company, amount in holdings:
+            total_stock_certificates += amount / 10
             if public_company.president == self:  # President has a 20% stock certificate
                 total_stock_certificates -= 1
 
@@ -237,6 +901,8 @@ class Player:
         return self.cash >= cost_of_stock
 
     def hasStock(self, public_company: "PublicCompany"):
+        if self._ledger is not None and public_company._ledger is self._ledger:
+            return self._ledger.get(self, public_company)
         return public_company.owners[self] if public_company in self.portfolio else 0
 
 
@@ -257,49 +923,339 @@ class StockStatus(Enum):
     BROWN = 4
 
 
+class Reach(NamedTuple):
+    """What a company can get to from its stations."""
+    stations: FrozenSet[str]  # Hexes holding one of its tokens
+    hexes: FrozenSet[str]  # Tiled hexes connected to a tiled station, including the station
+    cities: FrozenSet[str]  # Those of ``hexes`` whose tile has station slots
+
+    @property
+    def routable(self) -> bool:
+        """Whether a route of two or more stops could be run."""
+        return len(self.hexes) >= 2
+
+
+class BoardSnapshot(NamedTuple):
+    """A detached copy of a board's track and stations, eg. to hand to another process."""
+    grid: HexGrid
+    tiles: Tuple[Tile, ...]
+    stations: Tuple[Tuple[str, FrozenSet[str]], ...]  # (company id, hexes where it has a token)
+    phase: int = 0
+
+
 class GameBoard:
-    def __init__(self):
+    def __init__(self, grid: HexGrid = None):
         self.board = {}
         self.tokens = {}
+        # Hex adjacency of the map; shared between boards (and forks) since it never changes.
+        self.grid: HexGrid = grid if grid is not None else HexGrid.rectangle()
+        self.revenue = RevenueTable(self.grid)
+        # Company id -> Reach, dropped when track or tokens that could change it are placed.
+        self._reach: Dict[str, Reach] = {}
+        # Company id -> hexes where it has a token, and hex -> number of tokens on its tile.
+        self._stations: Dict[str, Set[str]] = {}
+        self._occupancy: Dict[str, int] = {}
+        # Tile id -> number of that tile on the board, for counting what is left in the tile supply.
+        self._placed: Dict[str, int] = {}
+        # Locations whose tile and token list are shared with a fork (or the board it was forked from)
+        self._shared: Set[str] = set()
+
+    @staticmethod
+    def forVariant(config) -> "GameBoard":
+        """An empty board on the map of a variant config module (see ``app.hexgrid.grid_for``)."""
+        return GameBoard(grid_for(config))
+
+    def fork(self) -> "GameBoard":
+        """Copy-on-write copy of the board: tiles and token lists are shared until either board changes them."""
+        board = GameBoard(self.grid)
+        board.board = dict(self.board)
+        board.tokens = dict(self.tokens)
+        board._reach = dict(self._reach)
+        board.revenue = self.revenue.copy()
+        board._stations = {company_id: set(stations) for company_id, stations in self._stations.items()}
+        board._occupancy = dict(self._occupancy)
+        board._placed = dict(self._placed)
+        board._shared = set(self.board).union(self.tokens)
+        self._shared.update(board._shared)
+        return board
+
+    def snapshot(self) -> BoardSnapshot:
+        return BoardSnapshot(
+            self.grid,
+            tuple(replace(tile, tokens=list(tile.tokens)) for tile in self.board.values()),
+            tuple((company_id, frozenset(stations)) for company_id, stations in self._stations.items()),
+            self.revenue.phase,
+        )
+
+    @staticmethod
+    def fromSnapshot(snapshot: BoardSnapshot) -> "GameBoard":
+        """A board with the snapshot's track and stations.  Its ``tokens`` are empty: only company ids are kept."""
+        board = GameBoard(snapshot.grid)
+        board.revenue.phase = snapshot.phase
+        for tile in snapshot.tiles:
+            board.board[tile.location] = replace(tile, tokens=list(tile.tokens))
+            board._occupancy[tile.location] = len(tile.tokens)
+            board._placed[tile.id] = board._placed.get(tile.id, 0) + 1
+            board.revenue.setTile(tile)
+        board._stations = {company_id: set(stations) for company_id, stations in snapshot.stations}
+        return board
+
+    def _own(self, hex_id: str) -> None:
+        """Gives this board its own copy of the tile and token list at ``hex_id`` before they are modified."""
+        if hex_id not in self._shared:
+            return
+        self._shared.discard(hex_id)
+        tile = self.board.get(hex_id)
+        if tile is not None:
+            self.board[hex_id] = replace(tile, tokens=list(tile.tokens))
+        if hex_id in self.tokens:
+            self.tokens[hex_id] = list(self.tokens[hex_id])
+
+    def adjacent(self, a: str, b: str) -> bool:
+        """Whether hexes ``a`` and ``b`` share an edge on this board's map."""
+        a_id, b_id = self.grid.ids.get(a), self.grid.ids.get(b)
+        return a_id is not None and b_id is not None and b_id in self.grid.neighbours[a_id]
+
+    def neighbours(self, location: str) -> List[str]:
+        hex_id = self.grid.ids.get(location)
+        if hex_id is None:
+            return []
+        return [self.grid.locations[n] for n in self.grid.neighbours[hex_id]]
+
+    def stations(self, company_id: str) -> FrozenSet[str]:
+        """Hexes where the company has a token."""
+        return frozenset(self._stations.get(company_id, ()))
+
+    def hasStation(self, company_id: str, location: str) -> bool:
+        return location in self._stations.get(company_id, ())
+
+    def hasAnyStation(self, company_id: str) -> bool:
+        return bool(self._stations.get(company_id))
+
+    def occupancy(self, location: str) -> int:
+        """How many tokens are on the tile at ``location``."""
+        return self._occupancy.get(location, 0)
+
+    def _addStation(self, company_id: str, location: str) -> None:
+        self._stations.setdefault(company_id, set()).add(location)
+
+    def _reindexTile(self, location: str, previous: Optional[Tile], tile: Tile) -> None:
+        """Keeps the token indexes in step when a tile is replaced; tokens only on the old tile are gone."""
+        placed = {token.company.id for token in self.tokens.get(location, [])}
+        for company_id in set(previous.tokens if previous else ()) - set(tile.tokens) - placed:
+            self._stations.get(company_id, set()).discard(location)
+        for company_id in tile.tokens:
+            self._addStation(company_id, location)
+        self._occupancy[location] = len(tile.tokens)
+
+    def reachable(self, company: 'PublicCompany') -> Reach:
+        """The hexes and cities ``company`` can reach.  Cached until track or tokens change it."""
+        reach = self._reach.get(company.id)
+        if reach is None:
+            reach = self._reach[company.id] = self._search(company.id)
+        return reach
+
+    def _search(self, company_id: str) -> Reach:
+        stations = self._stations.get(company_id, ())
+        frontier = [location for location in stations if location in self.board]
+        seen = set(frontier)
+        for location in frontier:
+            for neighbour in self.neighbours(location):
+                if neighbour in self.board and neighbour not in seen:
+                    seen.add(neighbour)
+                    frontier.append(neighbour)
+        cities = frozenset(location for location in seen if self.board[location].slots > 0)
+        return Reach(frozenset(stations), frozenset(seen), cities)
+
+    def canReach(self, company: 'PublicCompany', location: str, edges: int = None) -> bool:
+        """Whether ``location`` is one of the company's stations, on its network or right next to it.
+
+        With ``edges`` (a bit mask of a tile's track edges, see ``app.tiles``) a neighbouring network only counts
+        if the track runs towards it.
+        """
+        reach = self.reachable(company)
+        if location in reach.stations or location in reach.hexes:
+            return True
+        if edges is not None:
+            return bool(edges & self.networkEdges(company, location))
+        return any(n in reach.hexes or n in reach.stations for n in self.neighbours(location))
+
+    def placed(self, tile_id: str) -> int:
+        """How many copies of the tile are on the board."""
+        return self._placed.get(tile_id, 0)
+
+    def networkEdges(self, company: 'PublicCompany', location: str) -> int:
+        """Bit mask of the edges of ``location`` that face the company's network or one of its stations."""
+        hex_id = self.grid.ids.get(location)
+        if hex_id is None:
+            return 0
+        reach = self.reachable(company)
+        mask = 0
+        for edge, neighbour in enumerate(self.grid.neighbours_by_edge[hex_id]):
+            if neighbour >= 0:
+                name = self.grid.locations[neighbour]
+                if name in reach.hexes or name in reach.stations:
+                    mask |= 1 << edge
+        return mask
+
+    def _trackChanged(self, location: str) -> None:
+        """New track only joins the networks that touch it; upgrades only change the networks through it."""
+        touching = {location}.union(self.neighbours(location))
+        for company_id, reach in list(self._reach.items()):
+            if not touching.isdisjoint(reach.hexes) or location in reach.stations:
+                del self._reach[company_id]
 
     def setTrack(self, track: Tile):
+        self._own(track.location)
+        previous = self.board.get(track.location)
         self.board[track.location] = track
+        if previous is not None:
+            self._placed[previous.id] -= 1  # A replaced tile goes back to the supply
+        self._placed[track.id] = self._placed.get(track.id, 0) + 1
+        self._reindexTile(track.location, previous, track)
+        self.revenue.setTile(track)
+        self._trackChanged(track.location)
 
     def place_token(self, corp: 'PublicCompany', hex_id: str) -> bool:
+        self._own(hex_id)
         tile = self.board.get(hex_id)
         if tile is None:
             return False
         occupied = len(tile.tokens)
-        if occupied < tile.slots:
-            tile.tokens.append(corp.id)
-            return True
-        if occupied >= tile.slots and tile.extra_slots_cost is not None:
+        if occupied < tile.slots or tile.extra_slots_cost is not None:
+            self._reach.pop(corp.id, None)
             tile.tokens.append(corp.id)
+            self._addStation(corp.id, hex_id)
+            self._occupancy[hex_id] = occupied + 1
             return True
         return False
 
     def setToken(self, token: Token):
+        self._own(token.location)
+        self._reach.pop(token.company.id, None)
         self.tokens.setdefault(token.location, []).append(token)
+        self._addStation(token.company.id, token.location)
         if hasattr(token.company, "tokens"):
             token.company.tokens.append(token)
         tile = self.board.get(token.location)
         if tile is not None and token.company.id not in tile.tokens:
             tile.tokens.append(token.company.id)
+            self._occupancy[token.location] = len(tile.tokens)
+
+    def setPhase(self, phase: int) -> None:
+        """Switches stop values to those of ``phase`` (eg. when a new train type is bought)."""
+        self.revenue.setPhase(phase, self.board.values())
+
+    def stopRevenue(self, location: str) -> int:
+        hex_id = self.grid.ids.get(location)
+        if hex_id is not None:
+            return self.revenue.values[hex_id]
+        return tile_revenue(self.board.get(location), self.revenue.phase)
 
     def calculateRoute(self, route) -> int:
-        return len(route.stops) * 10
+        hex_ids = [self.grid.ids.get(stop) for stop in route.stops]
+        if None in hex_ids:
+            return sum(self.stopRevenue(stop) for stop in route.stops)
+        return self.revenue.score(hex_ids)
+
 
+class ShareholderRanking:
+    """A company's shareholders ranked by holding, kept up to date by ``PublicCompany`` as shares move.
 
-class PublicCompany:
+    Holdings are grouped by amount: ``levels`` is the sorted list of distinct amounts held and ``holders`` maps each
+    to its players, in the order they reached it.  The largest holding and the players who could be president
+    (those with a president's certificate or more) are then read off the top levels instead of scanning every
+    owner.
+    """
+    __slots__ = ("holding", "levels", "holders", "eligible")
+
+    def __init__(self, owners: Dict["Player", int] = None):
+        self.holding: Dict[Player, int] = {}
+        self.levels: List[int] = []  # Distinct amounts held, ascending
+        self.holders: Dict[int, Dict[Player, None]] = {}  # Amount -> its players (an ordered set)
+        self.eligible = 0  # Players holding at least a president's certificate
+        for player, amount in (owners or {}).items():
+            self.move(player, amount)
+
+    def copy(self, get=lambda entity: entity) -> "ShareholderRanking":
+        """A copy whose players are ``get(player)`` (eg. a fork's copies)."""
+        ranking = ShareholderRanking()
+        ranking.holding = {get(player): amount for player, amount in self.holding.items()}
+        ranking.levels = list(self.levels)
+        ranking.holders = {amount: {get(player): None for player in players}
+                           for amount, players in self.holders.items()}
+        ranking.eligible = self.eligible
+        return ranking
+
+    def move(self, player: "Player", amount: int) -> None:
+        """Records that ``player`` now holds ``amount``."""
+        previous = self.holding.pop(player, 0)
+        if previous == amount:
+            if amount > 0:
+                self.holding[player] = amount
+            return
+        if previous > 0:
+            players = self.holders[previous]
+            del players[player]
+            if not players:
+                del self.holders[previous]
+                del self.levels[bisect_left(self.levels, previous)]
+            self.eligible -= previous >= STOCK_PRESIDENT_CERTIFICATE
+        if amount > 0:
+            self.holding[player] = amount
+            players = self.holders.get(amount)
+            if players is None:
+                players = self.holders[amount] = {}
+                self.levels.insert(bisect_left(self.levels, amount), amount)
+            players[player] = None
+            self.eligible += amount >= STOCK_PRESIDENT_CERTIFICATE
+
+    def largest(self) -> int:
+        return self.levels[-1] if self.levels else 0
+
+    def leaders(self) -> List["Player"]:
+        """The players holding the largest amount."""
+        return list(self.holders[self.levels[-1]]) if self.levels else []
+
+    def leadersWith(self, player: "Player", amount: int) -> Tuple[int, List["Player"]]:
+        """``largest()`` and ``leaders()`` as they would be if ``player`` held ``amount``.  Changes nothing."""
+        for level in reversed(self.levels):
+            others = [holder for holder in self.holders[level] if holder != player]
+            if not others:
+                continue
+            if level > amount:
+                return level, others
+            if level == amount:
+                return level, others + [player]  # ``move`` would add the player to the level last
+            break
+        return amount, [player] if amount > 0 else []
+
+    def canBePresident(self, player: "Player") -> bool:
+        return self.holding.get(player, 0) >= STOCK_PRESIDENT_CERTIFICATE
+
+    def othersCanBePresident(self, player: "Player") -> bool:
+        """Whether someone other than ``player`` could take over the presidency."""
+        return self.eligible > self.canBePresident(player)
+
+    def potentialPresidents(self) -> Set["Player"]:
+        start = bisect_left(self.levels, STOCK_PRESIDENT_CERTIFICATE)
+        return {player for amount in self.levels[start:] for player in self.holders[amount]}
+
+
+class PublicCompany(Identity):
+    __slots__ = ("trains", "_income", "cash", "_floated", "name", "short_name", "tokens_available", "token_costs",
+                 "stockPrice", "_owners", "stocks", "stock_status", "tokens", "token_count",
+                 "token_placed", "stock_market", "stock_pos", "_ledger", "_ledger_index", "_president",
+                 "_bankrupt", "_operating_order", "_ranking")
 
     def __str__(self) -> str:
         return "{}: {} ({})".format(self.id, self.name, self.short_name)
 
     def __hash__(self) -> int:
-        return int("".join(str(ord(char)) for char in self.id))
+        return self._hash
 
     def __eq__(self, o: "PublicCompany") -> bool:
-        return isinstance(o, PublicCompany) and self.id == o.id
+        return self is o or (isinstance(o, PublicCompany) and self._id == o._id)
 
     def __init__(self):
         self.trains: List[Train] = None
@@ -312,23 +1268,81 @@ class PublicCompany:
         self.short_name: str = None
         self.tokens_available: int = 0
         self.token_costs: List[int] = []
-        self.president: Player = None
+        self._president: Player = None
         self.stockPrice = {StockPurchaseSource.IPO: 0, StockPurchaseSource.BANK: 0}
+        self._ledger: ShareLedger = None
+        self._ledger_index: int = None
+        self._owners: Dict[Player, int] = None
+        self._ranking = ShareholderRanking()
         self.owners = {}
         self.stocks = {StockPurchaseSource.IPO: 100, StockPurchaseSource.BANK: 0}
         self.stock_status = StockStatus.NORMAL
-        self.bankrupt = False
+        self._operating_order: OperatingOrder = None
+        self._bankrupt = False
         self.tokens: List[Token] = []
         self.token_count: int = 0
         self.token_placed: bool = False
         self.stock_market: StockMarket = None
         self.stock_pos: Tuple[int, int] = (0, 0)
 
+    @property
+    def bankrupt(self) -> bool:
+        return self._bankrupt
+
+    @bankrupt.setter
+    def bankrupt(self, bankrupt: bool) -> None:
+        self._bankrupt = bankrupt
+        self._orderChanged()
+
+    def _orderChanged(self) -> None:
+        if self._operating_order is not None:
+            self._operating_order.update(self)
+
+    @property
+    def owners(self) -> Dict[Player, int]:
+        """Player → percentage held.  A ``LedgerColumn`` view when the game has a share ledger."""
+        return self._owners
+
+    @owners.setter
+    def owners(self, owners: Dict[Player, int]) -> None:
+        if self._owners is not None:
+            for player, amount in list(self._owners.items()):
+                player._share_percent -= amount
+        for player, amount in owners.items():
+            player._share_percent += amount
+        self._ranking = ShareholderRanking(owners)
+
+        if self._ledger is None:
+            self._owners = owners
+            for player in owners:
+                player._portfolio.add(self)
+            return
+        owners = dict(owners)
+        self._owners.clear()
+        for player, amount in owners.items():
+            self._owners[player] = amount
+
+    @property
+    def president(self) -> Player:
+        return self._president
+
+    @president.setter
+    def president(self, player: Player) -> None:
+        """Keeps each player's presidency count (used by getCertificateCount) in step with the company."""
+        previous = self._president
+        if previous is player:
+            return
+        if previous is not None:
+            previous._presidencies -= 1
+        if player is not None:
+            player._presidencies += 1
+        self._president = player
+
     @staticmethod
     def initiate(**kwargs):
         x = PublicCompany()
         for k, v in kwargs.items():
-            x.__dict__[k] = v
+            setattr(x, k, v)
         if 'token_costs' not in kwargs:
             x.token_costs = []
         if 'token_count' not in kwargs:
@@ -349,10 +1363,21 @@ class PublicCompany:
         player.addToPortfolio(self, amount, price)
 
     def grantStock(self, player: Player, amount: int):
+        player._share_percent += amount
+        self._ranking.move(player, self._ranking.holding.get(player, 0) + amount)
+        if self._ledger is not None:
+            self._ledger.add(player, self, amount)
+            return
         self.owners[player] = self.owners.get(player, 0) + amount
+        player._portfolio.add(self)
 
     def sell(self, player: Player, amount: int):
-        self.owners[player] = self.owners.get(player, 0) - amount
+        player._share_percent -= amount
+        self._ranking.move(player, self._ranking.holding.get(player, 0) - amount)
+        if self._ledger is not None:
+            self._ledger.add(player, self, -amount)
+        else:
+            self.owners[player] = self.owners.get(player, 0) - amount
 
         # Player has to get paid for this, this is not handled by this class.
         self.stocks[StockPurchaseSource.BANK] += amount
@@ -367,6 +1392,7 @@ class PublicCompany:
             value = self.stock_market.cell(*self.stock_pos).price
             self.stockPrice[StockPurchaseSource.BANK] = value
             self.stockPrice[StockPurchaseSource.IPO] = value
+            self._orderChanged()
 
     def checkPriceIncrease(self):
         if self.stocks[StockPurchaseSource.IPO] == 0 and self.stocks[StockPurchaseSource.BANK] == 0:
@@ -382,6 +1408,7 @@ class PublicCompany:
         else:
             increment = spaces * 10
             self.stockPrice[StockPurchaseSource.BANK] += increment
+            self._orderChanged()
 
     def priceDown(self, amount):
         if self.stock_market:
@@ -391,6 +1418,14 @@ class PublicCompany:
             self.stockPrice[StockPurchaseSource.BANK] = max(
                 0, self.stockPrice[StockPurchaseSource.BANK] - decrement
             )
+            self._orderChanged()
+
+    def projectPrice(self, events: Sequence[MarketStep]) -> MarketProjection:
+        """Where the stock price would be after ``events`` (eg. ``[MarketEvent.PAYOUT] * 2 + [(MarketEvent.SALE,
+        3)]``).  The marker doesn't move."""
+        if not self.stock_market:
+            raise ValueError("{} is not on a stock market".format(self))
+        return self.stock_market.project(*self.stock_pos, events)
 
     def checkPresident(self):
         """Determine if control of the company should change hands.
@@ -399,35 +1434,46 @@ class PublicCompany:
         least 20% of the company. If multiple players tie for the highest
         qualifying share count, the one closest to the outgoing president in
         turn order becomes the new president."""
+        # Read off the shareholder ranking rather than scanning the owners.
+        ranking = self._ranking
+        current_share = ranking.holding.get(self.president, 0) if self.president else 0
+        self.president = self._successor(ranking.largest(), ranking.leaders, current_share)
+
+    def presidentAfterSale(self, player: Player, amount: int) -> Optional[Player]:
+        """Who ``checkPresident`` would make president after ``player`` sold ``amount``.  Changes nothing."""
+        ranking = self._ranking
+        remaining = ranking.holding.get(player, 0) - amount
+        max_ownership, top_owners = ranking.leadersWith(player, remaining)
+        if not self.president:
+            current_share = 0
+        elif self.president == player:
+            current_share = remaining
+        else:
+            current_share = ranking.holding.get(self.president, 0)
+        return self._successor(max_ownership, lambda: top_owners, current_share)
 
-        if not self.owners:
-            return
-
-        current_share = self.owners.get(self.president, 0) if self.president else 0
-        max_ownership = max(self.owners.values())
-
+    def _successor(self, max_ownership: int, top_owners, current_share: int) -> Optional[Player]:
         # No eligible replacement if nobody holds at least 20% or the current
         # president is tied for the lead.
         if (max_ownership <= current_share or
                 max_ownership < STOCK_PRESIDENT_CERTIFICATE):
-            return
-
-        # Collect all players with the largest share count.
-        top_owners = [p for p, v in self.owners.items() if v == max_ownership]
+            return self.president
 
+        # All players with the largest share count.
+        top_owners = top_owners()
         if len(top_owners) == 1 or self.president is None:
-            self.president = top_owners[0]
-            return
+            return top_owners[0]
 
         play_order = self.president.order
         ordered_list = [(owner, owner.order - play_order) for owner in top_owners]
         new_president = reduce(lambda x, y: x if x[1] < y[1] else y, ordered_list)
-        self.president = new_president[0]
+        return new_president[0]
 
     def checkFloated(self):
         if not self._floated and self.stocks[StockPurchaseSource.IPO] < STOCK_CERTIFICATE * 5:
             self._floated = True
             self.cash = self.stockPrice[StockPurchaseSource.IPO] * 100 / STOCK_CERTIFICATE
+            self._orderChanged()
             return True
         return False
 
@@ -439,6 +1485,7 @@ class PublicCompany:
 
     def setInitialPrice(self, ipo_price: int):
         self.stockPrice[StockPurchaseSource.IPO] = self.stockPrice[StockPurchaseSource.BANK] = ipo_price
+        self._orderChanged()
 
     def hasStock(self, sps: StockPurchaseSource, amount: int) -> bool:
         return self.stocks[sps] >= amount
@@ -452,13 +1499,23 @@ class PublicCompany:
 
     def potentialPresidents(self) -> Set[Player]:
         """People with more than 20% stock are potential presidents"""
-        return set([owner for owner, amount in self.owners.items() if amount >= 20])
+        return self._ranking.potentialPresidents()
+
+    def canDumpPresidency(self, player: Player) -> bool:
+        """Whether someone other than ``player`` holds enough stock to take the presidency over from them."""
+        return self._ranking.othersCanBePresident(player)
 
     def payDividends(self):
         """Distribute ``_income`` according to share ownership."""
-        for owner, percent in self.owners.items():
-            player: Player = owner
-            player.cash += int(self._income * percent / 100.0)
+        if self._ledger is not None:
+            income = self._income
+            for player, percent in zip(self._ledger.players, self._ledger.column(self)):
+                if percent:
+                    player.cash += int(income * percent / 100.0)
+        else:
+            for owner, percent in self.owners.items():
+                player: Player = owner
+                player.cash += int(self._income * percent / 100.0)
 
         # Unsold IPO shares pay into the company's treasury
         self.cash += int(self._income * self.stocks[StockPurchaseSource.IPO] / 100.0)
@@ -499,16 +1556,17 @@ class PublicCompany:
     @property
     def outstanding_shares(self) -> int:
         """Total shares held by all players."""
+        if self._ledger is not None:
+            return sum(self._ledger.column(self))
         return sum(self.owners.values())
 
     def hasValidRoute(self, board: 'GameBoard' = None) -> bool:
         """Return ``True`` if this company can currently operate a route.
 
-        The check is intentionally lightweight but verifies more than simply
-        owning a train.  A company must have at least one station token placed
-        on the board and there must exist a continuous path starting from one
-        of its stations.  The implementation only approximates route
-        validation; track orientation and complex board rules are ignored.
+        A company needs trains and at least one station token.  Given the
+        board, one of its stations must also connect to more track, which is
+        answered from the board's cached reachability.  Track orientation and
+        complex board rules are ignored.
         """
 
         if not self.tokens:
@@ -517,6 +1575,9 @@ class PublicCompany:
         if self.hasNoTrains():
             return False
 
+        if board is not None:
+            return board.reachable(self).routable
+
         return True
 
 
@@ -528,6 +1589,15 @@ class PrivateCompany:
     def __hash__(self) -> int:
         return hash(self.order)
 
+    def __new__(cls, order: int = None):
+        # See Identity.__new__: copies need their hash key before their state is restored.
+        private_company = super().__new__(cls)
+        private_company.order = order
+        return private_company
+
+    def __getnewargs__(self):
+        return (self.order,)
+
     def __init__(self):
         self.belongs_to_company: "PublicCompany" = None
         self.player_bids: List[PlayerBid] = None
@@ -649,12 +1719,9 @@ class Move:
         objects themselves.  We receive the objects from the game object when executing the Minigame.
         We bind those objects when the minigame is run, keeping ID values to allow us to match them up to the object itself"""
 
-        for player in game_state.players:
-            if player.id == self.player_id:
-                self.player = player
-                return
-
-        raise ValueError("Player not found when instantiating move")
+        self.player = game_state.findPlayer(self.player_id)
+        if self.player is None:
+            raise ValueError("Player not found when instantiating move")
 
     @staticmethod
     def fromMove(move: "Move") -> "Move":
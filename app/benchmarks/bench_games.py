@@ -0,0 +1,312 @@
+"""Full-game throughput benchmark.
+
+Plays whole games through ``Game.performedMove`` and reports moves/sec, per-minigame move latency percentiles,
+peak memory and allocation counts for each game.  Games come from two sources:
+
+* recorded move logs in ``app/benchmarks/games/*.json``, which stay fixed so runs can be compared across engine
+  versions;
+* synthetic games, played on the spot by a seeded random player that builds its moves with the
+  ``scenarios/move_factory.py`` helpers and keeps the first one the engine accepts.
+
+Games run until the engine cannot go any further (currently the first operating round, which has no turn order
+yet).  Results are written as JSON::
+
+    python -m app.benchmarks.bench_games --output benchmark-results.json
+    python -m app.benchmarks.bench_games --record app/benchmarks/games   # Re-record the fixed move logs
+"""
+
+import argparse
+import gc
+import glob
+import importlib
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from typing import Dict, Iterator, List, Optional
+
+from app.base import Move, Player, StockPurchaseSource, STOCK_CERTIFICATE
+from app.config import load_config
+from app.history import GameHistory, LoggedMove
+from app.minigames.StockRound.const import VALID_IPO_PRICES
+from app.minigames.StockRound.enums import StockRoundType
+from app.minigames.StockRound.move import StockRoundMove
+from app.state import Game
+from app.unittests.scenarios.move_factory import PrivateCompanyInitialAuctionMoves
+
+VARIANTS = ["1830", "1846", "1889"]
+PLAYER_NAMES = ["Alice", "Bob", "Carol", "Dave", "Erin", "Frank"]
+RECORDED_GAMES = os.path.join(os.path.dirname(__file__), "games")
+MAX_MOVES = 5000
+PERCENTILES = [50, 90, 99]
+
+
+def new_game(variant: str, players: List[dict], minigame_class: str = "BuyPrivateCompany") -> Game:
+    """A fresh game for ``players`` (``{"id", "name"}`` dicts, so recorded move logs line up with them)."""
+    config = importlib.reload(load_config(variant))  # Config modules hold the companies; start from clean copies.
+    cash = config.starting_cash(len(players))
+    player_objects = []
+    for order, player in enumerate(players):
+        player_object = Player.create(player["name"], cash, order)
+        player_object.id = player["id"]
+        player_objects.append(player_object)
+    game = Game.initialize(player_objects, config)
+    game.setMinigame(minigame_class)
+    game.setPlayerOrder()
+    game.setCurrentPlayer()
+    return game
+
+
+def _stock_round_move(move_json: dict) -> StockRoundMove:
+    return StockRoundMove.fromMove(Move.fromMessage(json.dumps(move_json)))
+
+
+def _ends_stock_round(game: Game, is_pass: bool) -> bool:
+    """Mirrors ``StockRound.next``: whether this move would hand over to the operating round."""
+    state = game.state
+    total_players = len(state.players)
+    return (state.stock_round_play + 1) % total_players == 0 and \
+        state.stock_round_passed + is_pass == total_players
+
+
+def candidate_moves(game: Game, rng: random.Random) -> List[Move]:
+    """Moves the current player might make, most preferred first.  Not all of them are legal."""
+    state = game.state
+    player = game.current_player
+    unowned = [pc for pc in state.private_companies if pc.hasNoOwner()]
+
+    if game.minigame_class == "BuyPrivateCompany":
+        on_sale = unowned[0]
+        moves = [PrivateCompanyInitialAuctionMoves.buy(player.name, on_sale.short_name, state)]
+        # The turn order only follows one auction at a time, so only open a bidding war if there is none yet.
+        contested = [pc for pc in unowned if len({pb.player for pb in pc.player_bids}) > 1]
+        biddable = [pc for pc in unowned[1:] if not pc.player_bids or not set(contested) - {pc}]
+        for company in rng.sample(biddable, min(2, len(biddable))):
+            minimum_bid = max([company.actual_cost] + [pb.bid_amount for pb in company.player_bids]) + 5
+            moves.append(PrivateCompanyInitialAuctionMoves.bid(
+                player.name, company.short_name, minimum_bid + 5 * rng.randrange(3), state))
+        rng.shuffle(moves)
+        moves.append(PrivateCompanyInitialAuctionMoves.pass_on_bid(player.name, on_sale.short_name, state))
+        return moves
+
+    if game.minigame_class == "BiddingForPrivateCompany":
+        auctioned = next(pc for pc in unowned if pc.hasBids())
+        minimum_bid = max([auctioned.actual_cost] + [pb.bid_amount for pb in auctioned.player_bids]) + 5
+        moves = [
+            PrivateCompanyInitialAuctionMoves.bid(player.name, auctioned.short_name, minimum_bid, state),
+            PrivateCompanyInitialAuctionMoves.pass_on_bid(player.name, auctioned.short_name, state),
+        ]
+        if rng.random() < 0.5:
+            moves.reverse()
+        return moves
+
+    if game.minigame_class == "StockRound":
+        moves = []
+        for company in rng.sample(list(state.public_companies), len(state.public_companies)):
+            for source in StockPurchaseSource:
+                moves.append(_stock_round_move({
+                    "move_type": "BUY", "player_id": player.id, "public_company_id": company.id,
+                    "source": source.name, "ipo_price": rng.choice(VALID_IPO_PRICES),
+                }))
+            if player.hasStock(company):
+                moves.append(_stock_round_move({
+                    "move_type": "SELL", "player_id": player.id,
+                    "for_sale_raw": [[company.id, STOCK_CERTIFICATE]],
+                }))
+        rng.shuffle(moves)
+        pass_move = _stock_round_move({"move_type": "PASS", "player_id": player.id})
+        moves.insert(rng.randrange(len(moves) + 1) if rng.random() < 0.3 else len(moves), pass_move)
+        return moves
+
+    return []
+
+
+def synthesize(variant: str, total_players: int = 4, seed: int = 0, max_moves: int = MAX_MOVES) -> dict:
+    """Plays a random game and returns its move log, in the same format as the recorded games.
+
+    The stock round ends once every player has passed in turn."""
+    rng = random.Random(seed)
+    players = [{"id": "player-{}".format(order), "name": name}
+               for order, name in enumerate(PLAYER_NAMES[:total_players])]
+    game = new_game(variant, players)
+    game.history = GameHistory(snapshot_interval=max_moves + 1)
+    game.history.initial_minigame = game.minigame_class
+
+    consecutive_passes = 0
+    while len(game.history) < max_moves and consecutive_passes < total_players:
+        for move in candidate_moves(game, rng):
+            if game.minigame_class == "StockRound":
+                is_pass = move.move_type == StockRoundType.PASS
+                if _ends_stock_round(game, is_pass):
+                    return _log(game, variant, players, seed)  # The operating round can't be played yet.
+                if game.performedMove(move):
+                    consecutive_passes = consecutive_passes + 1 if is_pass else 0
+                    break
+            elif game.performedMove(move):
+                break
+        else:
+            break  # No legal move left for the current player.
+
+    return _log(game, variant, players, seed)
+
+
+def _log(game: Game, variant: str, players: List[dict], seed: int) -> dict:
+    log = game.history.toDict()
+    log.update({"variant": variant, "players": players, "seed": seed})
+    return log
+
+
+def record(directory: str, total_players: int = 4, seed: int = 0) -> List[str]:
+    """Writes one synthetic game per variant to ``directory``, to be used as fixed recorded games."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for variant in VARIANTS:
+        path = os.path.join(directory, "{}-{}p.json".format(variant, total_players))
+        with open(path, "w") as f:
+            json.dump(synthesize(variant, total_players, seed), f, indent=1)
+        paths.append(path)
+    return paths
+
+
+def recorded_games(directory: str = RECORDED_GAMES) -> Iterator[tuple]:
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        with open(path) as f:
+            yield os.path.splitext(os.path.basename(path))[0], json.load(f)
+
+
+def _moves(log: dict) -> List[Move]:
+    return [LoggedMove(**entry).toMove() for entry in log["moves"]]
+
+
+def _new_game(log: dict) -> Game:
+    return new_game(log["variant"], log["players"], log.get("minigame_class") or "BuyPrivateCompany")
+
+
+def _play(game: Game, log: dict, moves: List[Move], on_move=None) -> Game:
+    for index, move in enumerate(moves):
+        minigame_class = game.minigame_class
+        start = time.perf_counter_ns()
+        success = game.performedMove(move)
+        if on_move is not None:
+            on_move(minigame_class, time.perf_counter_ns() - start)
+        if not success:
+            raise ValueError("Move {} of the {} game failed: {}".format(index, log["variant"], game.errors()))
+    return game
+
+
+def percentile(sorted_values: List[int], pct: float) -> int:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def measure(name: str, log: dict, source: str, repeat: int = 3) -> dict:
+    """Times ``repeat`` plays of a game, then plays it once more under tracemalloc for its memory profile.
+
+    Only the moves are timed.  The memory profile covers setting up the game (including its companies) and
+    playing it, but not parsing the moves."""
+    latencies: Dict[str, List[int]] = {}
+
+    def on_move(minigame_class, elapsed_ns):
+        latencies.setdefault(minigame_class, []).append(elapsed_ns)
+
+    total_moves = len(log["moves"])
+    total_ns = 0
+    for _ in range(repeat):
+        game, moves = _new_game(log), _moves(log)
+        start = time.perf_counter_ns()
+        _play(game, log, moves, on_move)
+        total_ns += time.perf_counter_ns() - start
+
+    moves = _moves(log)
+    gc.collect()
+    collections = sum(stat["collections"] for stat in gc.get_stats())
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    game = _play(_new_game(log), log, moves)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    collections = sum(stat["collections"] for stat in gc.get_stats()) - collections
+    retained = after.compare_to(before, "filename")
+
+    latency_us = {}
+    for minigame_class, values in sorted(latencies.items()):
+        values.sort()
+        latency_us[minigame_class] = {"count": len(values) // repeat, "max": values[-1] / 1000}
+        for pct in PERCENTILES:
+            latency_us[minigame_class]["p{}".format(pct)] = percentile(values, pct) / 1000
+
+    seconds = total_ns / 1e9 / repeat
+    return {
+        "game": name,
+        "source": source,
+        "variant": log["variant"],
+        "players": len(log["players"]),
+        "moves": total_moves,
+        "final_minigame": game.minigame_class,
+        "seconds": seconds,
+        "moves_per_sec": total_moves / seconds if seconds else None,
+        "latency_us": latency_us,
+        "peak_memory_bytes": peak,
+        "retained_blocks": sum(stat.count_diff for stat in retained),
+        "retained_bytes": sum(stat.size_diff for stat in retained),
+        "gc_collections": collections,
+    }
+
+
+def _engine_version() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(__file__), capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(seeds: int = 3, total_players: int = 4, repeat: int = 3, directory: str = RECORDED_GAMES) -> dict:
+    results = [measure(name, log, "recorded", repeat) for name, log in recorded_games(directory)]
+    for variant in VARIANTS:
+        for seed in range(seeds):
+            log = synthesize(variant, total_players, seed)
+            results.append(measure("{}-{}p-seed{}".format(variant, total_players, seed), log, "synthetic", repeat))
+    return {
+        "engine_version": _engine_version(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", default="benchmark-results.json", help="Where to write the JSON results")
+    parser.add_argument("--seeds", type=int, default=3, help="Synthetic games per variant")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed plays per game")
+    parser.add_argument("--record", metavar="DIRECTORY", help="Record one synthetic game per variant and exit")
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.ERROR)  # Turn order changes log warnings on every round.
+
+    if args.record:
+        for path in record(args.record, args.players):
+            print("Recorded", path)
+        return
+
+    report = run(args.seeds, args.players, args.repeat)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for result in report["results"]:
+        print("{:<18} {:<9} {:>5} moves  {:>9.0f} moves/s  peak {:>7.1f} KiB".format(
+            result["game"], result["source"], result["moves"], result["moves_per_sec"] or 0,
+            result["peak_memory_bytes"] / 1024))
+    print("Results written to", args.output)
+
+
+if __name__ == "__main__":
+    main()
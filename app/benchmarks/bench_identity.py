@@ -0,0 +1,102 @@
+"""Micro-benchmark for Player / PublicCompany hashing.
+
+Compares the cached ``Identity`` hash against the previous implementation, which rebuilt an integer from the
+id's characters on every dict or set access.  Run with::
+
+    python -m app.benchmarks.bench_identity
+"""
+
+import timeit
+from typing import List, Tuple
+
+from app.base import Player, PublicCompany, StockPurchaseSource, STOCK_CERTIFICATE
+
+
+def legacy_hash(entity) -> int:
+    return int("".join(str(ord(char)) for char in entity.id))
+
+
+class LegacyPlayer(Player):
+    __slots__ = ()
+
+    def __hash__(self) -> int:
+        return legacy_hash(self)
+
+
+class LegacyPublicCompany(PublicCompany):
+    __slots__ = ()
+
+    def __hash__(self) -> int:
+        return legacy_hash(self)
+
+
+def build(player_cls, company_cls, total_players: int = 6, total_companies: int = 8) \
+        -> Tuple[List[Player], List[PublicCompany]]:
+    players = []
+    for order in range(total_players):
+        player = player_cls()
+        player.id = Player.create("Player {}".format(order), 10000, order).id
+        player.name = "Player {}".format(order)
+        player.cash = 10000
+        player.order = order
+        player.portfolio = set()
+        player.private_companies = set()
+        player.sold_this_round = set()
+        players.append(player)
+
+    companies = []
+    for index in range(total_companies):
+        company = company_cls.initiate(id="CO{}".format(index), name="Company {}".format(index),
+                                       short_name="CO{}".format(index), cash=0)
+        company.setInitialPrice(100)
+        company.setPresident(players[index % total_players])
+        for player in players:
+            company.buy(player, StockPurchaseSource.IPO, STOCK_CERTIFICATE)
+        company._income = 0
+        companies.append(company)
+    return players, companies
+
+
+def certificate_counts(players: List[Player]) -> None:
+    for player in players:
+        player.getCertificateCount()
+
+
+def certificate_recounts(players: List[Player]) -> None:
+    """The from-scratch count, for comparison with the running totals behind ``getCertificateCount``."""
+    for player in players:
+        player.recountCertificates()
+
+
+def holdings(players: List[Player], companies: List[PublicCompany]) -> None:
+    for player in players:
+        for company in companies:
+            player.hasStock(company)
+
+
+def pay_dividends(companies: List[PublicCompany]) -> None:
+    for company in companies:
+        company._income = 100
+        company.payDividends()
+
+
+def run(number: int = 2000) -> dict:
+    results = {}
+    for label, player_cls, company_cls in [("legacy", LegacyPlayer, LegacyPublicCompany),
+                                           ("cached", Player, PublicCompany)]:
+        players, companies = build(player_cls, company_cls)
+        results[label] = {
+            "getCertificateCount": timeit.timeit(lambda: certificate_counts(players), number=number),
+            "recountCertificates": timeit.timeit(lambda: certificate_recounts(players), number=number),
+            "hasStock": timeit.timeit(lambda: holdings(players, companies), number=number),
+            "payDividends": timeit.timeit(lambda: pay_dividends(companies), number=number),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    results = run()
+    for path in ["getCertificateCount", "recountCertificates", "hasStock", "payDividends"]:
+        legacy = results["legacy"][path]
+        cached = results["cached"][path]
+        print("{:<20} legacy {:.4f}s  cached {:.4f}s  ({:.1f}x)".format(path, legacy, cached, legacy / cached))
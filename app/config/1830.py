@@ -39,6 +39,30 @@ SPECIAL_HEX_RULES = {
     "G15": "SVR base hex",
 }
 
+# Tile id -> copies in the box, from the 1830 tile sheet.  Track is in app.tiles.STANDARD_TILES.
+TILE_MANIFEST = {
+    "1": 1, "2": 1, "3": 2, "4": 2, "7": 4, "8": 8, "9": 7, "55": 1, "56": 1, "57": 4, "58": 2, "59": 2, "69": 1,
+    "14": 3, "15": 2, "16": 1, "18": 1, "19": 1, "20": 1, "23": 3, "24": 3, "25": 1, "26": 1, "27": 1, "28": 1,
+    "29": 1, "53": 2, "54": 1, "64": 1, "65": 1, "66": 1, "67": 1, "68": 1,
+    "39": 1, "40": 1, "41": 2, "42": 2, "43": 2, "44": 1, "45": 2, "46": 2, "47": 1, "61": 2, "62": 1, "63": 3,
+    "70": 1,
+}
+TILE_MANIFEST_COMPLETE = True
+
+# Hexes whose tiles must carry a label: New York, Boston and Baltimore, and the double-city (OO) hexes
+HEX_LABELS = {
+    "G19": "NY",
+    "E23": "B", "I15": "B",
+    "D10": "OO", "E5": "OO", "E11": "OO", "H18": "OO",
+}
+
+# First and last column of each row of the map.  Columns are doubled (see app.hexgrid): A9, A11..., B10, B12...
+MAP_ROWS = {
+    "A": (9, 19), "B": (10, 24), "C": (7, 23), "D": (2, 24), "E": (3, 23), "F": (2, 24),
+    "G": (3, 21), "H": (2, 20), "I": (1, 15), "J": (2, 14), "K": (13, 15),
+}
+HEXES = ["{}{}".format(row, column) for row, (first, last) in MAP_ROWS.items() for column in range(first, last + 1, 2)]
+
 PUBLIC_COMPANIES = [
     PublicCompany.initiate(id="B&O", name="Baltimore & Ohio Railroad", short_name="B&O",
                            tokens_available=4, token_costs=[40, 60, 80, 100]),
@@ -28,6 +28,15 @@ SPECIAL_HEX_RULES = {
     "A1": "Mail Contract base",
 }
 
+# Tile id -> copies in the box.  Track is in app.tiles.STANDARD_TILES.  Only the plain track and city tiles are
+# listed and the counts are not checked against the tile sheet, so the manifest is incomplete: tiles it doesn't list
+# are placed by the colour rules alone.
+TILE_MANIFEST = {
+    "5": 3, "6": 4, "7": 5, "8": 14, "9": 14, "57": 4,
+    "14": 4, "15": 5, "16": 2, "19": 2, "20": 2, "23": 4, "24": 4, "25": 2, "26": 1, "27": 1, "28": 1, "29": 1,
+    "39": 1, "40": 1, "41": 2, "42": 2, "43": 2, "44": 1, "45": 2, "46": 2, "47": 2, "63": 3, "70": 1,
+}
+
 PUBLIC_COMPANIES = [
     PublicCompany.initiate(id="NYC", name="New York Central", short_name="NYC",
                            tokens_available=4, token_costs=[40, 60, 80, 100]),
@@ -29,6 +29,15 @@ SPECIAL_HEX_RULES = {
     "Z1": "SR home hex",
 }
 
+# Tile id -> copies in the box.  Track is in app.tiles.STANDARD_TILES.  Only the plain track and city tiles are
+# listed and the counts are not checked against the tile sheet, so the manifest is incomplete: tiles it doesn't list
+# are placed by the colour rules alone.
+TILE_MANIFEST = {
+    "5": 1, "6": 1, "7": 2, "8": 5, "9": 5, "57": 1,
+    "14": 1, "15": 3, "16": 1, "19": 1, "20": 1, "23": 2, "24": 2, "25": 1, "26": 1, "27": 1, "28": 1, "29": 1,
+    "39": 1, "40": 1, "41": 1, "42": 1, "45": 1, "46": 1, "47": 1, "63": 3,
+}
+
 PUBLIC_COMPANIES = [
     PublicCompany.initiate(id="SR", name="Sanyo Railway", short_name="SR",
                            tokens_available=4, token_costs=[40, 60, 80, 100]),
@@ -0,0 +1,155 @@
+"""Cheap copies of a running game for search and what-if analysis (see ``Game.fork``).
+
+A fork copies the mutable layer of a game: players, public and private companies, round bookkeeping, turn
+order and the live minigames.  Each entity is a shallow copy with its own containers, and every cross-reference
+between entities (owners, presidents, portfolios, bids...) is re-pointed at the fork's copies.  Everything that
+moves never change is shared with the parent: the config module, stock market grids, trains and cells.  Boards
+held by minigames are forked copy-on-write, so tiles are only copied once a token or track is placed on them."""
+
+import copy
+from typing import Dict, Any
+
+from app.base import Player, PublicCompany, PlayerBid, MutableGameState, ShareLedger, \
+    LedgerColumn, EntityRegistry, GameBoard, Token, OperatingOrder
+
+
+def _slots(cls) -> tuple:
+    return tuple(name for klass in cls.__mro__ for name in getattr(klass, "__slots__", ()))
+
+
+PLAYER_SLOTS = _slots(Player)
+PUBLIC_COMPANY_SLOTS = _slots(PublicCompany)
+
+
+class GameForker:
+    def __init__(self):
+        self.copies: Dict[int, Any] = {}  # id(original entity) -> fork's copy
+
+    def get(self, entity):
+        return self.copies.get(id(entity), entity)
+
+    def _clone_slots(self, entity, slots):
+        clone = type(entity).__new__(type(entity), entity._id)
+        for name in slots:
+            try:
+                object.__setattr__(clone, name, object.__getattribute__(entity, name))
+            except AttributeError:
+                pass
+        self.copies[id(entity)] = clone
+        return clone
+
+    def _clone_dict(self, entity):
+        clone = copy.copy(entity)
+        self.copies[id(entity)] = clone
+        return clone
+
+    def fork(self, game):
+        state: MutableGameState = game.state
+        players = [self._clone_slots(player, PLAYER_SLOTS) for player in state.players or []]
+        public_companies = [self._clone_slots(company, PUBLIC_COMPANY_SLOTS)
+                            for company in state.public_companies or []]
+        private_companies = [self._clone_dict(company) for company in state.private_companies or []]
+
+        ledger = self.forkLedger(state.share_ledger) if state.share_ledger is not None else None
+
+        for player in players:
+            player._portfolio = set(self.get(company) for company in player._portfolio)
+            player.private_companies = set(self.get(company) for company in player.private_companies)
+            player.sold_this_round = set(self.get(company) for company in player.sold_this_round)
+            player._ledger = ledger if player._ledger is not None else None
+
+        for company in public_companies:
+            if company._ledger is not None:
+                company._ledger = ledger
+                company._owners = LedgerColumn(ledger, company)
+            else:
+                company._owners = {self.get(player): amount for player, amount in company._owners.items()}
+            company._president = self.get(company._president)
+            company._ranking = company._ranking.copy(self.get)
+            company.stockPrice = dict(company.stockPrice)
+            company.stocks = dict(company.stocks)
+            company.tokens = [Token(self.get(token.company), token.location, token.cost) for token in company.tokens]
+            if company.trains is not None:
+                company.trains = list(company.trains)
+
+        for company in private_companies:
+            company.belongs_to = self.get(company.belongs_to)
+            company.belongs_to_company = self.get(company.belongs_to_company)
+            if company.player_bids is not None:
+                company.player_bids = [PlayerBid(self.get(bid.player), bid.bid_amount) for bid in company.player_bids]
+            if company.passed_by is not None:
+                company.passed_by = [self.get(player) for player in company.passed_by]
+
+        forked_state = copy.copy(state)
+        self.copies[id(state)] = forked_state
+        forked_state.players = self.forkRegistry(state.players, players)
+        forked_state.public_companies = self.forkRegistry(state.public_companies, public_companies)
+        forked_state.private_companies = self.forkRegistry(state.private_companies, private_companies)
+        forked_state.share_ledger = ledger
+        forked_state.auction = list(state.auction) if state.auction is not None else None
+        forked_state.auctioned_private_company = self.get(state.auctioned_private_company)
+        forked_state.sales = state.sales.copy(self.get)
+        forked_state.purchases = state.purchases.copy(self.get)
+        forked_state.priority_deal_player = self.get(state.priority_deal_player)
+        forked_state.track_laid = set(state.track_laid)
+
+        forked = copy.copy(game)
+        forked.state = forked_state
+        forked.current_player = self.get(game.current_player)
+        forked.player_order_fn_list = [self.forkTurnOrder(order) for order in game.player_order_fn_list]
+        forked.minigames = {name: self.forkMinigame(minigame) for name, minigame in game.minigames.items()}
+        forked.errors_list = list(game.errors_list)
+        forked.operating_order = list(game.operating_order)
+        forked.last_operating_order = list(game.last_operating_order)
+        forked._operating = self.forkOperatingOrder(game._operating) if game._operating is not None else None
+        for company in public_companies:
+            if company._operating_order is not None:
+                company._operating_order = self.get(company._operating_order)
+        forked.history = None
+        return forked
+
+    def forkRegistry(self, registry, entities):
+        if registry is None:
+            return None
+        forked = EntityRegistry(entities, registry.key)
+        self.copies[id(registry)] = forked
+        return forked
+
+    def forkLedger(self, ledger: ShareLedger) -> ShareLedger:
+        forked = ShareLedger.__new__(ShareLedger)
+        forked.players = [self.get(player) for player in ledger.players]
+        forked.companies = [self.get(company) for company in ledger.companies]
+        forked.width = ledger.width
+        forked.shares = ledger.shares[:]
+        return forked
+
+    def forkOperatingOrder(self, order: OperatingOrder) -> OperatingOrder:
+        forked = copy.copy(order)
+        self.copies[id(order)] = forked
+        forked.companies = self.get(order.companies)
+        forked.operating = [self.get(company) for company in order.operating]
+        forked._keys = list(order._keys)
+        forked._positions = None
+        return forked
+
+    def forkTurnOrder(self, order):
+        forked = copy.copy(order)
+        forked.state = self.get(order.state)
+        forked.players = self.get(order.players) if id(order.players) in self.copies else \
+            [self.get(player) for player in order.players]
+        forked.initial_player = self.get(order.initial_player)
+        return forked
+
+    def forkMinigame(self, minigame):
+        forked = copy.copy(minigame)
+        forked.error_list = list(minigame.error_list)
+        for name, value in vars(minigame).items():
+            if isinstance(value, GameBoard):
+                setattr(forked, name, value.fork())
+            elif id(value) in self.copies:
+                setattr(forked, name, self.get(value))
+        return forked
+
+
+def fork_game(game):
+    return GameForker().fork(game)
@@ -0,0 +1,109 @@
+"""Hex map geometry.
+
+Hexes are named like the printed maps: a row letter followed by a column number ("A1", "G15").  Columns are
+doubled: every second row is shifted half a hex, and the column numbers count half hexes, so every hex of a map has
+the same parity of row + column (on the 1830 map: A9, A11..., B10, B12...).  A hex touches the hexes two columns to
+its left and right in the same row, and one column either side in the rows above and below (G19 touches G17, G21,
+F18, F20, H18 and H20).
+
+A ``HexGrid`` numbers the hexes of one map and precomputes their neighbours once, so board queries are integer
+lookups rather than string parsing.  Each variant lists its map's hexes as ``HEXES`` (see ``grid_for``).
+"""
+
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Edge directions, clockwise from the right-hand edge of a pointy-topped hex.  These line up with tile rotations.
+EAST, SOUTH_EAST, SOUTH_WEST, WEST, NORTH_WEST, NORTH_EAST = range(6)
+EDGES = 6
+
+# (row, column) offset of each edge's neighbour.
+_OFFSETS = [(0, 2), (1, 1), (1, -1), (0, -2), (-1, -1), (-1, 1)]
+
+DEFAULT_ROWS = 26
+DEFAULT_COLUMNS = 30
+
+
+def parse_location(location: str) -> Optional[Tuple[int, int]]:
+    """(row, column) of a hex name like "G15", or None if it is not a grid coordinate (eg. "NY")."""
+    if not location or not location[0].isalpha() or not location[1:].isdigit():
+        return None
+    return ord(location[0].upper()) - ord("A"), int(location[1:])
+
+
+def location_name(row: int, column: int) -> str:
+    return "{}{}".format(chr(ord("A") + row), column)
+
+
+def opposite(edge: int) -> int:
+    return (edge + EDGES // 2) % EDGES
+
+
+class HexGrid:
+    """The hexes of a map, numbered 0..n-1, with their neighbours by edge.  Names that are not grid coordinates
+    (eg. "NY") are left out; names whose row + column parity differs from the rest are rejected."""
+
+    def __init__(self, locations: Iterable[str]):
+        self.locations: List[str] = []
+        self.ids: Dict[str, int] = {}
+        coordinates: Dict[Tuple[int, int], int] = {}
+        for location in locations:
+            position = parse_location(location)
+            if position is None or location in self.ids:
+                continue
+            if coordinates and sum(position) % 2 != sum(next(iter(coordinates))) % 2:
+                raise ValueError("{} is not on the same doubled-column grid as {}".format(
+                    location, self.locations[0]))
+            self.ids[location] = len(self.locations)
+            coordinates[position] = len(self.locations)
+            self.locations.append(location)
+
+        # neighbours_by_edge[hex][edge] is the hex across that edge, or -1 off the map.
+        self.neighbours_by_edge: List[Tuple[int, ...]] = [()] * len(self.locations)
+        self.neighbours: List[FrozenSet[int]] = [frozenset()] * len(self.locations)
+        self._edges: Dict[Tuple[int, int], int] = {}
+        for (row, column), hex_id in coordinates.items():
+            by_edge = tuple(coordinates.get((row + d_row, column + d_column), -1) for d_row, d_column in _OFFSETS)
+            self.neighbours_by_edge[hex_id] = by_edge
+            self.neighbours[hex_id] = frozenset(n for n in by_edge if n >= 0)
+            for edge, neighbour in enumerate(by_edge):
+                if neighbour >= 0:
+                    self._edges[hex_id, neighbour] = edge
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def rectangle(rows: int = DEFAULT_ROWS, columns: int = DEFAULT_COLUMNS) -> "HexGrid":
+        """A map of ``rows`` rows and ``columns`` columns: A1, A3..., B2, B4...  Used by boards without a variant.
+        Shared, since grids are never modified."""
+        return HexGrid(location_name(row, column)
+                       for row in range(rows) for column in range(1 + row % 2, columns + 1, 2))
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def __contains__(self, location: str) -> bool:
+        return location in self.ids
+
+    def hexId(self, location: str) -> Optional[int]:
+        return self.ids.get(location)
+
+    def adjacent(self, a: int, b: int) -> bool:
+        return b in self.neighbours[a]
+
+    def edge(self, a: int, b: int) -> Optional[int]:
+        """The edge of ``a`` that it shares with ``b``, or None if they do not touch."""
+        return self._edges.get((a, b))
+
+
+@lru_cache(maxsize=None)
+def _grid(locations: Tuple[str, ...]) -> HexGrid:
+    return HexGrid(locations)
+
+
+def grid_for(config) -> HexGrid:
+    """The map of a variant config module: its ``HEXES``, or the generic ``HexGrid.rectangle()`` if it doesn't list
+    them.  Shared by every board of the variant."""
+    locations = getattr(config, "HEXES", None)
+    if locations is None:
+        return HexGrid.rectangle()
+    return _grid(tuple(locations))
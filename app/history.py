@@ -0,0 +1,95 @@
+"""Append-only move log with periodic snapshots.
+
+Games keep a history only when asked to (``Game.start(..., history=True)``).  Every successful move is recorded as
+the message it was built from; moves that have no message can't be replayed, so such a game refuses them before they
+are played.  Every ``snapshot_interval`` moves a fork of the game (see ``Game.fork``, which is cheap) is kept as well,
+so any position can be rebuilt by replaying at most ``snapshot_interval`` moves from the nearest snapshot (see
+``Game.replay``)."""
+
+import json
+from typing import List, NamedTuple, Dict, Optional, Type
+
+from app.base import Move
+from app.minigames.PrivateCompanyInitialAuction.move import BuyPrivateCompanyMove
+from app.minigames.StockRound.move import StockRoundMove
+from app.minigames.StockRoundSellPrivateCompany.move import AuctionBidMove, AuctionDecisionMove
+from app.minigames.operating_round import OperatingRoundMove
+
+SNAPSHOT_INTERVAL = 50
+
+MOVE_CLASSES: Dict[str, Type[Move]] = {
+    "BuyPrivateCompanyMove": BuyPrivateCompanyMove,
+    "StockRoundMove": StockRoundMove,
+    "AuctionBidMove": AuctionBidMove,
+    "AuctionDecisionMove": AuctionDecisionMove,
+    "OperatingRoundMove": OperatingRoundMove,
+}
+
+
+class LoggedMove(NamedTuple):
+    move_class: str
+    msg: str
+
+    @staticmethod
+    def fromMove(move: Move) -> "LoggedMove":
+        if not LoggedMove.canLog(move):
+            raise ValueError("Move {} cannot be logged; only moves built from messages can be replayed".format(
+                move.__class__.__name__))
+        return LoggedMove(move.__class__.__name__, move.msg)
+
+    @staticmethod
+    def canLog(move: Move) -> bool:
+        return move.__class__.__name__ in MOVE_CLASSES and getattr(move, "msg", None) is not None
+
+    def toMove(self) -> Move:
+        """Rebuilds the move from its message, exactly as a client would have submitted it."""
+        cls = MOVE_CLASSES.get(self.move_class)
+        if cls is None or self.msg is None:
+            raise ValueError("Move {} cannot be replayed; only moves built from messages are".format(
+                self.move_class))
+        return cls.fromMove(Move.fromMessage(self.msg))
+
+
+class GameHistory:
+    def __init__(self, snapshot_interval: int = SNAPSHOT_INTERVAL):
+        self.snapshot_interval = snapshot_interval
+        self.moves: List[LoggedMove] = []
+        self.snapshots: Dict[int, "Game"] = {}  # Move index -> fork of the game before that move
+        self.initial_minigame: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def needsSnapshot(self) -> bool:
+        return len(self.moves) % self.snapshot_interval == 0 and len(self.moves) not in self.snapshots
+
+    def addSnapshot(self, game: "Game") -> None:
+        if not self.snapshots:
+            self.initial_minigame = game.minigame_class
+        self.snapshots[len(self.moves)] = game
+
+    def append(self, move: Move) -> None:
+        self.moves.append(LoggedMove.fromMove(move))
+
+    def truncate(self, length: int) -> None:
+        """Forgets every move (and snapshot) after the first ``length`` moves."""
+        del self.moves[length:]
+        for index in [i for i in self.snapshots if i > length]:
+            del self.snapshots[index]
+
+    def nearestSnapshot(self, index: int) -> Optional[int]:
+        """Index of the latest snapshot taken at or before move ``index``, or None if there is none yet.  The
+        first snapshot is taken before the first move, so that only happens while no move has been played."""
+        if index < 0 or index > len(self.moves):
+            raise IndexError("Move {} is outside of this game's history (0 - {})".format(index, len(self.moves)))
+        return max((i for i in self.snapshots if i <= index), default=None)
+
+    def toDict(self) -> dict:
+        """Serializable form of the log, usable as ``Game.initialize(saved_game=...)``."""
+        return {
+            "minigame_class": self.initial_minigame,
+            "moves": [move._asdict() for move in self.moves],
+        }
+
+    def toJson(self) -> str:
+        return json.dumps(self.toDict())
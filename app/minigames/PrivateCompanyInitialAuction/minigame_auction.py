@@ -13,65 +13,63 @@ from app.minigames.base import Minigame
 
 class BiddingForPrivateCompany(Minigame):
     def validateBid(self, move: BuyPrivateCompanyMove):
-        # User needs to be one of the users who bid already.
-        # User needs to not have passed on this company yet.
-        valid_bidders = [pb.player for pb in move.private_company.player_bids]
-        minimum_bid = max([move.private_company.actual_cost] +
-                          [pb.bid_amount for pb in move.private_company.player_bids]) + 5
-
-        return self.validate([
-            err(
+        def checks():
+            # User needs to be one of the users who bid already.
+            # User needs to not have passed on this company yet.
+            valid_bidders = [pb.player for pb in move.private_company.player_bids]
+            minimum_bid = max([move.private_company.actual_cost] +
+                              [pb.bid_amount for pb in move.private_company.player_bids]) + 5
+
+            yield err(
                 move.player in valid_bidders,
                 "You can't bid on this now, bitterboi."
-            ),
+            )
 
-            err(
+            yield err(
                 move.player not in move.private_company.passed_by,
                 "You can only keep bidding until you've passed once.",
-             ),
+            )
 
-            err(
+            yield err(
                 move.private_company.hasNoOwner(),
                 "Someone already owns this cheatingboi. {0}",
                 move.private_company.belongs_to
-            ),
+            )
 
-            err(
+            yield err(
                 move.player.hasEnoughMoney(move.bid_amount),
                 "You cannot afford poorboi. {} (You have: {})",
                 move.bid_amount, move.player.cash
-            ),
+            )
 
-            err(
+            yield err(
                 move.bid_amount >= minimum_bid,
                 "Your bid is too small weenieboi. {} (Minimum Bid: {})",
                 move.bid_amount, minimum_bid
-            ),
+            )
 
-        ])
+        return self.validate(checks())
 
     def validatePass(self, move: BuyPrivateCompanyMove):
-        valid_bidders = [pb.player for pb in move.private_company.player_bids]
-        is_valid_bidder = move.player in valid_bidders
-        hasnt_passed = move.player not in move.private_company.passed_by
-        other_bidder_remain = len(set(valid_bidders) - set(move.private_company.passed_by)) > 1
-
-        return self.validate([
-            err(
-                is_valid_bidder,
+        def checks():
+            valid_bidders = [pb.player for pb in move.private_company.player_bids]
+
+            yield err(
+                move.player in valid_bidders,
                 "You can't pass on this - heck you can't bid on this.  "
                           "There probably is something wrong with your UI implementation that "
-                          "is letting you make a move."),
+                          "is letting you make a move.")
 
-            err(
-                hasnt_passed,
-                "You already passed on this company."),
+            yield err(
+                move.player not in move.private_company.passed_by,
+                "You already passed on this company.")
 
-            err(
-                other_bidder_remain,
+            yield err(
+                len(set(valid_bidders) - set(move.private_company.passed_by)) > 1,
                 "You are the only bidder left; you can't pass.  You should have received the stock already."
-            ),
-        ])
+            )
+
+        return self.validate(checks())
 
     def validateSold(self, move: BuyPrivateCompanyMove):
         """
@@ -18,82 +18,83 @@ class BuyPrivateCompany(Minigame):
     def validateBuy(self, move: BuyPrivateCompanyMove, kwargs: MutableGameState):
         """Ensures you can buy the Private company;
         Player order validations are out of scope"""
-        private_companies: List[PrivateCompany] = kwargs.private_companies
-        cost_of_private_company = move.private_company.actual_cost
-        wrong_order = [pc.name for pc in private_companies
-                       if pc.order < move.private_company_order and not pc.hasOwner()]
+        def checks():
+            private_companies: List[PrivateCompany] = kwargs.private_companies
+            cost_of_private_company = move.private_company.actual_cost
 
-        return self.validate([
-            err(
+            yield err(
                 move.private_company.hasNoOwner(),
                 "Someone already owns this cheatingboi {} / {}",
                 move.private_company.name, move.player.id
-            ),
+            )
 
-            err(
+            wrong_order = [pc.name for pc in private_companies
+                           if pc.order < move.private_company_order and not pc.hasOwner()]
+            yield err(
                 len(wrong_order) == 0,
                 "You can't buy this yet. {0} needs to be sold first.",
                 ",".join(wrong_order)
-            ),
+            )
 
-            err(
+            yield err(
                 move.player.hasEnoughMoney(cost_of_private_company),
                 "You cannot afford poorboi. {} (You have: {})",
                 cost_of_private_company, move.player.cash
-            ),
+            )
 
-            err(
-                move.player.getCertificateCount() + 1 <=
+            player_certificates = move.player.getCertificateCount()
+            yield err(
+                player_certificates + 1 <=
                 VALID_CERTIFICATE_COUNT[len(kwargs.players)],
                 "You have too many certificates. There are {} players, and you are allowed a total of {} certificates.  You own {} certificates and would have too many if you bought more.",
                 len(kwargs.players),
                 VALID_CERTIFICATE_COUNT[len(kwargs.players)],
-                move.player.getCertificateCount(),
-            ),
+                player_certificates,
+            )
 
-            err(
+            yield err(
                 not move.private_company.hasBids(),
                 "You cannot buy something that has a bid on it."
-            ),
+            )
 
-        ])
+        return self.validate(checks())
 
     def validateBid(self, move: BuyPrivateCompanyMove, kwargs: MutableGameState):
-        minimum_bid = max([move.private_company.actual_cost] +
-                          [pb.bid_amount for pb in move.private_company.player_bids]) + 5
+        def checks():
+            minimum_bid = max([move.private_company.actual_cost] +
+                              [pb.bid_amount for pb in move.private_company.player_bids]) + 5
 
-        earlier_unsold_private_companies = [pc.name for pc in kwargs.private_companies
-                       if pc.order < move.private_company_order and not pc.hasOwner()]
+            yield err(move.private_company.hasNoOwner(),
+                      "Someone already owns this cheatingboi {} {}",
+                      move.private_company.order,
+                      move.private_company.belongs_to,
+                      )
 
-        return self.validate([
-            err(move.private_company.hasNoOwner(),
-                "Someone already owns this cheatingboi {} {}",
-                move.private_company.order,
-                move.private_company.belongs_to,
-                ),
+            yield err(any(pc.order < move.private_company_order and not pc.hasOwner()
+                          for pc in kwargs.private_companies),
+                      "You can't bid on this, it's currently for sale"
+                      )
 
-            err(len(earlier_unsold_private_companies) > 0,
-                "You can't bid on this, it's currently for sale"
-            ),
+            yield err(move.player.hasEnoughMoney(move.bid_amount),
+                      "You cannot afford poorboi. {} (You have: {})",
+                      move.bid_amount, move.player.cash
+                      )
 
-            err(move.player.hasEnoughMoney(move.bid_amount),
-                "You cannot afford poorboi. {} (You have: {})",
-                move.bid_amount, move.player.cash
-            ),
+            yield err(move.bid_amount >= minimum_bid,
+                      "Your bid is too small weenieboi. {} (Minimum Bid: {})",
+                      move.bid_amount, minimum_bid
+                      )
 
-            err(move.bid_amount >= minimum_bid,
-                "Your bid is too small weenieboi. {} (Minimum Bid: {})",
-                move.bid_amount, minimum_bid
-            ),
-        ])
+        return self.validate(checks())
 
     def validatePass(self, move: BuyPrivateCompanyMove, kwargs: MutableGameState):
-        actual_cost = move.private_company.actual_cost
-        return self.validate([
-            err(move.private_company.actual_cost > 0,
-                "You must purchase the private company if its price has been reduced to zero. ({})",
-                actual_cost),
-        ])
+        def checks():
+            actual_cost = move.private_company.actual_cost
+            yield err(move.private_company.actual_cost > 0,
+                      "You must purchase the private company if its price has been reduced to zero. ({})",
+                      actual_cost)
+
+        return self.validate(checks())
 
     def run(self, move: BuyPrivateCompanyMove, kwargs: MutableGameState) -> bool:
         move.backfill(kwargs)
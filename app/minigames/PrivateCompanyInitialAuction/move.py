@@ -35,12 +35,14 @@ class BuyPrivateCompanyMove(Move):
     def backfill(self, game_state: MutableGameState) -> None:
         super().backfill(game_state)
 
-        private_companies = [pc for pc in game_state.private_companies if pc.order == self.private_company_order]
-        self.private_company = private_companies[0]
+        self.private_company = game_state.findPrivateCompany(self.private_company_order)
+        if self.private_company is None:
+            raise ValueError("Private company not found when instantiating move")
 
     @staticmethod
     def fromMove(move: "Move") -> "BuyPrivateCompanyMove":
         ret = BuyPrivateCompanyMove()
+        ret.msg = move.msg
         msg: dict = json.loads(move.msg)
         ret.move_type = BidType[msg.get('move_type')]
         ret.private_company_order = msg.get(
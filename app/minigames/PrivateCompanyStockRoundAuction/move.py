@@ -23,7 +23,10 @@ class AuctionBidMove(Move):
         self.amount: int = None
 
     def find_private_company(self, private_company_id: str, state: MutableGameState):
-        return next(pc for pc in state.private_companies if pc.order == private_company_id)
+        private_company = state.findPrivateCompany(private_company_id)
+        if private_company is None:
+            raise ValueError("Private company not found when instantiating move")
+        return private_company
 
     def backfill(self, state: MutableGameState) -> None:
         super().backfill(state)
@@ -32,6 +35,7 @@ class AuctionBidMove(Move):
     @staticmethod
     def fromMove(move: "Move") -> "AuctionBidMove":
         ret = AuctionBidMove()
+        ret.msg = move.msg
 
         msg: dict = json.loads(move.msg)
         ret.private_company_id = int(msg.get('private_company_id'))
@@ -57,14 +61,15 @@ class AuctionDecisionMove(Move):
         self.private_company: PrivateCompany = None
 
     def find_private_company(self, private_company_id: str, state: MutableGameState):
-        return next(pc for pc in state.private_companies if pc.order == int(private_company_id))
+        private_company = state.findPrivateCompany(int(private_company_id))
+        if private_company is None:
+            raise ValueError("Private company not found when instantiating move")
+        return private_company
 
     def backfill(self, state: MutableGameState) -> None:
         super().backfill(state)
         self.private_company = state.auctioned_private_company
-        for player in state.players:
-            if player.id == self.accepted_player_id:
-                self.accepted_player = player
+        self.accepted_player = state.findPlayer(self.accepted_player_id)
         for player_id, amount in state.auction:
             if player_id == self.accepted_player_id:
                 self.accepted_amount = amount
@@ -72,6 +77,7 @@ class AuctionDecisionMove(Move):
     @staticmethod
     def fromMove(move: "Move") -> "AuctionDecisionMove":
         ret = AuctionDecisionMove()
+        ret.msg = move.msg
 
         msg: dict = json.loads(move.msg)
         ret.private_company_id = msg.get('private_company_id')
@@ -1,8 +1,7 @@
-from functools import reduce
-from typing import List, Optional
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
 
 from app.base import PublicCompany, StockPurchaseSource, Player, err, MutableGameState, STOCK_CERTIFICATE, \
-    STOCK_PRESIDENT_CERTIFICATE
+    STOCK_PRESIDENT_CERTIFICATE, ValidationFailure, MarketEvent
 from app.minigames.StockRound.const import (
     VALID_CERTIFICATE_COUNT,
     VALID_IPO_PRICES,
@@ -11,7 +10,57 @@ from app.minigames.StockRound.const import (
 )
 from app.minigames.StockRound.enums import StockRoundType
 from app.minigames.StockRound.move import StockRoundMove
-from app.minigames.base import Minigame
+from app.minigames.base import Minigame, ValidationMode
+
+
+class StockBuy(NamedTuple):
+    company: PublicCompany
+    source: StockPurchaseSource
+    ipo_price: int  # The par price of a first purchase; 0 otherwise
+
+
+class StockRoundOptions(NamedTuple):
+    """What a player may do in the stock round.  Passing is always allowed.
+
+    A BUYSELL may pair any buy with sales of any of ``sales`` (one amount per company): each part is checked
+    on its own against the position before the move."""
+    buys: List[StockBuy]
+    sales: Dict[PublicCompany, List[int]]  # Company -> the amounts of its stock that may be sold
+
+    def messages(self, player_id: str) -> List[dict]:
+        """PASS, every BUY and every single-company SELL, as move messages (see ``StockRoundMove.fromMove``)."""
+        messages = [{"move_type": "PASS", "player_id": player_id}]
+        for buy in self.buys:
+            messages.append({"move_type": "BUY", "player_id": player_id, "public_company_id": buy.company.id,
+                             "source": buy.source.name, "ipo_price": buy.ipo_price})
+        for company, amounts in self.sales.items():
+            for amount in amounts:
+                messages.append({"move_type": "SELL", "player_id": player_id,
+                                 "for_sale_raw": [[company.id, amount]]})
+        return messages
+
+
+class SaleOutcome(NamedTuple):
+    """What selling ``amount`` of ``company`` would do."""
+    company: PublicCompany
+    amount: int
+    proceeds: int  # What the stock fetches at the bank price before the sale
+    price: int  # Bank price after the sale
+    stock_pos: Tuple[int, int]  # Market position after the sale
+    bank_pool: int  # Stock in the bank pool after the sale
+    president: Optional[Player]  # President after the sale
+
+
+class SalePlan(NamedTuple):
+    """A whole (possibly multi-company) sale, checked and priced by ``StockRound.evaluateSales``."""
+    player: Player
+    outcomes: List[SaleOutcome]  # One per company, in the order first listed
+    proceeds: int  # What the sale is worth; selling doesn't pay the seller (see ``PublicCompany.sell``)
+    errors: List[ValidationFailure]
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
 
 
 class StockRound(Minigame):
@@ -19,6 +68,8 @@ class StockRound(Minigame):
 
     def __init__(self) -> None:
         super().__init__()
+        # One instance plays a whole stock round (see ``Game.getMinigame``).  The auction flag is about the move
+        # being played and is reset by ``run``; the last player to deal is kept for the round's priority deal.
         self.sell_private_company_auction = False
         self.last_deal_player: Optional[Player] = None
 
@@ -34,24 +85,15 @@ class StockRound(Minigame):
         move.public_company.checkPresident()
         move.public_company.checkFloated()
 
-        purchase_history = kwargs.purchases[kwargs.stock_round_count]
-        try:
-            purchase_history[move.player].append(move.public_company)
-        except KeyError:
-            purchase_history[move.player] = [move.public_company]
+        kwargs.purchases.record(kwargs.stock_round_count, move.player, move.public_company)
 
     def _sellround(self, move: StockRoundMove, kwargs: MutableGameState) -> None:
-        sale_history = kwargs.sales[kwargs.stock_round_count]
-        for company, amount in move.for_sale:
+        for company, amount in self._mergeSales(move.for_sale).items():
             company.sell(move.player, amount)
             company.priceDown(amount)
             company.checkPresident()
             move.player.sold_this_round.add(company)
-
-            try:
-                sale_history[move.player].append(company)
-            except KeyError:
-                sale_history[move.player] = [company]
+            kwargs.sales.record(kwargs.stock_round_count, move.player, company)
 
     def _buysell(self, move: StockRoundMove, kwargs: MutableGameState) -> bool:
         if not self.validateBuy(move, kwargs) or not self.validateSales(move, kwargs):
@@ -83,6 +125,7 @@ class StockRound(Minigame):
         return True
 
     def run(self, move: StockRoundMove, kwargs: MutableGameState) -> bool:
+        self.sell_private_company_auction = False
         move.backfill(kwargs)
 
         if StockRoundType(move.move_type) == StockRoundType.BUYSELL:
@@ -130,7 +173,9 @@ class StockRound(Minigame):
 
     @staticmethod
     def onStart(kwargs: MutableGameState) -> None:
-        pass
+        """Opens this stock round's purchase and sale history."""
+        kwargs.purchases.ensure(kwargs.stock_round_count)
+        kwargs.sales.ensure(kwargs.stock_round_count)
 
     @staticmethod
     def onComplete(kwargs: MutableGameState) -> None:
@@ -148,121 +193,204 @@ class StockRound(Minigame):
     @staticmethod
     def onTurnComplete(kwargs: MutableGameState):
         """Transitioning out of the stock round: increment stock values."""
-        super().onTurnComplete(kwargs)
+        Minigame.onTurnComplete(kwargs)
+
+    def legalMoves(self, player: Player, kwargs: MutableGameState) -> StockRoundOptions:
+        """Every buy and sale ``player`` could make, by the rules of ``validateBuy``, ``validateFirstPurchase`` and
+        ``_validateSale``.  What those rules look up per move (certificates, the companies sold and bought this
+        round, the bank pool) is worked out once for all the candidates."""
+        certificates = player.getCertificateCount()
+        certificate_limit = VALID_CERTIFICATE_COUNT[len(kwargs.players)]
+        sold = player.sold_this_round
+
+        buys = []
+        for company in kwargs.public_companies:
+            if company in sold:
+                continue
+            held = player.hasStock(company)
+            if company.availableStock(StockPurchaseSource.IPO) == ALL_AVAILABLE_STOCK:
+                if certificates + 2 > certificate_limit or held + STOCK_PRESIDENT_CERTIFICATE > 60:
+                    continue
+                for ipo_price in VALID_IPO_PRICES:
+                    cost = company.checkPrice(StockPurchaseSource.IPO, STOCK_PRESIDENT_CERTIFICATE, ipo_price)
+                    if player.hasEnoughMoney(cost) and player.hasEnoughMoney(
+                            company.checkPrice(StockPurchaseSource.IPO, STOCK_CERTIFICATE, ipo_price)):
+                        buys.append(StockBuy(company, StockPurchaseSource.IPO, ipo_price))
+                continue
+            if certificates + 1 > certificate_limit or held + STOCK_CERTIFICATE > 60:
+                continue
+            for source in StockPurchaseSource:
+                if company.hasStock(source, STOCK_CERTIFICATE) and \
+                        player.hasEnoughMoney(company.checkPrice(source, STOCK_CERTIFICATE, 0)):
+                    buys.append(StockBuy(company, source, 0))
+
+        sales = {}
+        if kwargs.stock_round_count > 1:
+            purchases = kwargs.purchases
+            for company in kwargs.public_companies:
+                held = player.hasStock(company)
+                if not held or purchases.contains(kwargs.stock_round_count, player, company):
+                    continue
+                most = min(held, BANK_POOL_LIMIT - company.availableStock(StockPurchaseSource.BANK))
+                if not company.canDumpPresidency(player):
+                    most = min(most, held - STOCK_PRESIDENT_CERTIFICATE)  # Someone has to stay president
+                amounts = list(range(STOCK_CERTIFICATE, most + 1, STOCK_CERTIFICATE))
+                if amounts:
+                    sales[company] = amounts
+
+        return StockRoundOptions(buys, sales)
 
     def validateBuy(self, move: StockRoundMove, kwargs: MutableGameState) -> bool:
-        number_of_total_players = len(kwargs.players)
-        player_certificates = move.player.getCertificateCount()
-        cost_of_stock = move.public_company.checkPrice(
-            move.source,
-            STOCK_CERTIFICATE,
-            move.ipo_price)
-
-        certs_needed = 2 if self.isFirstPurchase(move) else 1
-        my_sales = kwargs.sales[kwargs.stock_round_count].get(move.player, [])
-
-        return self.validate([
-            err(
+        def checks():
+            number_of_total_players = len(kwargs.players)
+            first_purchase = self.isFirstPurchase(move)
+
+            yield err(
                 move.public_company not in move.player.sold_this_round,
                 "You can't buy from a company you sold this round {} {}",
-                move.public_company.id, move.public_company.name),
-            err(
+                move.public_company.id, move.public_company.name)
+
+            player_certificates = move.player.getCertificateCount()
+            certs_needed = 2 if first_purchase else 1
+            yield err(
                 player_certificates + certs_needed <= VALID_CERTIFICATE_COUNT[number_of_total_players],
                 "You have too many certificates. There are {} players, and you are allowed a "
                 "total of {} certificates.  You own {} certificates and would have too many if you bought more.",
                 number_of_total_players,
                 VALID_CERTIFICATE_COUNT[number_of_total_players],
-                player_certificates),
-            err(
+                player_certificates)
+
+            yield err(
                 move.player.hasStock(move.public_company) +
-                (STOCK_PRESIDENT_CERTIFICATE if self.isFirstPurchase(move) else STOCK_CERTIFICATE)
+                (STOCK_PRESIDENT_CERTIFICATE if first_purchase else STOCK_CERTIFICATE)
                 <= 60,
                 "You can't own more than 60% of a company {} {}",
-                move.public_company.id, move.public_company.name),
-            err(
+                move.public_company.id, move.public_company.name)
+
+            yield err(
                 move.public_company.hasStock(move.source, STOCK_CERTIFICATE),
                 "The company does not have enough stock in category {}",
-                move.source),
-            err(
+                move.source)
+
+            cost_of_stock = move.public_company.checkPrice(
+                move.source,
+                STOCK_CERTIFICATE,
+                move.ipo_price)
+            yield err(
                 move.player.hasEnoughMoney(cost_of_stock),
                 "You cannot afford poorboi. {} (You have: {})",
-                cost_of_stock, move.player.cash),
-        ])
+                cost_of_stock, move.player.cash)
 
-    def _validateSale(self, player: Player, company: PublicCompany, amount: int, kwargs: MutableGameState):
-        """You can't sell stocks you bought in previous rounds."""
-        my_purchases = kwargs.purchases[kwargs.stock_round_count].get(player, [])
+        return self.validate(checks())
 
+    def _saleChecks(self, player: Player, company: PublicCompany, amount: int, kwargs: MutableGameState):
+        """You can't sell stocks you bought in previous rounds."""
         my_stock = player.hasStock(company)
-        potential_owners = company.potentialPresidents()
-
-        validations = [
-            err(company not in my_purchases,
-                "You can't sell something you already bought: {} {}",
-                company.id, company.short_name),
-
-            err(
-                my_stock >= amount,
-                "You must have as much stock than you are trying to sell {}",
-                amount
-            ),
-
-            err(
-                company.availableStock(StockPurchaseSource.BANK) + amount
-                <= BANK_POOL_LIMIT,
-                "You can't sell that much ({}); the bank can only have {} shares max.",
-                amount,
-                BANK_POOL_LIMIT,
-            ),
-
-            err(
-                len(company.potentialPresidents() - {player}) > 0 or my_stock - amount >= 20,
-                "There are no other potential presidents, so you can't sell your shares. {} / {} (original stock: {})",
-                ",".join([p.id for p in company.potentialPresidents()]),
-                company.name,
-                str(company.owners.get(player))
-
-            ),
-
-            err(amount % STOCK_CERTIFICATE == 0,
-                "You can only sell in units of 10 stocks ({})".format(amount),
-                ),
-
-            err(kwargs.stock_round_count > 1,
-                "You can only sell after the first stock round.")
-        ]
-
-        return self.validate(validations)
 
-    def validateSales(self, move: StockRoundMove, kwargs: MutableGameState) -> bool:
-        """Used in situations where there are multiple companies that are performing a sale."""
-        data = [self._validateSale(move.player, company, amount, kwargs)
-                for company, amount in move.for_sale]
+        yield err(not kwargs.purchases.contains(kwargs.stock_round_count, player, company),
+                  "You can't sell something you already bought: {} {}",
+                  company.id, company.short_name)
 
-        return reduce(
-            lambda x, y: x and y,
-            data
+        yield err(
+            my_stock >= amount,
+            "You must have as much stock than you are trying to sell {}",
+            amount
         )
 
+        yield err(
+            company.availableStock(StockPurchaseSource.BANK) + amount
+            <= BANK_POOL_LIMIT,
+            "You can't sell that much ({}); the bank can only have {} shares max.",
+            amount,
+            BANK_POOL_LIMIT,
+        )
+
+        can_dump = company.canDumpPresidency(player)
+        yield err(
+            can_dump or my_stock - amount >= 20,
+            "There are no other potential presidents, so you can't sell your shares. {} / {} (original stock: {})",
+            # Shown only when nobody else can take over, so the seller is the only possible potential president
+            player.id if my_stock >= STOCK_PRESIDENT_CERTIFICATE else "",
+            company.name,
+            str(company.owners.get(player))
+        )
+
+        yield err(amount % STOCK_CERTIFICATE == 0,
+                  "You can only sell in units of 10 stocks ({})",
+                  amount)
+
+        yield err(kwargs.stock_round_count > 1,
+                  "You can only sell after the first stock round.")
+
+    def _validateSale(self, player: Player, company: PublicCompany, amount: int, kwargs: MutableGameState):
+        return self.validate(self._saleChecks(player, company, amount, kwargs))
+
+    @staticmethod
+    def _mergeSales(for_sale: Sequence[Tuple[PublicCompany, int]]) -> Dict[PublicCompany, int]:
+        """Amount to sell of each company, adding up amounts listed more than once, in the order first listed."""
+        amounts: Dict[PublicCompany, int] = {}
+        for company, amount in for_sale:
+            amounts[company] = amounts.get(company, 0) + amount
+        return amounts
+
+    def evaluateSales(self, player: Player, for_sale: Sequence[Tuple[PublicCompany, int]],
+                      kwargs: MutableGameState) -> SalePlan:
+        """Checks and prices a whole sale in one pass, without changing anything: the player's cash, each company's
+        price, market position, bank pool and president afterwards, and every rule the sale breaks (only the first
+        in FIRST_FAILURE mode).  Amounts listed more than once for a company are added up, as ``_sellround`` sells
+        them."""
+        outcomes = []
+        errors = []
+        proceeds = 0
+        first_failure = self.validation_mode == ValidationMode.FIRST_FAILURE
+        for company, amount in self._mergeSales(for_sale).items():
+            for failure in self._saleChecks(player, company, amount, kwargs):
+                if failure is not None:
+                    errors.append(failure)
+                    if first_failure:
+                        return SalePlan(player, outcomes, proceeds, errors)
+
+            worth = int(company.checkPrice(StockPurchaseSource.BANK, amount, 0))
+            market = company.stock_market
+            stock_pos = company.stock_pos
+            if market:
+                if amount // STOCK_CERTIFICATE > 0:
+                    stock_pos = market.destination(*stock_pos, MarketEvent.SALE, amount // STOCK_CERTIFICATE)
+                price = market.cell(*stock_pos).price
+            else:
+                price = max(0, company.stockPrice[StockPurchaseSource.BANK] - (amount // STOCK_CERTIFICATE) * 10)
+            proceeds += worth
+            outcomes.append(SaleOutcome(company, amount, worth, price, stock_pos,
+                                        company.availableStock(StockPurchaseSource.BANK) + amount,
+                                        company.presidentAfterSale(player, amount)))
+        return SalePlan(player, outcomes, proceeds, errors)
+
+    def validateSales(self, move: StockRoundMove, kwargs: MutableGameState) -> bool:
+        """Used in situations where there are multiple companies that are performing a sale.
+        Every sale is checked and all their errors are kept, unless we only need the first failure."""
+        plan = self.evaluateSales(move.player, move.for_sale, kwargs)
+        self.error_list = plan.errors
+        return plan.valid
+
     def validatePass(self, move: StockRoundMove, kwargs: MutableGameState):
         # As long as you are a player, you can pass
         return True
 
     def validateFirstPurchase(self, move: StockRoundMove) -> bool:
-        cost_of_stock = move.public_company.checkPrice(move.source, STOCK_PRESIDENT_CERTIFICATE, move.ipo_price)
-        valid_ipo_prices = ",".join([str(p) for p in VALID_IPO_PRICES])
-
-        return self.validate([
-            err(move.ipo_price in VALID_IPO_PRICES,
-                "Invalid IPO Price ({}).  Valid prices are {}.",
-                move.ipo_price, valid_ipo_prices
-                ),
-            err(move.source == StockPurchaseSource.IPO,
-                "You need to purchase stock from the IPO as this is an initial purchase", ),
-            err(move.player.hasEnoughMoney(cost_of_stock),
-                "You cannot afford to be president poorboi. {} (You have: {})",
-                cost_of_stock, move.player.cash, )]
-        )
+        def checks():
+            yield err(move.ipo_price in VALID_IPO_PRICES,
+                      "Invalid IPO Price ({}).  Valid prices are {}.",
+                      move.ipo_price, ",".join([str(p) for p in VALID_IPO_PRICES])
+                      )
+            yield err(move.source == StockPurchaseSource.IPO,
+                      "You need to purchase stock from the IPO as this is an initial purchase", )
+
+            cost_of_stock = move.public_company.checkPrice(move.source, STOCK_PRESIDENT_CERTIFICATE, move.ipo_price)
+            yield err(move.player.hasEnoughMoney(cost_of_stock),
+                      "You cannot afford to be president poorboi. {} (You have: {})",
+                      cost_of_stock, move.player.cash, )
+
+        return self.validate(checks())
 
     def isFirstPurchase(self, move: StockRoundMove) -> bool:
         # When a company is first purchased, all 100% of the stock is owned by the IPO pile.
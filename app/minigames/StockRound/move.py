@@ -21,7 +21,10 @@ class StockRoundMove(Move):
         self.move_type: StockRoundType = None
 
     def find_public_company(self, public_company_id: str, kwargs: MutableGameState):
-        return next(pc for pc in kwargs.public_companies if pc.id == public_company_id)
+        public_company = kwargs.findPublicCompany(public_company_id)
+        if public_company is None:
+            raise ValueError("Public company {} not found when instantiating move".format(public_company_id))
+        return public_company
 
     def backfill(self, game_state: MutableGameState) -> None:
         super().backfill(game_state)
@@ -37,6 +40,7 @@ class StockRoundMove(Move):
     @staticmethod
     def fromMove(move: "Move") -> "StockRoundMove":
         ret = StockRoundMove()
+        ret.msg = move.msg
 
         msg: dict = json.loads(move.msg)
         ret.public_company_id = msg.get('public_company_id')
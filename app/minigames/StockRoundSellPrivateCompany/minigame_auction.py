@@ -28,44 +28,47 @@ class Auction(Minigame):
             return True
 
     def validatePass(self, move: AuctionBidMove, state: MutableGameState):
-        return self.validate([
-            err(
+        def checks():
+            yield err(
                 state.stock_round_count > 1,
                 "You can't sell a private company in the first stock round."
-            ),
-            err(
+            )
+            yield err(
                 move.player != state.auctioned_private_company.belongs_to,
                 "You can't pass (or bid) on your own company.",
                 move.private_company.name,
                 state.auctioned_private_company.name
-            ),
-        ])
+            )
+
+        return self.validate(checks())
 
     def validateBid(self, move: AuctionBidMove, state: MutableGameState):
-        return self.validate([
-            err(
+        def checks():
+            yield err(
                 state.stock_round_count > 1,
                 "You can't sell a private company in the first stock round."
-            ),
-            err(
+            )
+            yield err(
                 move.player.hasEnoughMoney(move.amount),
                 "You cannot afford poorboi. {} (You have: {})",
                 move.amount, move.player.cash
-            ), err(
+            )
+            yield err(
                 move.private_company == state.auctioned_private_company,
                 "You are bidding on the wrong company numbnuts. {} vs. {}"
                 " Probably something wrong with your UI system.",
                 move.private_company.name,
                 state.auctioned_private_company.name
-            ), err(
+            )
+            yield err(
                 move.player != state.auctioned_private_company.belongs_to,
                 "You can't bid on your own company.",
                 move.private_company.name,
                 state.auctioned_private_company.name
-            ), err(
+            )
+            yield err(
                 move.amount >= 0,
                 "Bid must be non-negative."
-            ),
+            )
 
-        ]
-        )
+        return self.validate(checks())
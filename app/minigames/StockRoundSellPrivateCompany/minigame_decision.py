@@ -44,35 +44,37 @@ class AuctionDecision(Minigame):
         :param state:
         :return:
         """
-        return self.validate([
-            err(
+        def checks():
+            yield err(
                 state.stock_round_count > 1,
                 "You can't sell a private company in the first stock round."
-            ),
-            err(
+            )
+            yield err(
                 move.accepted_player_id in [player_id for player_id, amount in state.auction],
                 """You are accepting a bid from a player who didn't make a bid. (ID: "{}")""",
                 move.accepted_player_id
-            ),
-            err(
+            )
+            yield err(
                 move.player == move.private_company.belongs_to,
                 """You can't accept an auction if you do not own the company.""",
-            ),
-            err(
+            )
+            yield err(
                 move.accepted_amount > 0,
                 """You cannot accept invalid bids.""",
-            ),
-        ])
+            )
+
+        return self.validate(checks())
 
     def validateReject(self, move: AuctionDecisionMove, state: MutableGameState):
-        return self.validate([
-            err(
+        def checks():
+            yield err(
                 state.stock_round_count > 1,
                 "You can't sell a private company in the first stock round."
-            ),
-            err(
+            )
+            yield err(
                 move.player == move.private_company.belongs_to,
                 """You can't reject an auction if you do not own the company.""",
                 move.accepted_player_id
-            ),
-        ])
+            )
+
+        return self.validate(checks())
@@ -1,8 +1,14 @@
-from typing import List, Tuple, NamedTuple
+from enum import Enum
+from typing import List, Tuple, NamedTuple, Iterable, Optional, Callable
 
 import logging
 
-from app.base import Move, MutableGameState
+from app.base import Move, MutableGameState, ValidationFailure
+
+
+class ValidationMode(Enum):
+    FULL = 1  # Evaluate every check and report every failure (human clients)
+    FIRST_FAILURE = 2  # Stop at the first failing check (bots, move generators, dry runs)
 
 
 class LifeCycle:
@@ -38,19 +44,36 @@ class Minigame(LifeCycle):
 
     def __init__(self) -> None:
         super().__init__()
-        self.error_list: List[str] = []
+        self.error_list: List[ValidationFailure] = []
+        self.validation_mode: ValidationMode = ValidationMode.FULL
 
     def validate(self,
-                 possible_errors: List[str]):
+                 possible_errors: Iterable[Optional[ValidationFailure]]):
+        """Validators pass their ``err(...)`` checks as a generator, so in FIRST_FAILURE mode the checks after
+        the first failure are never evaluated.  Messages are formatted lazily by ``errors()``."""
         # Clear previous errors before validating a new set of rules
-        self.error_list = [err for err in possible_errors if err is not None]
+        if self.validation_mode == ValidationMode.FIRST_FAILURE:
+            failure = next((err for err in possible_errors if err is not None), None)
+            self.error_list = [] if failure is None else [failure]
+        else:
+            self.error_list = [err for err in possible_errors if err is not None]
         return len(self.error_list) == 0
 
+    def isValid(self, validator: Callable[..., bool], *args) -> bool:
+        """Yes/no answer from ``validator`` (eg. ``minigame.isValid(minigame.validateBuy, move, state)``),
+        stopping at the first failed check."""
+        previous_mode = self.validation_mode
+        self.validation_mode = ValidationMode.FIRST_FAILURE
+        try:
+            return validator(*args)
+        finally:
+            self.validation_mode = previous_mode
+
     def run(self, move: Move, state: MutableGameState) -> bool:
         raise NotImplementedError()
 
     def errors(self) -> List[str]:
-        return self.error_list
+        return [str(err) for err in self.error_list]
 
     def next(self, state: MutableGameState) -> str:
         raise NotImplementedError()
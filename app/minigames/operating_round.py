@@ -1,3 +1,4 @@
+import json
 from typing import List, Any
 
 from app.base import (
@@ -14,6 +15,8 @@ from app.base import (
     err,
 )
 from app.minigames.base import Minigame
+from app.routing import find_routes
+from app.tiles import COLOR_ORDER, hex_label, hex_rule_allows, manifest_for
 
 
 class OperatingRoundMove(Move):
@@ -30,13 +33,48 @@ class OperatingRoundMove(Move):
         self.pay_dividend: bool \
             = False  # Will you pay a dividend? Defaults to False.
         self.routes: List[Route] = None
+        self.public_company_id: str = None
         self.public_company: PublicCompany = None
+        self.token_location: str = None  # Where to place ``token``, when the move comes from a message
         self.token: Token = None
         self.track: Tile = None
         self.train: Train = None
         self.config = None
 
-    pass
+    def backfill(self, game_state: MutableGameState) -> None:
+        super().backfill(game_state)
+        if self.public_company_id is not None:
+            self.public_company = game_state.findPublicCompany(self.public_company_id)
+            if self.public_company is None:
+                raise ValueError("Public company {} not found when instantiating move".format(self.public_company_id))
+        if self.token_location is not None:
+            self.token = Token(self.public_company, self.token_location)
+
+    @staticmethod
+    def fromMove(move: "Move") -> "OperatingRoundMove":
+        ret = OperatingRoundMove()
+        ret.msg = move.msg
+
+        msg: dict = json.loads(move.msg)
+        ret.player_id = msg.get("player_id")
+        ret.public_company_id = msg.get("public_company_id")
+        ret.purchase_token = msg.get("purchase_token")
+        ret.construct_track = msg.get("construct_track")
+        ret.run_route = msg.get("run_route")
+        ret.buy_train = msg.get("buy_train")
+        ret.pay_dividend = msg.get("pay_dividend", False)
+        ret.token_location = msg.get("token")
+        if msg.get("routes") is not None:
+            ret.routes = [Route(list(stops)) for stops in msg["routes"]]
+        track = msg.get("track")
+        if track is not None:
+            ret.track = Tile(track["id"], track["id"], Color[track["color"]], track["location"],
+                             int(track.get("rotation", 0)))
+        train = msg.get("train")
+        if train is not None:
+            ret.train = Train(train["type"], int(train["cost"]), train.get("rusts_on"))
+
+        return ret
 
 
 class RustedTrainMove(Move):
@@ -54,12 +92,16 @@ class OperatingRound(Minigame):
         self.trains_rusted: str = None
 
     def run(self, move: OperatingRoundMove, game_state: MutableGameState, **extra) -> bool:
+        self.rusted_train_type = None  # Only this move's rusting is for ``next`` to handle
         move.backfill(game_state)
         move.board = extra.get("board")
         move.config = extra.get("config")
         # Store board for later checks during ``next``
         self.board = move.board
 
+        if move.run_route and move.routes is None and move.board is not None:
+            move.routes = find_routes(move.board, move.public_company).routes
+
         if move.construct_track and not self.isValidTrackPlacement(move, game_state) or \
             move.purchase_token and not self.isValidTokenPlacement(move) or \
             move.run_route and not self.isValidRoute(move) or \
@@ -94,7 +136,8 @@ class OperatingRound(Minigame):
         if move.purchase_token and self.isValidTokenPlacement(move):
             tile = board.board.get(token.location)
             base = move.public_company.next_token_cost()
-            extra = tile.extra_slots_cost if len(tile.tokens) >= tile.slots and tile.extra_slots_cost is not None else 0
+            occupied = board.occupancy(token.location)
+            extra = tile.extra_slots_cost if occupied >= tile.slots and tile.extra_slots_cost is not None else 0
             total = base + extra
             board.place_token(move.public_company, token.location)
             token = Token(token.company, token.location, total)
@@ -133,14 +176,13 @@ class OperatingRound(Minigame):
     def isValidPaymentOption(self, move: OperatingRoundMove):
         pc = move.public_company
 
-        validations = [
-            err(isinstance(move.pay_dividend, bool),
-                "Dividend choice must be a boolean"),
-            err(pc._income is not None,
-                "Company must calculate income before distributing"),
-        ]
+        def checks():
+            yield err(isinstance(move.pay_dividend, bool),
+                      "Dividend choice must be a boolean")
+            yield err(pc._income is not None,
+                      "Company must calculate income before distributing")
 
-        return self.validate(validations)
+        return self.validate(checks())
 
 
     def isValidTrainPurchase(self, move: OperatingRoundMove):
@@ -148,12 +190,11 @@ class OperatingRound(Minigame):
         pc = move.public_company
         available_trains = move.available_trains if hasattr(move, 'available_trains') else []
 
-        validations = [
-            err(pc.cash >= train.cost, "You don't have enough money"),
-            err(train in available_trains or not available_trains, "That train is not for sale"),
-        ]
+        def checks():
+            yield err(pc.cash >= train.cost, "You don't have enough money")
+            yield err(train in available_trains or not available_trains, "That train is not for sale")
 
-        return self.validate(validations)
+        return self.validate(checks())
 
 
     def isValidRoute(self, move: OperatingRoundMove):
@@ -163,31 +204,20 @@ class OperatingRound(Minigame):
         pc = move.public_company
         routes = move.routes or []
 
-        def parse_loc(loc: str) -> tuple:
-            """Return (row, col) tuple for board coordinates like 'A1'."""
-            if not loc:
-                return (0, 0)
-            row = ord(loc[0].upper())
-            try:
-                col = int(loc[1:])
-            except ValueError:
-                col = 0
-            return row, col
-
         has_company_token = False
         used_stops = set()
         invalid_track = False
         duplicate_stop = False
         disconnected = False
-        capacities: List[int] = [int(''.join(filter(str.isdigit, t.type)) or 0) for t in (pc.trains or [])]
+        unlimited = len(board.board) if board else sum(len(r.stops) for r in routes)
+        capacities: List[int] = [t.capacity if t.capacity is not None else unlimited for t in (pc.trains or [])]
         capacities.sort(reverse=True)
         route_lengths = []
         for route in routes:
             route_seen = set()
             route_lengths.append(len(route.stops))
             for stop in route.stops:
-                tokens_here = board.tokens.get(stop, []) if board else []
-                if any(t.company == pc for t in tokens_here):
+                if board and board.hasStation(pc.id, stop):
                     has_company_token = True
 
                 if board and stop not in board.board and stop not in board.tokens:
@@ -199,15 +229,13 @@ class OperatingRound(Minigame):
                 used_stops.add(stop)
 
             if board and len(route.stops) >= 2:
-                for a, b in zip(route.stops, route.stops[1:]):
-                    if a not in board.board or b not in board.board:
-                        disconnected = True
-                        break
-                    r1, c1 = parse_loc(a)
-                    r2, c2 = parse_loc(b)
-                    if not ((r1 == r2 and abs(c1 - c2) == 1) or (c1 == c2 and abs(r1 - r2) == 1)):
-                        disconnected = True
-                        break
+                if any(stop not in board.board for stop in route.stops):
+                    disconnected = True
+                else:
+                    hex_ids = [board.grid.ids.get(stop) for stop in route.stops]
+                    neighbours = board.grid.neighbours
+                    disconnected = disconnected or None in hex_ids or not all(
+                        b in neighbours[a] for a, b in zip(hex_ids, hex_ids[1:]))
 
         capacities_available = sorted(capacities, reverse=True)
         lengths_sorted = sorted(route_lengths, reverse=True)
@@ -217,41 +245,38 @@ class OperatingRound(Minigame):
                 capacity_ok = False
                 break
 
-        validations = [
-            err(routes != [] and all(len(r.stops) >= 2 for r in routes), "You must join at least two cities"),
-            err(not invalid_track, "Route uses track that doesn't exist"),
-            err(not duplicate_stop, "You cannot use the same station twice"),
-            err(not disconnected, "Route must be a continuous connection"),
-            err(has_company_token, "At least one city must be occupied by that corporation's token"),
-            err(pc.trains is not None and len(pc.trains) >= len(routes) and len(pc.trains) > 0,
-                "You need enough trains for the routes"),
-            err(capacity_ok, "Route length exceeds train capacity"),
-        ]
+        def checks():
+            yield err(routes != [] and all(len(r.stops) >= 2 for r in routes), "You must join at least two cities")
+            yield err(not invalid_track, "Route uses track that doesn't exist")
+            yield err(not duplicate_stop, "You cannot use the same station twice")
+            yield err(not disconnected, "Route must be a continuous connection")
+            yield err(has_company_token, "At least one city must be occupied by that corporation's token")
+            yield err(pc.trains is not None and len(pc.trains) >= len(routes) and len(pc.trains) > 0,
+                      "You need enough trains for the routes")
+            yield err(capacity_ok, "Route length exceeds train capacity")
 
-        return self.validate(validations)
+        return self.validate(checks())
 
     def isValidTokenPlacement(self, move: OperatingRoundMove):
         token = move.token
         board: GameBoard = move.board if hasattr(move, 'board') else None
         tile = board.board.get(token.location) if board else None
-        existing_tokens = tile.tokens if tile else []
-        same_company = [t for t in existing_tokens if t == token.company.id]
+        occupied = board.occupancy(token.location) if tile else 0
 
-        base = token.company.next_token_cost()
-        extra = tile.extra_slots_cost if tile and len(existing_tokens) >= tile.slots and tile.extra_slots_cost is not None else 0
-        total_cost = base + extra
+        def checks():
+            yield err(board is not None and tile is not None, "There is no track there")
+            yield err(tile is not None and (occupied < tile.slots or tile.extra_slots_cost is not None),
+                      "There are no free spots to place a token")
+            yield err(tile is None or token.company.id not in tile.tokens,
+                      "You cannot put two tokens for the same company a location")
+            yield err(token.company.tokens_available > 0, "There are no remaining tokens for that company")
 
-        validations = [
-            err(board is not None and tile is not None, "There is no track there"),
-            err(tile is not None and (len(existing_tokens) < tile.slots or tile.extra_slots_cost is not None),
-                "There are no free spots to place a token"),
-            err(len(same_company) == 0, "You cannot put two tokens for the same company a location"),
-            err(token.company.tokens_available > 0, "There are no remaining tokens for that company"),
-            err(token.company.cash >= total_cost, "You don't have enough cash to buy a token"),
-            err(not token.company.token_placed, "You have already placed a token this round"),
-        ]
+            base = token.company.next_token_cost()
+            extra = tile.extra_slots_cost if tile and occupied >= tile.slots and tile.extra_slots_cost is not None else 0
+            yield err(token.company.cash >= base + extra, "You don't have enough cash to buy a token")
+            yield err(not token.company.token_placed, "You have already placed a token this round")
 
-        return self.validate(validations)
+        return self.validate(checks())
 
     def isValidTrackPlacement(self, move: OperatingRoundMove, state: MutableGameState = None):
         """Validate a track placement considering the current game configuration."""
@@ -261,48 +286,45 @@ class OperatingRound(Minigame):
         config = getattr(move, 'config', None)
         special_rules = getattr(config, 'SPECIAL_HEX_RULES', {}) if config else {}
 
-        color_order = {
-            Color.YELLOW: 1,
-            Color.GREEN: 2,
-            Color.BROWN: 3,
-            Color.RED: 4,
-            Color.GRAY: 5
-        }
-
-        has_company_token = any(
-            any(t.company == move.public_company for t in tokens)
-            for tokens in board.tokens.values()
-        ) if board else False
-
-        already_laid = move.public_company.id in state.track_laid if state else False
-        is_upgrade = existing is not None
-
-        validations = [
-            err(not (already_laid and not is_upgrade), "That company already laid track this round"),
-            err(track.location is not None, "Your track needs to be on a location that exists"),
-            err(existing is None or color_order[track.color] == color_order.get(existing.color, 0) + 1,
-                "Track upgrades must follow the colour progression"),
-            err(existing is not None or has_company_token,
-                "You cannot access that tile from your company"),
-        ]
-
-        if track.location in special_rules:
-            rule = special_rules[track.location]
-            if isinstance(rule, dict):
-                message = rule.get("message", f"Track placement restricted on {track.location}")
-                if rule.get("no_lay") and existing is None:
-                    validations.append(err(False, message))
-                if rule.get("no_upgrade") and existing is not None:
-                    validations.append(err(False, message))
-                allowed_colors = rule.get("allowed_colors")
-                if allowed_colors and track.color not in allowed_colors:
-                    validations.append(err(False, message))
-            else:
-                validations.append(
-                    err(False, f"Track placement restricted on {track.location}: {rule}")
-                )
-
-        return self.validate(validations)
+        manifest = manifest_for(config) if config else None
+
+        def checks():
+            already_laid = move.public_company.id in state.track_laid if state else False
+            is_upgrade = existing is not None
+            rotation = track.rotation or 0
+
+            yield err(not (already_laid and not is_upgrade), "That company already laid track this round")
+            yield err(track.location is not None, "Your track needs to be on a location that exists")
+            yield err(COLOR_ORDER[track.color] == (COLOR_ORDER.get(existing.color, 0) if existing else 0) + 1,
+                      "Track upgrades must follow the colour progression" if existing else
+                      "New track must be yellow")
+
+            if manifest is not None:
+                known = track.id in manifest
+                # An incomplete manifest leaves the tiles it doesn't list to the colour rules.
+                yield err(known or not manifest.complete, "That tile is not part of this game")
+                yield err(not known or board is None
+                          or manifest.remaining(track.id, board.placed(track.id)) > 0,
+                          "There are no more of that tile left")
+                yield err(existing is None or existing.id not in manifest or
+                          manifest.canUpgrade(existing.id, existing.rotation or 0, track.id, rotation),
+                          "That tile cannot replace the one already there")
+                yield err(not known or manifest.label(track.id) == hex_label(config, track.location),
+                          "That tile's label doesn't match the hex ({})", hex_label(config, track.location))
+
+            edges = manifest.edgeMask(track.id, rotation) if manifest is not None and track.id in manifest else None
+            connected = board.canReach(move.public_company, track.location, edges) \
+                if board and existing is None else False
+            yield err(existing is not None or connected,
+                      "You cannot access that tile from your company")
+
+            if track.location in special_rules:
+                rule = special_rules[track.location]
+                message = rule.get("message", f"Track placement restricted on {track.location}") \
+                    if isinstance(rule, dict) else f"Track placement restricted on {track.location}: {rule}"
+                yield err(hex_rule_allows(rule, is_upgrade, track.color), message)
+
+        return self.validate(checks())
 
     def next(self, **kwargs) -> str:
         """Need to pass it to Operating Round or to handle a situation where trains have rusted"""
@@ -0,0 +1,154 @@
+"""Lists the legal track placements on a board.
+
+``TrackPlacements`` answers "which (hex, tile, rotation) could this company lay?" with exactly the placements
+``OperatingRound.isValidTrackPlacement`` accepts under a variant's tile manifest (see ``app.tiles``):
+
+* new yellow track on an empty hex that is one of the company's stations, or with an edge towards its network;
+* an upgrade of any tile on the board that keeps the old tile's connections;
+* ``SPECIAL_HEX_RULES``, ``HEX_LABELS``, the tiles left in the supply, and no new track once the company has laid
+  track this round.
+
+Only tiles the manifest lists are considered, so under an incomplete manifest (see ``TileManifest.complete``) the
+validator may also accept tiles that are not listed here.
+
+What a hex allows depends only on its local situation: the tile on it, or which of its edges face the company's
+network.  Placements are cached per hex under that situation and only worked out again for hexes whose situation
+changed, so after a tile is laid just the hexes around it are looked at again.  The lists of a situation (eg. "empty,
+network to the west") are shared by every hex in it.  A ``TrackPlacements`` belongs to one board; fork it along
+with the board.
+"""
+
+from copy import copy
+from typing import Dict, List, NamedTuple, Tuple
+
+from app.base import Color, GameBoard, MutableGameState, PublicCompany, Reach, Tile
+from app.hexgrid import EDGES
+from app.tiles import COLOR_ORDER, hex_label, hex_rule_allows, manifest_for
+
+# (tile id, rotation, colour) of each tile a hex in some situation can take.
+_Options = Tuple[Tuple[str, int, Color], ...]
+# A hex's situation: (tile id, rotation, colour) of its tile for upgrades; (edges facing the network, whether it is
+# a station) for new track.
+_Situation = tuple
+
+
+class TrackPlacement(NamedTuple):
+    location: str
+    tile_id: str
+    rotation: int
+    color: Color
+
+    def tile(self) -> Tile:
+        return Tile(self.tile_id, self.tile_id, self.color, self.location, self.rotation)
+
+
+class TrackPlacements:
+    def __init__(self, board: GameBoard, config):
+        self.board = board
+        self.manifest = manifest_for(config)
+        self.rules = getattr(config, "SPECIAL_HEX_RULES", {}) or {}
+        self.config = config
+        self._options: Dict[_Situation, _Options] = {}
+        # Company id -> (the reach the lays were found for, location -> (situation, placements))
+        self._lays: Dict[str, Tuple[Reach, Dict[str, Tuple[_Situation, List[TrackPlacement]]]]] = {}
+        self._upgrades: Dict[str, Tuple[_Situation, List[TrackPlacement]]] = {}
+
+    def fork(self, board: GameBoard) -> "TrackPlacements":
+        """A copy for a fork of the board, starting from this one's cache."""
+        placements = copy(self)
+        placements.board = board
+        placements._lays = dict(self._lays)
+        return placements
+
+    def legal(self, company: PublicCompany, state: MutableGameState = None) -> List[TrackPlacement]:
+        """Every placement ``company`` may make now.  Empty if the variant has no tile manifest."""
+        if self.manifest is None:
+            return []
+        placements = []
+        if state is None or company.id not in state.track_laid:
+            placements.extend(self._newTrack(company))
+        placements.extend(self._upgradeTrack())
+        board, manifest = self.board, self.manifest
+        left = {tile_id: manifest.remaining(tile_id, board.placed(tile_id)) > 0 for tile_id in manifest.specs}
+        return [placement for placement in placements if left[placement.tile_id]]
+
+    def _placementsAt(self, location: str, situation: _Situation, is_upgrade: bool) -> List[TrackPlacement]:
+        options = self._options.get(situation)
+        if options is None:
+            options = self._options[situation] = \
+                self._upgradeOptions(*situation) if is_upgrade else self._layOptions(*situation)
+        rule = self.rules.get(location)
+        label = hex_label(self.config, location)
+        return [TrackPlacement(location, tile_id, rotation, color) for tile_id, rotation, color in options
+                if (location not in self.rules or hex_rule_allows(rule, is_upgrade, color))
+                and self.manifest.label(tile_id) == label]
+
+    def _layOptions(self, facing: int, is_station: bool) -> _Options:
+        return tuple((spec.id, rotation, spec.color)
+                     for spec in self.manifest.specs.values() if spec.color == Color.YELLOW
+                     for rotation, edges in enumerate(self.manifest.edges[spec.id]) if is_station or edges & facing)
+
+    def _upgradeOptions(self, tile_id: str, rotation: int, color: Color) -> _Options:
+        if tile_id in self.manifest:
+            return tuple((new_id, new_rotation, self.manifest.specs[new_id].color)
+                         for new_id, new_rotation in self.manifest.upgradesFor(tile_id, rotation))
+        # A tile the manifest doesn't describe (eg. a preprinted hex) only limits the colour.
+        return tuple((spec.id, new_rotation, spec.color) for spec in self.manifest.specs.values()
+                     if COLOR_ORDER[spec.color] == COLOR_ORDER.get(color, 0) + 1 for new_rotation in range(EDGES))
+
+    def _newTrack(self, company: PublicCompany) -> List[TrackPlacement]:
+        reach = self.board.reachable(company)
+        cached = self._lays.get(company.id)
+        if cached is None or cached[0] is not reach:
+            previous = cached[1] if cached else {}
+            hexes = {}
+            for location, situation in self._frontier(reach).items():
+                entry = previous.get(location)
+                if entry is None or entry[0] != situation:
+                    entry = situation, self._placementsAt(location, situation, False)
+                hexes[location] = entry
+            cached = self._lays[company.id] = reach, hexes
+        # Track laid next to a station that has no tile yet leaves the reach as it was.
+        tiles = self.board.board
+        return [placement for location, (_, placements) in cached[1].items() if location not in tiles
+                for placement in placements]
+
+    def _frontier(self, reach: Reach) -> Dict[str, _Situation]:
+        """The situation of every empty hex new track could go on: stations and the hexes next to the network."""
+        board, grid = self.board, self.board.grid
+        network = reach.hexes | reach.stations
+        frontier = {}
+        for location in network:
+            candidates = board.neighbours(location)
+            if location in reach.stations:
+                candidates.append(location)
+            for candidate in candidates:
+                if candidate in frontier or candidate in board.board:
+                    continue
+                facing = 0
+                hex_id = grid.ids.get(candidate)
+                if hex_id is not None:
+                    for edge, neighbour in enumerate(grid.neighbours_by_edge[hex_id]):
+                        if neighbour >= 0 and grid.locations[neighbour] in network:
+                            facing |= 1 << edge
+                frontier[candidate] = facing, candidate in reach.stations
+        return frontier
+
+    def _upgradeTrack(self) -> List[TrackPlacement]:
+        placements = []
+        upgrades = {}
+        for location, tile in self.board.board.items():
+            situation = tile.id, tile.rotation or 0, tile.color
+            entry = self._upgrades.get(location)
+            if entry is None or entry[0] != situation:
+                entry = situation, self._placementsAt(location, situation, True)
+            upgrades[location] = entry
+            placements.extend(entry[1])
+        self._upgrades = upgrades
+        return placements
+
+
+def legal_track_placements(board: GameBoard, company: PublicCompany, config,
+                           state: MutableGameState = None) -> List[TrackPlacement]:
+    """Every track placement ``company`` may make on ``board``.  Keep a ``TrackPlacements`` to reuse its cache."""
+    return TrackPlacements(board, config).legal(company, state)
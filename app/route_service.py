@@ -0,0 +1,90 @@
+"""Solves the routes of several companies at once, in worker processes.
+
+At the start of an operating round every floated company needs its routes worked out, and each of those searches
+is independent.  ``RouteService`` sends an immutable ``BoardSnapshot`` and each company's trains to a process pool
+and collects one ``RoutePlan`` per company.  The plans' routes can be put on the companies' moves as-is; they go
+through the usual ``OperatingRound`` validation.
+
+Small jobs (few companies or a small board) are solved in-process, since starting workers costs more than the
+search.  The same happens if processes cannot be started, or if the pool breaks or a job cannot be sent to it: the
+pool is then given up on and the whole batch is solved in-process.  Each company's stations travel in the snapshot
+(keyed by company id), so workers only need its id and trains.
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import logging
+
+from app.base import BoardSnapshot, GameBoard, PublicCompany, Train
+from app.routing import DEFAULT_TIME_BUDGET, RouteFinder, RoutePlan
+
+PARALLEL_MIN_TILES = 40  # Smaller boards are solved in-process
+PARALLEL_MIN_COMPANIES = 2
+
+
+class CompanyTrains(NamedTuple):
+    """What the route finder needs to know about a company; stands in for it in worker processes."""
+    id: str
+    trains: Tuple[Train, ...]
+
+
+def _solve(snapshot: BoardSnapshot, company: CompanyTrains, time_budget: float) -> RoutePlan:
+    return RouteFinder(GameBoard.fromSnapshot(snapshot), company, time_budget=time_budget).solve()
+
+
+class RouteService:
+    def __init__(self, max_workers: int = None, time_budget: float = DEFAULT_TIME_BUDGET,
+                 min_tiles: int = PARALLEL_MIN_TILES, min_companies: int = PARALLEL_MIN_COMPANIES):
+        self.max_workers = max_workers
+        self.time_budget = time_budget
+        self.min_tiles = min_tiles
+        self.min_companies = min_companies
+        self._pool: Optional[Executor] = None
+        self._pool_failed = False
+
+    def __enter__(self) -> "RouteService":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _abandonPool(self, error: BaseException) -> None:
+        logging.warning("Route service falling back to in-process solving: %s", error)
+        self._pool_failed = True
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def inParallel(self, board: GameBoard, companies: List[CompanyTrains]) -> bool:
+        return not self._pool_failed and len(companies) >= self.min_companies and len(board.board) >= self.min_tiles
+
+    def _executor(self) -> Optional[Executor]:
+        if self._pool is None and not self._pool_failed:
+            try:
+                self._pool = ProcessPoolExecutor(self.max_workers)
+            except (OSError, NotImplementedError, ImportError) as e:
+                self._abandonPool(e)
+        return self._pool
+
+    def solve(self, board: GameBoard, companies: Iterable[PublicCompany]) -> Dict[str, RoutePlan]:
+        """The best routes for each company (by id), with its current trains."""
+        requests = [CompanyTrains(company.id, tuple(company.trains or ())) for company in companies]
+
+        executor = self._executor() if self.inParallel(board, requests) else None
+        if executor is not None:
+            snapshot = board.snapshot()
+            try:
+                futures = {company.id: executor.submit(_solve, snapshot, company, self.time_budget)
+                           for company in requests}
+                return {company_id: future.result() for company_id, future in futures.items()}
+            except Exception as e:  # BrokenProcessPool, pickling errors...; a real search error recurs below
+                self._abandonPool(e)
+
+        return {company.id: RouteFinder(board, company, time_budget=self.time_budget).solve()
+                for company in requests}
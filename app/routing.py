@@ -0,0 +1,187 @@
+"""Finds the best routes for a company to run.
+
+Routes follow the rules ``OperatingRound.isValidRoute`` enforces: every stop is a tiled hex, consecutive stops are
+neighbours on the board's hex grid, no stop is used twice (within or across routes), each route fits its train and
+each route includes one of the company's stations.  Revenue is ``GameBoard.calculateRoute``.
+
+The search first enumerates every candidate path once, for the longest train (a shorter train's paths are the
+short ones), pruning paths that can no longer reach a station.  It then picks one path per train with a
+branch-and-bound over the trains, longest first.  Both phases stop at ``time_budget``; the best plan found so far
+is returned, flagged as not proven optimal.
+"""
+
+import time
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from app.base import GameBoard, PublicCompany, Route, Train
+
+DEFAULT_TIME_BUDGET = 0.5  # Seconds
+_DEADLINE_CHECK_INTERVAL = 1024  # Search steps between clock reads
+
+
+class RoutePlan(NamedTuple):
+    routes: List[Route]
+    revenue: int
+    optimal: bool  # False if the time budget ran out before the search finished
+
+
+class _Path(NamedTuple):
+    mask: int  # Bit i set if the path uses node i
+    revenue: int
+    stops: Tuple[int, ...]
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class RouteFinder:
+    def __init__(self, board: GameBoard, company: PublicCompany, trains: Sequence[Train] = None,
+                 time_budget: float = DEFAULT_TIME_BUDGET):
+        self.board = board
+        self.company = company
+        self.trains = list(company.trains or []) if trains is None else list(trains)
+        self.time_budget = time_budget
+
+        # Nodes are the tiled hexes on the map, numbered locally so paths fit in an int bitmask.
+        grid = board.grid
+        self.locations: List[str] = [location for location in board.board if location in grid.ids]
+        index = {grid.ids[location]: i for i, location in enumerate(self.locations)}
+        self.neighbours: List[List[int]] = [
+            [index[n] for n in grid.neighbours[grid.ids[location]] if n in index] for location in self.locations]
+        self.revenues: List[int] = [board.stopRevenue(location) for location in self.locations]
+        stations = board.stations(company.id)
+        self.stations: List[int] = [i for i, location in enumerate(self.locations) if location in stations]
+
+        self._deadline = None
+        self._enumeration_deadline = None
+        self._steps = 0
+        self._paths: Dict[int, List[_Path]] = {}
+        self._complete = True
+
+    def capacity(self, train: Train) -> int:
+        return min(train.capacity or len(self.locations), len(self.locations))
+
+    def _tick(self) -> None:
+        self._steps += 1
+        if self._steps % _DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() > self._deadline:
+            raise _OutOfTime
+
+    def _station_distances(self) -> List[int]:
+        """Hops from each node to the nearest station (breadth first search from all of them)."""
+        unreachable = len(self.locations) + 1
+        distances = [unreachable] * len(self.locations)
+        frontier = list(self.stations)
+        for station in frontier:
+            distances[station] = 0
+        for node in frontier:
+            for neighbour in self.neighbours[node]:
+                if distances[neighbour] == unreachable:
+                    distances[neighbour] = distances[node] + 1
+                    frontier.append(neighbour)
+        return distances
+
+    def _enumerate(self, max_length: int) -> List[_Path]:
+        """Every path of 2..max_length stops that includes a station, each listed once."""
+        paths: List[_Path] = []
+        distances = self._station_distances()
+        stations = set(self.stations)
+        starts = sorted((i for i in range(len(self.locations)) if distances[i] < max_length),
+                        key=distances.__getitem__)
+
+        def extend(stops: List[int], mask: int, revenue: int, has_station: bool):
+            self._tick()
+            node = stops[-1]
+            # A path and its reverse are the same route; keep the one that starts on the lower node.
+            if len(stops) >= 2 and has_station and stops[0] < node:
+                paths.append(_Path(mask, revenue, tuple(stops)))
+            if len(stops) == max_length:
+                return
+            remaining = max_length - len(stops)
+            # Warnsdorff's rule: go where there are fewest ways on first, which finds long paths early.
+            onward = sorted(self.neighbours[node], key=lambda n: sum(not mask >> m & 1 for m in self.neighbours[n]))
+            for neighbour in onward:
+                if mask >> neighbour & 1:
+                    continue
+                if not has_station and distances[neighbour] >= remaining:
+                    continue  # Can't reach a station within this train's length any more.
+                stops.append(neighbour)
+                extend(stops, mask | 1 << neighbour, revenue + self.revenues[neighbour],
+                       has_station or neighbour in stations)
+                stops.pop()
+
+        deadline, self._deadline = self._deadline, self._enumeration_deadline
+        try:
+            for start in starts:
+                extend([start], 1 << start, self.revenues[start], start in stations)
+        except _OutOfTime:
+            self._complete = False
+        finally:
+            self._deadline = deadline
+        return paths
+
+    def pathsFor(self, capacity: int) -> List[_Path]:
+        """Candidate paths for a train of ``capacity`` stops, best first.  Shared by trains of the same length."""
+        if capacity not in self._paths:
+            longest = max(self._paths) if self._paths else None
+            if longest is None or longest < capacity:
+                self._paths = {capacity: self._enumerate(capacity)}
+                self._paths[capacity].sort(key=lambda p: -p.revenue)
+            else:
+                self._paths[capacity] = [p for p in self._paths[longest] if len(p.stops) <= capacity]
+        return self._paths[capacity]
+
+    def solve(self) -> RoutePlan:
+        start = time.perf_counter()
+        self._deadline = start + self.time_budget
+        self._enumeration_deadline = start + self.time_budget / 2  # Leave time to combine the paths found.
+        self._complete = True
+        capacities = sorted((c for c in map(self.capacity, self.trains) if c >= 2), reverse=True)
+        if not self.stations or not capacities:
+            return RoutePlan([], 0, True)
+
+        self.pathsFor(capacities[0])
+        candidates = [self.pathsFor(capacity) for capacity in capacities]
+        # Optimistic revenue of trains i.. (each on its best path, ignoring overlaps), for pruning.  Never more
+        # than every stop the company can reach.
+        reachable = sum(revenue for revenue, distance in zip(self.revenues, self._station_distances())
+                        if distance <= len(self.locations))
+        bounds = [0] * (len(capacities) + 1)
+        for i in reversed(range(len(capacities))):
+            bounds[i] = min(reachable, bounds[i + 1] + (candidates[i][0].revenue if candidates[i] else 0))
+
+        best_revenue = 0
+        best_choice: List[_Path] = []
+        chosen: List[_Path] = []
+
+        def search(train: int, used: int, revenue: int):
+            nonlocal best_revenue, best_choice
+            self._tick()
+            if revenue > best_revenue:
+                best_revenue, best_choice = revenue, list(chosen)
+            if train == len(capacities) or revenue + bounds[train] <= best_revenue:
+                return
+            for path in candidates[train]:
+                if revenue + path.revenue + bounds[train + 1] <= best_revenue:
+                    break  # Paths are sorted by revenue, so no later one can do better.
+                if path.mask & used:
+                    continue
+                chosen.append(path)
+                search(train + 1, used | path.mask, revenue + path.revenue)
+                chosen.pop()
+            search(train + 1, used, revenue)  # Leave this train idle.
+
+        try:
+            search(0, 0, 0)
+        except _OutOfTime:
+            self._complete = False
+
+        routes = [Route([self.locations[i] for i in path.stops]) for path in best_choice]
+        optimal = self._complete or best_revenue >= bounds[0]
+        return RoutePlan(routes, sum(self.board.calculateRoute(route) for route in routes), optimal)
+
+
+def find_routes(board: GameBoard, company: PublicCompany, trains: Sequence[Train] = None,
+                time_budget: float = DEFAULT_TIME_BUDGET) -> RoutePlan:
+    """The highest-revenue set of routes ``company`` can run with ``trains`` (its own trains by default)."""
+    return RouteFinder(board, company, trains, time_budget).solve()
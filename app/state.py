@@ -1,10 +1,14 @@
-from typing import List
+import copy
+from typing import List, Dict, NamedTuple, Optional, Iterable, Sequence
 
 from app.config import load_config
+from app.fork import fork_game
+from app.history import GameHistory, LoggedMove
 
 import logging
 
-from app.base import err, Player, Move, PrivateCompany, PublicCompany, MutableGameState, StockPurchaseSource
+from app.base import err, Player, Move, PrivateCompany, PublicCompany, MutableGameState, StockPurchaseSource, \
+    ShareLedger, OperatingOrder
 from app.minigames.PrivateCompanyInitialAuction.minigame_auction import BiddingForPrivateCompany
 from app.minigames.PrivateCompanyInitialAuction.minigame_buy import BuyPrivateCompany
 from app.minigames.StockRound.minigame_stockround import StockRound
@@ -46,6 +50,50 @@ def StockRoundPlayers(company: PrivateCompany, stock_round_iteration):
 """
 
 
+MINIGAME_CLASSES = {
+    "BiddingForPrivateCompany": BiddingForPrivateCompany,
+    "BuyPrivateCompany": BuyPrivateCompany,
+    "StockRound": StockRound,
+    "StockRoundSellPrivateCompany": Auction,
+    "OperatingRound1": OperatingRound,  # TODO
+    "OperatingRound2": OperatingRound,  # TODO
+    "OperatingRound3": OperatingRound,  # TODO
+}
+
+# Minigame class -> names of the Move classes it accepts.
+# TODO: How do we determine the move type?  Some form of duck typing?
+MINIGAME_MOVE_CLASSES = {
+    "BuyPrivateCompany": frozenset({"BuyPrivateCompanyMove"}),
+    "BiddingForPrivateCompany": frozenset({"BuyPrivateCompanyMove"}),
+    "StockRound": frozenset({"StockRoundMove"}),
+    "StockRoundSellPrivateCompany": frozenset({"AuctionBidMove", "AuctionDecisionMove"}),
+    "OperatingRound1": frozenset({"OperatingRoundMove"}),
+    "OperatingRound2": frozenset({"OperatingRoundMove"}),
+    "OperatingRound3": frozenset({"OperatingRoundMove"}),
+}
+
+
+class BatchResult(NamedTuple):
+    """Outcome of ``apply_moves``."""
+    applied: int  # Moves that took effect (0 when an atomic batch was rolled back)
+    failed_index: Optional[int] = None  # Position in the batch of the first invalid move
+    errors: Sequence[str] = ()
+
+    @property
+    def ok(self) -> bool:
+        return self.failed_index is None
+
+
+class Transition(NamedTuple):
+    """Outcome of the minigame's ``next()`` decision after a successful move."""
+    previous: str
+    next: str
+
+    @property
+    def changed(self) -> bool:
+        return self.previous != self.next
+
+
 class PlayerTurnOrder:
     def __init__(self, state: MutableGameState):
         self.state = state
@@ -93,7 +141,8 @@ class Game:
     
     """
     @staticmethod
-    def start(players: List[str], variant: str = "1830") -> "Game":
+    def start(players: List[str], variant: str = "1830", share_ledger: bool = False,
+              history: bool = False) -> "Game":
         config = load_config(variant)
         total_players = len(players)
         cash = config.starting_cash(total_players)
@@ -102,26 +151,48 @@ class Game:
             player_objects.append(
                 Player.create(player_name, cash, order)
             )
-        game = Game.initialize(player_objects, config)
+        game = Game.initialize(player_objects, config, share_ledger=share_ledger, history=history)
         game.setMinigame("BuyPrivateCompany")
         return game
 
 
     @staticmethod
-    def initialize(players: List[Player], config, saved_game: dict = None) -> "Game":
+    def initialize(players: List[Player], config, saved_game: dict = None, share_ledger: bool = False,
+                   history: bool = False) -> "Game":
         """
 
         :param players:
         :param saved_game: Used to load data, if any.  If empty, everything defaults to a new game.
+            This is the move log produced by ``GameHistory.toDict``; its moves are replayed on top of the new game,
+            so ``players`` must be the same players (with the same ids) that played it.
+        :param share_ledger: Track share ownership in a game-wide ShareLedger matrix instead of per-company dicts.
+        :param history: Record every move in a ``GameHistory``, for replays and saving the game.  Every move played
+            must then come from a message (see ``LoggedMove.canLog``).
         :return:
         """
         game = Game()
         game.config = config
+        game.history = GameHistory() if history else None
         game.state = MutableGameState()
         game.state.players = players
         game.state.priority_deal_player = players[0] if players else None
         game.state.private_companies = config.PRIVATE_COMPANIES
         game.state.public_companies = config.PUBLIC_COMPANIES
+        if share_ledger:
+            # Attaching rebinds the companies to this game's ledger, so the game gets its own copies of the config's
+            # companies (sharing the static stock market) rather than taking them from any other ledger game.
+            market = getattr(config, "STOCK_MARKET", None)
+            game.state.public_companies = copy.deepcopy(config.PUBLIC_COMPANIES,
+                                                        {id(market): market} if market is not None else {})
+            game.state.share_ledger = ShareLedger.attach(players, game.state.public_companies)
+
+        if saved_game:
+            game.setMinigame(saved_game.get("minigame_class") or "BuyPrivateCompany")
+            game.setPlayerOrder()
+            game.setCurrentPlayer()
+            for index, entry in enumerate(saved_game.get("moves", [])):
+                if not game.performedMove(LoggedMove(**entry).toMove()):
+                    raise ValueError("Saved move {} could not be replayed: {}".format(index, game.errors()))
 
         return game
 
@@ -133,51 +204,33 @@ class Game:
         self.config = None
         self.operating_order: List[str] = []
         self.last_operating_order: List[str] = []
+        self._operating: Optional[OperatingOrder] = None  # Kept sorted as prices change; see operatingOrder()
+        self.minigames: Dict[str, Minigame] = {}  # Live minigame instances, by minigame class name
+        self.last_transition: Optional[Transition] = None  # next() decision of the last successful move
+        self.history: Optional[GameHistory] = None  # Only kept when asked for; see ``initialize``
 
     def isOngoing(self) -> bool:
         return True
 
-    def sort_operating_order(self) -> List[str]:
-        """Sort floated, non-bankrupt companies for the next operating round."""
-        market = getattr(self.config, "STOCK_MARKET", None)
-        companies = [
-            c for c in (self.state.public_companies or [])
-            if c.isFloated() and not c.bankrupt
-        ]
-        def prior_index(cid: str) -> int:
-            return self.last_operating_order.index(cid) if cid in self.last_operating_order else 0
-
-        if market:
-            companies.sort(
-                key=lambda c: (
-                    -market.cell(*c.stock_pos).price,
-                    c.stock_pos[0],
-                    prior_index(c.id)
-                )
-            )
-        else:
-            companies.sort(
-                key=lambda c: (
-                    -c.stockPrice[StockPurchaseSource.BANK],
-                    c.stock_pos[0],
-                    prior_index(c.id)
-                )
-            )
+    def operatingOrder(self) -> OperatingOrder:
+        """The game's ``OperatingOrder``, set up on first use (or when the list of companies is replaced)."""
+        companies = self.state.public_companies or []
+        order = self._operating
+        if order is None or order.companies is not companies or len(order._index) != len(companies):
+            order = self._operating = OperatingOrder(companies, getattr(self.config, "STOCK_MARKET", None),
+                                                     self.last_operating_order)
+        return order
 
-        self.operating_order = [c.id for c in companies]
+    def sort_operating_order(self) -> List[str]:
+        """Floated, non-bankrupt companies in the order they operate this round."""
+        self.operating_order = self.operatingOrder().commit()
         self.last_operating_order = list(self.operating_order)
         return self.operating_order
 
     def isValidMove(self, move: Move) -> bool:
         """Determines whether or not the type of move submitted is of the type that is supposed to run this round.
         IE: You normally can't sell stock during an Operating Round"""
-        # TODO: How do we determine the move type?
-        # Some form of duck typing?
-        minigame_move_classes = {
-            "BuyPrivateCompany": "BuyPrivateCompanyMove",
-            "BiddingForPrivateCompany":  "BuyPrivateCompanyMove",
-        }
-        return minigame_move_classes.get(self.minigame_class) == move.__class__.__name__
+        return move.__class__.__name__ in MINIGAME_MOVE_CLASSES.get(self.minigame_class, ())
 
     def isValidPlayer(self, move: Move) -> bool:
         """The person who submitted the move must be the current player.
@@ -191,7 +244,7 @@ class Game:
         )
         if errors == None:
             return True
-        self.errors_list = [errors]
+        self.errors_list = [str(errors)]
         return False
 
     def getState(self) -> MutableGameState:
@@ -243,39 +296,51 @@ class Game:
         self.current_player = next(self.get_player_order_fn())
 
     def getMinigame(self) -> Minigame:
-        """Creates a NEW INSTANCE of a mini game and passes it"""
-        classes = {
-            "BiddingForPrivateCompany": BiddingForPrivateCompany,
-            "BuyPrivateCompany": BuyPrivateCompany,
-            "StockRound": StockRound,
-            "StockRoundSellPrivateCompany": Auction,
-            "OperatingRound1": OperatingRound,  # TODO
-            "OperatingRound2": OperatingRound,  # TODO
-            "OperatingRound3": OperatingRound,  # TODO
-        }
-
-        cls: type(Minigame) = classes.get(self.minigame_class)
-        return cls()
+        """Returns this game's instance of the current minigame, creating it the first time it is needed.
+        Instances are discarded when their minigame completes, so each round starts with a fresh one.  An instance
+        lives for the whole round: state about a single move must be reset by the minigame's ``run``, while state
+        about the round (eg. ``StockRound.last_deal_player``) carries over from move to move."""
+        minigame = self.minigames.get(self.minigame_class)
+        if minigame is None:
+            cls: type(Minigame) = MINIGAME_CLASSES.get(self.minigame_class)
+            minigame = self.minigames[self.minigame_class] = cls()
+        return minigame
 
     def performedMove(self, move: Move) -> bool:
         """
         Performs a move and mutate the Minigame / Player Order states
+
+        ``next()`` is evaluated once per successful move (it can have side effects, eg. accepting the highest bid
+        on a private company); the decision is kept in ``last_transition``.
         :param move:
         :return:
         """
+        if self.history is not None:
+            if not LoggedMove.canLog(move):
+                self.setError(["{} has no message to record in the game's history".format(move.__class__.__name__)])
+                return False
+            if self.history.needsSnapshot():
+                # A fork is a cheap copy; the deep copy a replay needs is only made when one happens.
+                self.history.addSnapshot(self.fork())
+
+        state = self.getState()
         minigame = self.getMinigame()
-        minigame.onTurnStart(self.getState())
-        success = minigame.run(move, self.getState())
+        minigame.onTurnStart(state)
+        success = minigame.run(move, state)
 
         if success:
-            if self.minigame_class != minigame.next(self.getState()):
+            if self.history is not None:
+                self.history.append(move)
+            self.last_transition = Transition(self.minigame_class, minigame.next(state))
+            if self.last_transition.changed:
                 """When the minigame changes, you need to switch the player order usually."""
-                minigame.onComplete(self.getState())
-                self.setMinigame(minigame.next(self.getState()))
+                minigame.onComplete(state)
+                self.minigames.pop(self.minigame_class, None)
+                self.setMinigame(self.last_transition.next)
                 self.setPlayerOrder()
-                self.getMinigame().onStart(self.getState())
+                self.getMinigame().onStart(state)
             else:
-                minigame.onTurnComplete(self.getState())
+                minigame.onTurnComplete(state)
 
             self.setCurrentPlayer()
 
@@ -284,6 +349,33 @@ class Game:
 
         return success
 
+    def snapshot(self) -> "Game":
+        """A detached deep copy of this game, without its history.  Only the config module is shared."""
+        memo = {id(self.config): self.config, id(self.history): None}
+        return copy.deepcopy(self, memo)
+
+    def fork(self) -> "Game":
+        """A cheap, independent copy of this game to try moves on (bots, "what if I sell" previews).
+
+        Players, companies and round state are copied shallowly and re-linked; the config, stock market and
+        trains are shared, and boards are copy-on-write.  Moves played on the fork never affect this game.
+        The fork has no history of its own."""
+        return fork_game(self)
+
+    def replay(self, index: int) -> "Game":
+        """Rebuilds this game as it was after its first ``index`` moves.
+
+        Starts from the nearest snapshot at or before ``index`` rather than from the first move, so at most
+        ``history.snapshot_interval`` moves are replayed.  The result is a detached copy; this game is untouched."""
+        start = self.history.nearestSnapshot(index)
+        if start is None:
+            return self.snapshot()  # No move has been played, so this game is still as it started
+        game = self.history.snapshots[start].snapshot()
+        for position in range(start, index):
+            if not game.performedMove(self.history.moves[position].toMove()):
+                raise ValueError("Move {} could not be replayed: {}".format(position, game.errors()))
+        return game
+
     def setError(self, error_list: List[str]) -> None:
         # TODO: Sets the error that will be returned
         self.errors_list = error_list
@@ -309,3 +401,50 @@ def apply_move(game: Game, move: Move) -> Game:
     return game
 
 
+
+
+def apply_moves(game: Game, moves: Iterable[Move], atomic: bool = False) -> BatchResult:
+    """Execute a sequence of moves on ``game``, stopping at the first one that is invalid.
+
+    The move type check is only re-evaluated when the minigame changes, and the player check is a plain id
+    comparison until it fails.  ``moves`` may be any iterable (eg. a generator reading a saved game), so
+    arbitrarily long imports are streamed rather than held in memory.
+
+    :param atomic: If a move fails, restore ``game`` to how it was before the batch (including its history)
+        instead of keeping the moves that did apply.  ``game`` is restored in place, but its players and
+        companies are replaced by copies, so references to them taken before the batch become stale.
+    :return: A ``BatchResult`` with the index and errors of the failing move, if any.  The errors are also
+        available from ``game.errors()``.
+    """
+    checkpoint = game.fork() if atomic else None
+    history_length = len(game.history) if game.history is not None else 0
+
+    minigame_class = None
+    allowed_move_classes = frozenset()
+    applied = 0
+    for index, move in enumerate(moves):
+        if game.minigame_class != minigame_class:
+            minigame_class = game.minigame_class
+            allowed_move_classes = MINIGAME_MOVE_CLASSES.get(minigame_class, frozenset())
+
+        if move.__class__.__name__ not in allowed_move_classes:
+            errors = ["{} is not a valid move during {}".format(move.__class__.__name__, minigame_class)]
+        elif move.player_id != game.current_player.id and not game.isValidPlayer(move):
+            errors = game.errors()
+        elif not game.performedMove(move):
+            errors = game.errors()
+        else:
+            applied += 1
+            continue
+
+        if atomic:
+            history = game.history
+            game.__dict__.update(checkpoint.__dict__)
+            game.history = history
+            if history is not None:
+                history.truncate(history_length)
+            applied = 0
+        game.setError(errors)
+        return BatchResult(applied, index, errors)
+
+    return BatchResult(applied)
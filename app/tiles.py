@@ -0,0 +1,209 @@
+"""Tile manifests: which tiles a variant has, how many of each, and what they upgrade to.
+
+A tile's track is a list of path groups, each a tuple of the edges it joins (edges as in ``app.hexgrid``, clockwise
+from east at rotation 0).  A plain track tile has one group per piece of track; a city tile has one group holding
+every edge that runs into the city.  A town sits on a piece of plain track.  A city or town tile's ``label`` (eg.
+"OO", "NY", "B") ties it to the hexes with that label (``HEX_LABELS`` in a variant config).
+
+``TileManifest`` compiles the tiles once into lookup tables, so placement checks are integer operations:
+
+* ``edges[tile_id][rotation]``: a 6-bit mask of the edges the tile's track reaches.
+* ``pairs[tile_id][rotation]``: a 15-bit mask of the edge pairs the tile connects.  An upgrade must keep every
+  connection of the tile it replaces, ie. its pairs are a superset of the old ones.
+* ``upgrades[tile_id][target_id]``: a 6-bit mask of the rotations, relative to the old tile's, at which the target
+  may replace it.  The target keeps every edge and every connection of the old tile, and its cities, towns and label.
+"""
+
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.base import Color
+from app.hexgrid import EDGES
+
+COLOR_ORDER = {
+    Color.YELLOW: 1,
+    Color.GREEN: 2,
+    Color.BROWN: 3,
+    Color.RED: 4,
+    Color.GRAY: 5,
+}
+
+ALL_EDGES = (1 << EDGES) - 1
+
+# Bit index of each unordered edge pair (a, b), a < b.
+_PAIR_BITS: Dict[Tuple[int, int], int] = {pair: i for i, pair in enumerate(combinations(range(EDGES), 2))}
+
+
+class TileSpec(NamedTuple):
+    id: str
+    color: Color
+    paths: Tuple[Tuple[int, ...], ...]
+    cities: int = 0  # Cities on the tile; an upgrade keeps the same number
+    label: Optional[str] = None  # Eg. "OO" or "NY"; an upgrade keeps the same label
+    towns: int = 0  # Towns on the tile; an upgrade keeps the same number
+
+
+def rotate_edges(mask: int, rotation: int) -> int:
+    """A 6-bit edge mask turned ``rotation`` steps clockwise."""
+    rotation %= EDGES
+    return (mask << rotation | mask >> (EDGES - rotation)) & ALL_EDGES
+
+
+def edge_mask(spec: TileSpec, rotation: int = 0) -> int:
+    mask = 0
+    for group in spec.paths:
+        for edge in group:
+            mask |= 1 << (edge + rotation) % EDGES
+    return mask
+
+
+def pair_mask(spec: TileSpec, rotation: int = 0) -> int:
+    mask = 0
+    for group in spec.paths:
+        edges = sorted({(edge + rotation) % EDGES for edge in group})
+        for pair in combinations(edges, 2):
+            mask |= 1 << _PAIR_BITS[pair]
+    return mask
+
+
+# Track of the numbered tiles shared by most 18xx games.  A city's stub that joins no other edge (eg. on the yellow
+# OO tile 59) is a group of one edge.
+STANDARD_TILES: Dict[str, TileSpec] = {spec.id: spec for spec in [
+    TileSpec("1", Color.YELLOW, ((0, 4), (1, 3)), towns=2),
+    TileSpec("2", Color.YELLOW, ((0, 3), (1, 2)), towns=2),
+    TileSpec("3", Color.YELLOW, ((0, 1),), towns=1),
+    TileSpec("4", Color.YELLOW, ((0, 3),), towns=1),
+    TileSpec("5", Color.YELLOW, ((0, 1),), cities=1),
+    TileSpec("6", Color.YELLOW, ((0, 2),), cities=1),
+    TileSpec("7", Color.YELLOW, ((0, 1),)),
+    TileSpec("8", Color.YELLOW, ((0, 2),)),
+    TileSpec("9", Color.YELLOW, ((0, 3),)),
+    TileSpec("55", Color.YELLOW, ((0, 3), (1, 4)), towns=2),
+    TileSpec("56", Color.YELLOW, ((0, 2), (1, 3)), towns=2),
+    TileSpec("57", Color.YELLOW, ((0, 3),), cities=1),
+    TileSpec("58", Color.YELLOW, ((0, 2),), towns=1),
+    TileSpec("59", Color.YELLOW, ((0,), (2,)), cities=2, label="OO"),
+    TileSpec("69", Color.YELLOW, ((0, 3), (2, 4)), towns=2),
+    TileSpec("14", Color.GREEN, ((0, 1, 3, 4),), cities=1),
+    TileSpec("15", Color.GREEN, ((0, 1, 2, 3),), cities=1),
+    TileSpec("16", Color.GREEN, ((0, 2), (1, 3))),
+    TileSpec("18", Color.GREEN, ((0, 3), (1, 2))),
+    TileSpec("19", Color.GREEN, ((0, 3), (2, 4))),
+    TileSpec("20", Color.GREEN, ((0, 3), (1, 4))),
+    TileSpec("23", Color.GREEN, ((0, 3), (0, 4))),
+    TileSpec("24", Color.GREEN, ((0, 3), (0, 2))),
+    TileSpec("25", Color.GREEN, ((0, 2), (0, 4))),
+    TileSpec("26", Color.GREEN, ((0, 3), (0, 5))),
+    TileSpec("27", Color.GREEN, ((0, 3), (0, 1))),
+    TileSpec("28", Color.GREEN, ((0, 4), (0, 5))),
+    TileSpec("29", Color.GREEN, ((0, 2), (0, 1))),
+    TileSpec("53", Color.GREEN, ((0, 2, 4),), cities=1, label="B"),
+    TileSpec("54", Color.GREEN, ((0, 1), (2, 3)), cities=2, label="NY"),
+    TileSpec("64", Color.GREEN, ((0, 2), (3, 4)), cities=2, label="OO"),
+    TileSpec("65", Color.GREEN, ((0, 4), (2, 3)), cities=2, label="OO"),
+    TileSpec("66", Color.GREEN, ((0, 3), (1, 2)), cities=2, label="OO"),
+    TileSpec("67", Color.GREEN, ((0, 3), (4, 5)), cities=2, label="OO"),
+    TileSpec("68", Color.GREEN, ((0, 1), (3, 4)), cities=2, label="OO"),
+    TileSpec("39", Color.BROWN, ((0, 2), (0, 1), (1, 2))),
+    TileSpec("40", Color.BROWN, ((0, 2), (2, 4), (0, 4))),
+    TileSpec("41", Color.BROWN, ((0, 3), (0, 1), (1, 3))),
+    TileSpec("42", Color.BROWN, ((0, 3), (3, 5), (0, 5))),
+    TileSpec("43", Color.BROWN, ((0, 3), (0, 2), (1, 3), (1, 2))),
+    TileSpec("44", Color.BROWN, ((0, 3), (1, 4), (0, 1), (3, 4))),
+    TileSpec("45", Color.BROWN, ((0, 3), (2, 4), (0, 4), (2, 3))),
+    TileSpec("46", Color.BROWN, ((0, 3), (2, 4), (3, 4), (0, 2))),
+    TileSpec("47", Color.BROWN, ((0, 3), (1, 4), (1, 3), (0, 4))),
+    TileSpec("61", Color.BROWN, ((0, 1, 2, 4),), cities=1, label="B"),
+    TileSpec("62", Color.BROWN, ((0, 1), (2, 3)), cities=2, label="NY"),
+    TileSpec("63", Color.BROWN, ((0, 1, 2, 3, 4, 5),), cities=1),
+    TileSpec("70", Color.BROWN, ((0, 1), (0, 2), (1, 3), (2, 3))),
+]}
+
+
+class TileManifest:
+    """A variant's tiles compiled into rotation and upgrade tables.
+
+    ``complete`` says whether the manifest lists every tile of the game.  Only then are tiles it doesn't list
+    refused; otherwise they are placed by the colour rules alone."""
+
+    def __init__(self, specs: Iterable[TileSpec], counts: Dict[str, int], complete: bool = True):
+        self.specs: Dict[str, TileSpec] = {spec.id: spec for spec in specs}
+        self.counts: Dict[str, int] = dict(counts)
+        self.complete = complete
+        self.edges: Dict[str, Tuple[int, ...]] = {}
+        self.pairs: Dict[str, Tuple[int, ...]] = {}
+        for tile_id, spec in self.specs.items():
+            self.edges[tile_id] = tuple(edge_mask(spec, rotation) for rotation in range(EDGES))
+            self.pairs[tile_id] = tuple(pair_mask(spec, rotation) for rotation in range(EDGES))
+
+        self.upgrades: Dict[str, Dict[str, int]] = {tile_id: {} for tile_id in self.specs}
+        for old in self.specs.values():
+            old_pairs = self.pairs[old.id][0]
+            old_edges = self.edges[old.id][0]
+            for new in self.specs.values():
+                if COLOR_ORDER[new.color] != COLOR_ORDER[old.color] + 1 \
+                        or new.cities != old.cities or new.towns != old.towns or new.label != old.label:
+                    continue
+                rotations = 0
+                for rotation, (new_pairs, new_edges) in enumerate(zip(self.pairs[new.id], self.edges[new.id])):
+                    if new_pairs & old_pairs == old_pairs and new_edges & old_edges == old_edges:
+                        rotations |= 1 << rotation
+                if rotations:
+                    self.upgrades[old.id][new.id] = rotations
+
+    def __contains__(self, tile_id: str) -> bool:
+        return tile_id in self.specs
+
+    def edgeMask(self, tile_id: str, rotation: int) -> int:
+        return self.edges[tile_id][rotation % EDGES]
+
+    def canUpgrade(self, old_id: str, old_rotation: int, new_id: str, new_rotation: int) -> bool:
+        """Whether ``new_id`` at ``new_rotation`` may replace ``old_id`` laid at ``old_rotation``."""
+        rotations = self.upgrades.get(old_id, {}).get(new_id, 0)
+        return bool(rotations >> (new_rotation - old_rotation) % EDGES & 1)
+
+    def upgradesFor(self, tile_id: str, rotation: int = 0) -> List[Tuple[str, int]]:
+        """(tile id, rotation) of every tile that may replace ``tile_id`` laid at ``rotation``."""
+        return [(new_id, (rotation + relative) % EDGES)
+                for new_id, rotations in self.upgrades.get(tile_id, {}).items()
+                for relative in range(EDGES) if rotations >> relative & 1]
+
+    def remaining(self, tile_id: str, placed: int) -> int:
+        return self.counts.get(tile_id, 0) - placed
+
+    def label(self, tile_id: str) -> Optional[str]:
+        spec = self.specs.get(tile_id)
+        return spec.label if spec else None
+
+
+def hex_rule_allows(rule, is_upgrade: bool, color: Color) -> bool:
+    """Whether a ``SPECIAL_HEX_RULES`` entry lets a tile of ``color`` be laid (or upgraded) there.
+
+    A rule is either a dict of ``no_lay``, ``no_upgrade`` and ``allowed_colors``, or a description of a hex where
+    no track can go.
+    """
+    if not isinstance(rule, dict):
+        return False
+    if rule.get("no_upgrade" if is_upgrade else "no_lay"):
+        return False
+    allowed_colors = rule.get("allowed_colors")
+    return not allowed_colors or color in allowed_colors
+
+
+def hex_label(config, location: str) -> Optional[str]:
+    """The label printed on a hex (``HEX_LABELS``), which a tile laid there must carry too."""
+    return (getattr(config, "HEX_LABELS", None) or {}).get(location)
+
+
+@lru_cache(maxsize=None)
+def manifest_for(config) -> Optional[TileManifest]:
+    """The compiled ``TILE_MANIFEST`` of a variant config module, or None if it doesn't have one.  The manifest is
+    complete only if the config says so with ``TILE_MANIFEST_COMPLETE``."""
+    counts = getattr(config, "TILE_MANIFEST", None)
+    if counts is None:
+        return None
+    specs = dict(STANDARD_TILES)
+    specs.update((spec.id, spec) for spec in getattr(config, "TILE_DEFINITIONS", []))
+    return TileManifest((specs[tile_id] for tile_id in counts), counts,
+                        getattr(config, "TILE_MANIFEST_COMPLETE", False))
@@ -0,0 +1,90 @@
+import importlib
+import unittest
+
+from app.benchmarks import bench_games
+from app.history import GameHistory, LoggedMove
+from app.state import BatchResult, Game, apply_moves
+from app.unittests.scenarios.move_factory import PrivateCompanyInitialAuctionMoves
+
+cfg1830 = importlib.import_module('app.config.1830')
+
+
+class ApplyMovesTests(unittest.TestCase):
+    def setUp(self):
+        importlib.reload(cfg1830)
+        self.game = Game.start(["Alice", "Bob", "Carol"], variant="1830")
+        self.game.history = GameHistory(snapshot_interval=2)
+        self.game.setPlayerOrder()
+        self.game.setCurrentPlayer()
+
+    def tearDown(self):
+        importlib.reload(cfg1830)
+
+    def buys(self, *player_names):
+        """Buys the privates in order, each by the given player."""
+        return [
+            PrivateCompanyInitialAuctionMoves.buy(name, company.short_name, self.game.state)
+            for name, company in zip(player_names, self.game.state.private_companies)
+        ]
+
+    def owners(self):
+        return [(pc.belongs_to.name if pc.belongs_to else None) for pc in self.game.state.private_companies]
+
+    def test_all_moves_applied(self):
+        result = apply_moves(self.game, iter(self.buys("Alice", "Bob", "Carol")))
+        self.assertTrue(result.ok)
+        self.assertEqual(result.applied, 3)
+        self.assertEqual(self.owners()[:4], ["Alice", "Bob", "Carol", None])
+        self.assertEqual(len(self.game.history), 3)
+        self.assertEqual(self.game.current_player.name, "Alice")
+
+    def test_stops_at_first_invalid_move(self):
+        result = apply_moves(self.game, self.buys("Alice", "Bob", "Alice", "Alice"))
+        self.assertFalse(result.ok)
+        self.assertEqual(result.applied, 2)
+        self.assertEqual(result.failed_index, 2)
+        self.assertIn("Wrong player", result.errors[0])
+        self.assertEqual(self.game.errors(), result.errors)
+        self.assertEqual(self.owners()[:3], ["Alice", "Bob", None])
+        self.assertEqual(len(self.game.history), 2)
+
+    def test_atomic_batch_rolls_back(self):
+        apply_moves(self.game, self.buys("Alice"))
+        cash = [p.cash for p in self.game.state.players]
+        moves = self.buys("Alice", "Bob", "Carol", "Bob")[1:]
+
+        result = apply_moves(self.game, moves, atomic=True)
+        self.assertEqual(result.failed_index, 2)
+        self.assertEqual(result.applied, 0)
+        self.assertEqual(self.owners()[:4], ["Alice", None, None, None])
+        self.assertEqual([p.cash for p in self.game.state.players], cash)
+        self.assertEqual(self.game.current_player.name, "Bob")
+        self.assertEqual(len(self.game.history), 1)
+        self.assertEqual(sorted(self.game.history.snapshots), [0])
+
+        self.assertTrue(apply_moves(self.game, moves[:2], atomic=True).ok)
+        self.assertEqual(self.owners()[:4], ["Alice", "Bob", "Carol", None])
+
+    def test_wrong_move_type(self):
+        self.game.setMinigame("StockRound")
+        result = apply_moves(self.game, self.buys("Alice"))
+        self.assertEqual(result.failed_index, 0)
+        self.assertEqual(result.errors, ["BuyPrivateCompanyMove is not a valid move during StockRound"])
+
+    def test_recorded_games(self):
+        for name, log in bench_games.recorded_games():
+            with self.subTest(game=name):
+                game = bench_games.new_game(log["variant"], log["players"])
+                moves = (LoggedMove(**entry).toMove() for entry in log["moves"])
+                result = apply_moves(game, moves)
+                self.assertTrue(result.ok, result)
+                self.assertEqual(result.applied, len(log["moves"]))
+                self.assertEqual(game.minigame_class, "StockRound")
+
+    def test_default_errors_not_shared(self):
+        self.assertEqual(BatchResult(0).errors, ())
+        self.assertIsInstance(BatchResult(0).errors, tuple)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import importlib
+import unittest
+
+from app.benchmarks import bench_games
+
+cfg1830 = importlib.import_module('app.config.1830')
+
+
+class BenchGamesTests(unittest.TestCase):
+    def tearDown(self):
+        importlib.reload(cfg1830)
+
+    def test_synthetic_game_reaches_stock_round(self):
+        log = bench_games.synthesize("1830", total_players=4, seed=0)
+        self.assertEqual(log["minigame_class"], "BuyPrivateCompany")
+        self.assertEqual(log["moves"][-1]["move_class"], "StockRoundMove")
+        self.assertEqual(log, bench_games.synthesize("1830", total_players=4, seed=0))
+
+    def test_measure_reports_per_minigame_latency(self):
+        name, log = next(bench_games.recorded_games())
+        result = bench_games.measure(name, log, "recorded", repeat=1)
+        self.assertEqual(result["moves"], len(log["moves"]))
+        self.assertEqual(sum(stats["count"] for stats in result["latency_us"].values()), result["moves"])
+        self.assertIn("StockRound", result["latency_us"])
+        self.assertLessEqual(result["latency_us"]["StockRound"]["p50"], result["latency_us"]["StockRound"]["max"])
+        self.assertGreater(result["peak_memory_bytes"], 0)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(bench_games.percentile(values, 50), 50)
+        self.assertEqual(bench_games.percentile(values, 99), 99)
+        self.assertEqual(bench_games.percentile([7], 90), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
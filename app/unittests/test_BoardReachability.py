@@ -0,0 +1,75 @@
+import unittest
+
+from app.base import GameBoard, Tile, Token, Color, Train
+from app.unittests.test_OperatingRoundMinigame import fake_company
+
+
+def lay(board, *locations, slots=1):
+    for location in locations:
+        board.setTrack(Tile("1", "1", Color.YELLOW, location, 0, slots=slots))
+
+
+class BoardReachabilityTests(unittest.TestCase):
+    def setUp(self):
+        self.board = GameBoard()
+        self.a = fake_company("A")
+        self.b = fake_company("B")
+        lay(self.board, "A1", "A3")
+        lay(self.board, "A5", slots=0)
+        lay(self.board, "F10")
+        self.board.setToken(Token(self.a, "A1"))
+        self.board.setToken(Token(self.b, "F10"))
+
+    def test_reach(self):
+        reach = self.board.reachable(self.a)
+        self.assertEqual(reach.stations, {"A1"})
+        self.assertEqual(reach.hexes, {"A1", "A3", "A5"})
+        self.assertEqual(reach.cities, {"A1", "A3"})
+        self.assertTrue(reach.routable)
+        self.assertFalse(self.board.reachable(self.b).routable)
+        self.assertIs(self.board.reachable(self.a), reach)
+
+    def test_track_invalidates_only_touching_networks(self):
+        reach_a, reach_b = self.board.reachable(self.a), self.board.reachable(self.b)
+        lay(self.board, "F12")
+        self.assertIs(self.board.reachable(self.a), reach_a)
+        self.assertEqual(self.board.reachable(self.b).hexes, {"F10", "F12"})
+
+        lay(self.board, "A7")
+        self.assertEqual(self.board.reachable(self.a).hexes, {"A1", "A3", "A5", "A7"})
+
+    def test_tokens_invalidate_their_company(self):
+        reach_a = self.board.reachable(self.a)
+        self.board.reachable(self.b)
+        self.board.place_token(self.b, "A3")
+        self.assertIs(self.board.reachable(self.a), reach_a)
+        self.assertEqual(self.board.reachable(self.b).stations, {"A3", "F10"})
+        self.assertIn("A5", self.board.reachable(self.b).hexes)
+
+    def test_untiled_station(self):
+        self.board.setToken(Token(self.b, "H2"))
+        self.assertTrue(self.board.canReach(self.b, "H2"))
+        self.assertTrue(self.board.canReach(self.b, "H4"))
+        self.assertFalse(self.board.canReach(self.b, "H6"))
+        lay(self.board, "H2")
+        self.assertIn("H2", self.board.reachable(self.b).hexes)
+
+    def test_fork_keeps_its_own_cache(self):
+        self.board.reachable(self.a)
+        fork = self.board.fork()
+        lay(fork, "A7")
+        self.assertNotIn("A7", self.board.reachable(self.a).hexes)
+        self.assertIn("A7", fork.reachable(self.a).hexes)
+
+    def test_has_valid_route(self):
+        self.a.trains = [Train("2", 80)]
+        self.b.trains = [Train("2", 80)]
+        self.assertTrue(self.a.hasValidRoute(self.board))
+        self.assertFalse(self.b.hasValidRoute(self.board))
+        self.assertTrue(self.b.hasValidRoute())
+        lay(self.board, "G11")
+        self.assertTrue(self.b.hasValidRoute(self.board))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from app.base import GameBoard, Tile, Token, Color
+from app.unittests.test_OperatingRoundMinigame import fake_company
+
+
+class BoardTokenIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.board = GameBoard()
+        self.board.setTrack(Tile("1", "1", Color.YELLOW, "A1", 0, slots=2))
+        self.board.setTrack(Tile("2", "2", Color.YELLOW, "A2", 0))
+        self.a = fake_company("A")
+        self.b = fake_company("B")
+
+    def test_place_token_and_set_token(self):
+        self.assertTrue(self.board.place_token(self.a, "A1"))
+        self.board.setToken(Token(self.a, "A1"))
+        self.board.setToken(Token(self.b, "A1"))
+        self.assertEqual(self.board.stations("A"), {"A1"})
+        self.assertTrue(self.board.hasStation("B", "A1"))
+        self.assertFalse(self.board.hasStation("B", "A2"))
+        self.assertFalse(self.board.hasAnyStation("C"))
+        self.assertEqual(self.board.occupancy("A1"), 2)
+        self.assertEqual(self.board.occupancy("A2"), 0)
+
+    def test_full_tile(self):
+        self.assertTrue(self.board.place_token(self.a, "A2"))
+        self.assertFalse(self.board.place_token(self.b, "A2"))
+        self.assertFalse(self.board.hasAnyStation("B"))
+        self.assertEqual(self.board.occupancy("A2"), 1)
+
+    def test_tile_replacement(self):
+        self.board.place_token(self.a, "A2")
+        self.board.setTrack(Tile("3", "3", Color.GREEN, "A2", 0, tokens=["B"]))
+        self.assertFalse(self.board.hasStation("A", "A2"))
+        self.assertTrue(self.board.hasStation("B", "A2"))
+        self.assertEqual(self.board.occupancy("A2"), 1)
+
+        self.board.setToken(Token(self.a, "A2"))
+        self.board.setTrack(Tile("4", "4", Color.BROWN, "A2", 0))
+        self.assertTrue(self.board.hasStation("A", "A2"))  # Still listed in board.tokens
+        self.assertFalse(self.board.hasStation("B", "A2"))
+        self.assertEqual(self.board.occupancy("A2"), 0)
+
+    def test_fork(self):
+        self.board.place_token(self.a, "A1")
+        fork = self.board.fork()
+        fork.place_token(self.b, "A1")
+        fork.place_token(self.a, "A2")
+        self.assertEqual(self.board.stations("A"), {"A1"})
+        self.assertEqual(fork.stations("A"), {"A1", "A2"})
+        self.assertEqual(self.board.occupancy("A1"), 1)
+        self.assertEqual(fork.occupancy("A1"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+import app.base
+from app.base import ShareLedger, StockPurchaseSource, STOCK_CERTIFICATE, \
+    STOCK_PRESIDENT_CERTIFICATE
+from app.unittests.test_PrivateCompanyMinigame import fake_player, fake_private_company
+from app.unittests.test_StockRoundMinigame import fake_public_company
+
+
+class CertificateCountTests(unittest.TestCase):
+    def setUp(self):
+        app.base.DEBUG_CERTIFICATE_COUNT = True
+        self.a = fake_player("A", 10000, 0)
+        self.b = fake_player("B", 10000, 1)
+        self.company = fake_public_company("ABC")
+        self.company.setInitialPrice(100)
+
+    def tearDown(self):
+        app.base.DEBUG_CERTIFICATE_COUNT = False
+
+    def test_buy_and_sell(self):
+        self.company.setPresident(self.a)
+        self.company.buy(self.a, StockPurchaseSource.IPO, STOCK_PRESIDENT_CERTIFICATE)
+        self.assertEqual(self.a.getCertificateCount(), 1)
+        self.company.buy(self.a, StockPurchaseSource.IPO, STOCK_CERTIFICATE)
+        self.company.buy(self.b, StockPurchaseSource.IPO, STOCK_CERTIFICATE)
+        self.assertEqual(self.a.getCertificateCount(), 2)
+        self.assertEqual(self.b.getCertificateCount(), 1)
+
+        self.company.sell(self.a, STOCK_CERTIFICATE)
+        self.assertEqual(self.a.getCertificateCount(), 1)
+
+    def test_presidency_change(self):
+        self.company.setPresident(self.a)
+        self.company.buy(self.a, StockPurchaseSource.IPO, STOCK_PRESIDENT_CERTIFICATE)
+        self.company.buy(self.b, StockPurchaseSource.IPO, 30)
+        self.company.checkPresident()
+        self.assertEqual(self.company.president, self.b)
+        self.assertEqual(self.a.getCertificateCount(), 2)
+        self.assertEqual(self.b.getCertificateCount(), 2)
+
+    def test_private_companies(self):
+        private_company = fake_private_company(1, 10)
+        private_company.setBelongs(self.a)
+        self.assertEqual(self.a.getCertificateCount(), 1)
+        private_company.setBelongs(self.b)
+        self.assertEqual(self.a.getCertificateCount(), 0)
+        self.assertEqual(self.b.getCertificateCount(), 1)
+
+    def test_owners_assignment(self):
+        self.company.owners = {self.a: 30}
+        self.assertEqual(self.a.getCertificateCount(), 3)
+        self.company.owners = {self.b: 10}
+        self.assertEqual(self.a.getCertificateCount(), 0)
+        self.assertEqual(self.b.getCertificateCount(), 1)
+
+    def test_share_ledger(self):
+        ShareLedger.attach([self.a, self.b], [self.company])
+        self.company.setPresident(self.a)
+        self.company.buy(self.a, StockPurchaseSource.IPO, STOCK_PRESIDENT_CERTIFICATE)
+        self.company.buy(self.b, StockPurchaseSource.IPO, STOCK_CERTIFICATE)
+        self.assertEqual(self.a.getCertificateCount(), 1)
+        self.assertEqual(self.b.getCertificateCount(), 1)
+
+    def test_debug_mode_detects_drift(self):
+        self.company.buy(self.a, StockPurchaseSource.IPO, STOCK_CERTIFICATE)
+        self.company.owners[self.a] = 30  # Bypasses PublicCompany, so the running total goes stale
+        with self.assertRaises(AssertionError):
+            self.a.getCertificateCount()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import sys
+import unittest
+
+from app.base import Player, PublicCompany
+from app.unittests.test_PrivateCompanyMinigame import fake_player
+from app.unittests.test_StockRoundMinigame import fake_public_company
+
+
+class EntityIdentityTests(unittest.TestCase):
+    def test_player_hash_follows_id(self):
+        player = fake_player("A")
+        self.assertEqual(hash(player), hash("A"))
+        player.id = "B"
+        self.assertEqual(hash(player), hash("B"))
+        self.assertEqual(player, fake_player("B"))
+
+    def test_created_player_id_is_interned(self):
+        player = Player.create("Alice", 100, 0)
+        self.assertIs(sys.intern("".join(list(player.id))), player.id)
+        self.assertEqual(hash(player), hash(player.id))
+
+    def test_company_usable_as_key(self):
+        company = fake_public_company("ABC")
+        owners = {company: 10}
+        self.assertEqual(owners[fake_public_company("ABC")], 10)
+        self.assertNotEqual(company, fake_player("ABC"))
+
+    def test_slots_layout(self):
+        player = fake_player("A")
+        company = fake_public_company("ABC")
+        self.assertFalse(hasattr(player, "__dict__"))
+        self.assertFalse(hasattr(company, "__dict__"))
+        with self.assertRaises(AttributeError):
+            player.nickname = "nope"
+        with self.assertRaises(AttributeError):
+            PublicCompany.initiate(id="X", nickname="nope")
+
+
+if __name__ == "__main__":
+    unittest.main()
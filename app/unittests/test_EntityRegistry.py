@@ -0,0 +1,63 @@
+import json
+import unittest
+
+from app.base import EntityRegistry, Move, MutableGameState
+from app.minigames.StockRound.move import StockRoundMove
+from app.unittests.test_PrivateCompanyMinigame import fake_player, fake_private_company
+from app.unittests.test_StockRoundMinigame import fake_public_company
+
+
+class EntityRegistryTests(unittest.TestCase):
+    def state(self) -> MutableGameState:
+        state = MutableGameState()
+        state.players = [fake_player("A"), fake_player("B")]
+        state.public_companies = [fake_public_company(x) for x in ["ABC", "DEF"]]
+        state.private_companies = [fake_private_company(1), fake_private_company(2)]
+        return state
+
+    def test_state_lists_are_registries(self):
+        state = self.state()
+        self.assertIsInstance(state.players, EntityRegistry)
+        self.assertEqual(state.findPlayer("B"), state.players[1])
+        self.assertEqual(state.findPublicCompany("DEF"), state.public_companies[1])
+        self.assertEqual(state.findPrivateCompany(2), state.private_companies[1])
+        self.assertIsNone(state.findPlayer("Z"))
+
+    def test_index_follows_mutations(self):
+        state = self.state()
+        state.players.append(fake_player("C"))
+        self.assertEqual(state.findPlayer("C").id, "C")
+
+        state.players.remove(state.findPlayer("A"))
+        self.assertIsNone(state.findPlayer("A"))
+
+        state.players[0] = fake_player("D")
+        self.assertIsNone(state.findPlayer("B"))
+        self.assertEqual(state.findPlayer("D").id, "D")
+
+        state.players.extend([fake_player("E")])
+        del state.players[-1]
+        self.assertIsNone(state.findPlayer("E"))
+        self.assertEqual([p.id for p in state.players], ["D", "C"])
+
+    def test_backfill_uses_registry(self):
+        state = self.state()
+        move = StockRoundMove.fromMove(Move.fromMessage(json.dumps({
+            "player_id": "B",
+            "public_company_id": "ABC",
+            "source": "IPO",
+            "move_type": "BUYSELL",
+            "for_sale_raw": [["DEF", 10]],
+        })))
+        move.backfill(state)
+        self.assertIs(move.player, state.players[1])
+        self.assertIs(move.public_company, state.public_companies[0])
+        self.assertEqual(move.for_sale, [(state.public_companies[1], 10)])
+
+        move.player_id = "Z"
+        with self.assertRaises(ValueError):
+            move.backfill(state)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import importlib
+import unittest
+
+from app.base import GameBoard, Tile, Token, Color, StockPurchaseSource
+from app.state import Game, apply_move
+from app.unittests.scenarios.move_factory import PrivateCompanyInitialAuctionMoves
+from app.unittests.test_StockRoundMinigame import fake_public_company
+
+cfg1830 = importlib.import_module('app.config.1830')
+
+
+class GameForkTests(unittest.TestCase):
+    def setUp(self):
+        importlib.reload(cfg1830)
+
+    def tearDown(self):
+        importlib.reload(cfg1830)
+
+    def game(self, **kwargs) -> Game:
+        game = Game.start(["Alice", "Bob", "Carol"], variant="1830", **kwargs)
+        game.setPlayerOrder()
+        game.setCurrentPlayer()
+        return game
+
+    def buy_next_private(self, game):
+        company = next(pc for pc in game.state.private_companies if pc.hasNoOwner())
+        move = PrivateCompanyInitialAuctionMoves.buy(game.current_player.name, company.short_name, game.state)
+        apply_move(game, move)
+        return company
+
+    def test_moves_on_fork_leave_parent_untouched(self):
+        game = self.game()
+        self.buy_next_private(game)
+        cash = [p.cash for p in game.state.players]
+
+        fork = game.fork()
+        company = self.buy_next_private(fork)
+
+        self.assertTrue(fork.state.findPrivateCompany(company.order).hasOwner())
+        self.assertTrue(game.state.findPrivateCompany(company.order).hasNoOwner())
+        self.assertEqual([p.cash for p in game.state.players], cash)
+        self.assertNotEqual(fork.current_player, game.current_player)
+        self.assertIs(fork.state.findPrivateCompany(company.order).belongs_to, fork.state.players[1])
+        self.assertIn(fork.state.findPrivateCompany(company.order), fork.state.players[1].private_companies)
+
+    def test_fork_shares_static_data(self):
+        game = self.game()
+        fork = game.fork()
+        self.assertIs(fork.config, game.config)
+        self.assertIsNone(fork.history)
+        self.assertIsNot(fork.state.players[0], game.state.players[0])
+        self.assertIs(fork.get_player_order_fn().state, fork.state)
+        self.assertIs(fork.get_player_order_fn().players, fork.state.players)
+
+    def test_fork_relinks_share_ownership(self):
+        for share_ledger in [False, True]:
+            game = self.game(share_ledger=share_ledger)
+            company = game.state.public_companies[0]
+            company.setInitialPrice(100)
+            company.setPresident(game.state.players[0])
+            company.buy(game.state.players[0], StockPurchaseSource.IPO, 20)
+
+            fork = game.fork()
+            forked_company = fork.state.public_companies[0]
+            forked_company.buy(fork.state.players[1], StockPurchaseSource.IPO, 30)
+            forked_company.checkPresident()
+
+            self.assertIs(forked_company.president, fork.state.players[1])
+            self.assertIs(company.president, game.state.players[0])
+            self.assertEqual(company.owners.get(game.state.players[1], 0), 0)
+            self.assertEqual(game.state.players[1].getCertificateCount(), 0)
+            self.assertEqual(fork.state.players[1].getCertificateCount(), 2)
+            importlib.reload(cfg1830)
+
+
+class GameBoardForkTests(unittest.TestCase):
+    def test_copy_on_write_tiles(self):
+        board = GameBoard()
+        board.setTrack(Tile("1", "1", Color.YELLOW, "A1", 0))
+        board.setTrack(Tile("2", "2", Color.YELLOW, "A2", 0))
+        fork = board.fork()
+        self.assertIs(fork.board["A1"], board.board["A1"])
+
+        company = fake_public_company("ABC")
+        fork.setToken(Token(company, "A1", 0))
+        self.assertEqual(fork.board["A1"].tokens, ["ABC"])
+        self.assertEqual(board.board["A1"].tokens, [])
+        self.assertNotIn("A1", board.tokens)
+        self.assertIs(fork.board["A2"], board.board["A2"])
+
+        board.place_token(company, "A2")
+        self.assertEqual(board.board["A2"].tokens, ["ABC"])
+        self.assertEqual(fork.board["A2"].tokens, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
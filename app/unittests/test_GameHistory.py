@@ -0,0 +1,97 @@
+import importlib
+import unittest
+
+from app.history import GameHistory
+from app.state import Game, apply_move
+from app.unittests.scenarios.move_factory import PrivateCompanyInitialAuctionMoves
+
+cfg1830 = importlib.import_module('app.config.1830')
+
+
+class GameHistoryTests(unittest.TestCase):
+    def setUp(self):
+        importlib.reload(cfg1830)
+        self.game = Game.start(["Alice", "Bob", "Carol"], variant="1830")
+        self.game.history = GameHistory(snapshot_interval=2)
+        self.game.setPlayerOrder()
+        self.game.setCurrentPlayer()
+
+    def tearDown(self):
+        importlib.reload(cfg1830)
+
+    def test_history_is_opt_in(self):
+        self.assertIsNone(Game.start(["Alice", "Bob"], variant="1830").history)
+        self.assertIsInstance(Game.start(["Alice", "Bob"], variant="1830", history=True).history, GameHistory)
+
+    def buy_privates(self, count):
+        for company in self.game.state.private_companies[:count]:
+            move = PrivateCompanyInitialAuctionMoves.buy(
+                self.game.current_player.name, company.short_name, self.game.state)
+            apply_move(self.game, move)
+
+    def owners(self, game):
+        return [(pc.belongs_to.id if pc.belongs_to else None) for pc in game.state.private_companies]
+
+    def test_moves_and_snapshots_recorded(self):
+        self.buy_privates(5)
+        self.assertEqual(len(self.game.history), 5)
+        self.assertEqual(sorted(self.game.history.snapshots), [0, 2, 4])
+        self.assertEqual(self.game.history.moves[0].move_class, "BuyPrivateCompanyMove")
+
+    def test_replay_any_index(self):
+        self.buy_privates(5)
+        self.assertEqual(self.game.history.nearestSnapshot(3), 2)
+
+        replayed = self.game.replay(3)
+        self.assertEqual(self.owners(replayed)[:3], self.owners(self.game)[:3])
+        self.assertEqual(self.owners(replayed)[3:], [None, None, None])
+        self.assertIsNone(replayed.history)
+
+        replayed = self.game.replay(5)
+        self.assertEqual(self.owners(replayed), self.owners(self.game))
+        self.assertEqual([p.cash for p in replayed.state.players], [p.cash for p in self.game.state.players])
+        self.assertEqual(replayed.current_player.id, self.game.current_player.id)
+
+        self.assertEqual(self.owners(self.game.replay(0)), [None] * 6)
+
+    def test_replay_does_not_touch_live_game(self):
+        self.buy_privates(2)
+        replayed = self.game.replay(2)
+        replayed.state.players[0].cash = 0
+        self.assertNotEqual(self.game.state.players[0].cash, 0)
+        with self.assertRaises(IndexError):
+            self.game.replay(3)
+
+    def test_replay_before_any_move(self):
+        self.assertIsNone(self.game.history.nearestSnapshot(0))
+        replayed = self.game.replay(0)
+        self.assertEqual(self.owners(replayed), [None] * 6)
+        self.assertIsNone(replayed.history)
+
+    def test_moves_without_a_message_are_refused(self):
+        move = PrivateCompanyInitialAuctionMoves.buy(
+            self.game.current_player.name, self.game.state.private_companies[0].short_name, self.game.state)
+        move.msg = None
+        self.assertFalse(self.game.performedMove(move))
+        self.assertEqual(len(self.game.history), 0)
+        self.assertEqual(self.owners(self.game), [None] * 6)
+
+    def test_snapshots_are_forks(self):
+        self.buy_privates(1)
+        snapshot = self.game.history.snapshots[0]
+        self.assertIsNot(snapshot.state.players[0], self.game.state.players[0])
+        self.assertEqual(self.owners(snapshot), [None] * 6)
+
+    def test_saved_game_is_loaded(self):
+        self.buy_privates(4)
+        saved = self.game.history.toDict()
+
+        importlib.reload(cfg1830)
+        players = [player for player in self.game.replay(0).state.players]
+        loaded = Game.initialize(players, cfg1830, saved_game=saved)
+        self.assertEqual(self.owners(loaded), self.owners(self.game))
+        self.assertEqual(loaded.current_player.id, self.game.current_player.id)
+
+
+if __name__ == "__main__":
+    unittest.main()
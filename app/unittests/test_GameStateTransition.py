@@ -1,9 +1,11 @@
 import json
 import unittest
 
-from app.base import Move
-from app.state import Game, apply_move
+from app.base import Move, MutableGameState
+from app.minigames.base import Minigame
+from app.state import Game, apply_move, Transition
 from app.minigames.PrivateCompanyInitialAuction.move import BuyPrivateCompanyMove
+from app.minigames.StockRound.move import StockRoundMove
 
 
 class GameStateTransitionTests(unittest.TestCase):
@@ -30,5 +32,61 @@ class GameStateTransitionTests(unittest.TestCase):
         self.assertEqual(state.private_companies[0].belongs_to, state.players[0])
 
 
+class CountingMinigame(Minigame):
+    def __init__(self):
+        super().__init__()
+        self.next_calls = 0
+        self.result = "BuyPrivateCompany"
+
+    def run(self, move: Move, state: MutableGameState) -> bool:
+        return True
+
+    def next(self, state: MutableGameState) -> str:
+        self.next_calls += 1
+        return self.result
+
+
+class MinigameRegistryTests(unittest.TestCase):
+    def game(self) -> Game:
+        game = Game.start(["Alice", "Bob"], variant="1830")
+        game.setPlayerOrder()
+        game.setCurrentPlayer()
+        return game
+
+    def test_minigame_instance_reused(self):
+        game = self.game()
+        self.assertIs(game.getMinigame(), game.getMinigame())
+
+    def test_next_evaluated_once_per_move(self):
+        game = self.game()
+        minigame = CountingMinigame()
+        game.minigames["BuyPrivateCompany"] = minigame
+
+        self.assertTrue(game.performedMove(Move()))
+        self.assertEqual(minigame.next_calls, 1)
+        self.assertEqual(game.last_transition, Transition("BuyPrivateCompany", "BuyPrivateCompany"))
+        self.assertFalse(game.last_transition.changed)
+
+        minigame.result = "StockRound"
+        self.assertTrue(game.performedMove(Move()))
+        self.assertEqual(minigame.next_calls, 2)
+        self.assertTrue(game.last_transition.changed)
+        self.assertEqual(game.minigame_class, "StockRound")
+        self.assertNotIn("BuyPrivateCompany", game.minigames)
+
+    def test_minigame_lives_for_the_round(self):
+        game = self.game()
+        game.setMinigame("StockRound")
+        stock_round = game.getMinigame()
+        stock_round.last_deal_player = game.state.players[0]
+        stock_round.sell_private_company_auction = True  # Left over from an earlier move
+
+        self.assertTrue(game.performedMove(StockRoundMove.fromMove(Move.fromMessage(json.dumps(
+            {"player_id": game.current_player.id, "move_type": "PASS"})))))
+        self.assertIs(game.getMinigame(), stock_round)
+        self.assertFalse(stock_round.sell_private_company_auction)  # Reset by the move
+        self.assertIs(stock_round.last_deal_player, game.state.players[0])  # Kept for the priority deal
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,81 @@
+import importlib
+import unittest
+
+from app.base import GameBoard
+from app.hexgrid import HexGrid, EAST, SOUTH_EAST, SOUTH_WEST, WEST, NORTH_WEST, NORTH_EAST, opposite, \
+    parse_location, grid_for
+
+
+class HexGridTests(unittest.TestCase):
+    def setUp(self):
+        self.grid = HexGrid.rectangle(4, 8)
+
+    def neighbours(self, location):
+        return {self.grid.locations[n] for n in self.grid.neighbours[self.grid.hexId(location)]}
+
+    def test_doubled_columns(self):
+        self.assertEqual(self.grid.locations[:6], ["A1", "A3", "A5", "A7", "B2", "B4"])
+        self.assertNotIn("A2", self.grid)
+        self.assertNotIn("B1", self.grid)
+
+    def test_neighbours(self):
+        self.assertEqual(self.neighbours("C5"), {"C3", "C7", "B4", "B6", "D4", "D6"})
+        self.assertEqual(self.neighbours("B4"), {"B2", "B6", "A3", "A5", "C3", "C5"})
+        self.assertEqual(self.neighbours("A1"), {"A3", "B2"})
+
+    def test_edges(self):
+        c5 = self.grid.hexId("C5")
+        by_edge = [self.grid.locations[n] for n in self.grid.neighbours_by_edge[c5]]
+        self.assertEqual(by_edge, ["C7", "D6", "D4", "C3", "B4", "B6"])
+        self.assertEqual(self.grid.edge(c5, self.grid.hexId("D6")), SOUTH_EAST)
+        self.assertEqual(self.grid.edge(self.grid.hexId("D6"), c5), opposite(SOUTH_EAST))
+        self.assertIsNone(self.grid.edge(c5, self.grid.hexId("A1")))
+        self.assertEqual(self.grid.neighbours_by_edge[self.grid.hexId("A1")][NORTH_WEST], -1)
+        self.assertEqual([opposite(e) for e in [EAST, SOUTH_EAST, SOUTH_WEST]], [WEST, NORTH_WEST, NORTH_EAST])
+
+    def test_map_from_locations(self):
+        grid = HexGrid(["A1", "B2", "NY", "A1"])
+        self.assertEqual(len(grid), 2)
+        self.assertNotIn("NY", grid)
+        self.assertTrue(grid.adjacent(grid.hexId("A1"), grid.hexId("B2")))
+        self.assertIsNone(parse_location("NY"))
+        self.assertEqual(parse_location("G15"), (6, 15))
+        with self.assertRaises(ValueError):
+            HexGrid(["A1", "A2"])  # A2 is on the other half of the doubled grid
+
+    def test_board_shares_grid(self):
+        board = GameBoard()
+        self.assertIs(board.grid, HexGrid.rectangle())
+        self.assertIs(board.fork().grid, board.grid)
+        self.assertTrue(board.adjacent("B2", "A3"))
+        self.assertFalse(board.adjacent("A1", "A5"))
+        self.assertFalse(board.adjacent("A1", "NY"))
+
+
+class VariantMapTests(unittest.TestCase):
+    def setUp(self):
+        self.config = importlib.import_module("app.config.1830")
+        self.board = GameBoard.forVariant(self.config)
+
+    def test_1830_map(self):
+        self.assertIs(self.board.grid, grid_for(self.config))
+        self.assertIs(GameBoard.forVariant(self.config).grid, self.board.grid)
+        self.assertEqual(set(self.board.neighbours("G19")), {"G17", "G21", "F18", "F20", "H18", "H20"})
+        self.assertTrue(self.board.adjacent("I13", "I15"))
+        self.assertTrue(self.board.adjacent("E5", "E7"))
+        self.assertTrue(self.board.adjacent("G15", "F16"))
+        self.assertNotIn("A1", self.board.grid)  # Not on the 1830 map
+
+    def test_config_hexes_are_on_the_map(self):
+        hexes = set(self.config.HEX_LABELS) | set(self.config.SPECIAL_HEX_RULES)
+        for private in self.config.PRIVATE_COMPANIES:
+            hexes.update(private.base.split("/"))
+        for location in hexes:
+            self.assertIn(location, self.board.grid)
+
+    def test_variant_without_a_map(self):
+        self.assertIs(grid_for(importlib.import_module("app.config.1846")), HexGrid.rectangle())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from app.minigames.base import Minigame
+from app.minigames.base import Minigame, ValidationMode
 from app.base import Move, MutableGameState, err
 
 class DummyMinigame(Minigame):
@@ -32,6 +32,50 @@ class MinigameErrorIsolationTests(unittest.TestCase):
         m.validate([err(True, "")])
         self.assertEqual(m.errors(), [])
 
+
+class ExplodingParam:
+    def __format__(self, spec):
+        raise AssertionError("Message should not have been formatted")
+
+
+class LazyValidationTests(unittest.TestCase):
+    def checks(self, evaluated):
+        evaluated.append(1)
+        yield err(True, "passes")
+        evaluated.append(2)
+        yield err(False, "first failure {}", 1)
+        evaluated.append(3)
+        yield err(False, "second failure {}", 2)
+
+    def test_full_mode_reports_every_failure(self):
+        evaluated = []
+        m = DummyMinigame()
+        self.assertFalse(m.validate(self.checks(evaluated)))
+        self.assertEqual(evaluated, [1, 2, 3])
+        self.assertEqual(m.errors(), ["first failure 1", "second failure 2"])
+
+    def test_first_failure_mode_short_circuits(self):
+        evaluated = []
+        m = DummyMinigame()
+        m.validation_mode = ValidationMode.FIRST_FAILURE
+        self.assertFalse(m.validate(self.checks(evaluated)))
+        self.assertEqual(evaluated, [1, 2])
+        self.assertEqual(m.errors(), ["first failure 1"])
+
+    def test_messages_formatted_lazily(self):
+        m = DummyMinigame()
+        self.assertFalse(m.validate([err(False, "boom {}", ExplodingParam())]))
+        with self.assertRaises(AssertionError):
+            m.errors()
+
+    def test_is_valid_restores_mode(self):
+        evaluated = []
+        m = DummyMinigame()
+        self.assertFalse(m.isValid(lambda: m.validate(self.checks(evaluated))))
+        self.assertEqual(evaluated, [1, 2])
+        self.assertEqual(m.validation_mode, ValidationMode.FULL)
+
+
 if __name__ == '__main__':
     unittest.main()
 
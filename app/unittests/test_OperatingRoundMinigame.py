@@ -1,5 +1,8 @@
+import json
 import unittest
-from app.base import GameBoard, Tile, Token, Route, PublicCompany, MutableGameState, Player, Train, Color, PrivateCompany
+from app.base import GameBoard, Tile, Token, Route, PublicCompany, MutableGameState, Player, Train, Color, PrivateCompany, \
+    Move
+from app.history import LoggedMove
 from app.minigames.operating_round import (
     OperatingRound,
     OperatingRoundMove,
@@ -134,7 +137,7 @@ class OperatingRoundTrackTests(unittest.TestCase):
         first = OperatingRoundMove()
         first.player_id = "A"
         first.construct_track = True
-        first.track = Tile("1", "1", Color.YELLOW, "A1", 0)
+        first.track = Tile("57", "57", Color.YELLOW, "A1", 0)
         first.public_company = self.company
         oround = OperatingRound()
         self.assertTrue(oround.run(first, self.state, board=self.board, config=cfg))
@@ -142,7 +145,7 @@ class OperatingRoundTrackTests(unittest.TestCase):
         green = OperatingRoundMove()
         green.player_id = "A"
         green.construct_track = True
-        green.track = Tile("2", "2", Color.GREEN, "A1", 0)
+        green.track = Tile("14", "14", Color.GREEN, "A1", 0)
         green.public_company = self.company
         self.assertTrue(oround.run(green, self.state, board=self.board, config=cfg))
 
@@ -153,7 +156,7 @@ class OperatingRoundTrackTests(unittest.TestCase):
         upgrade = OperatingRoundMove()
         upgrade.player_id = "A"
         upgrade.construct_track = True
-        upgrade.track = Tile("3", "3", Color.BROWN, "A1", 0)
+        upgrade.track = Tile("63", "63", Color.BROWN, "A1", 0)
         upgrade.public_company = self.company
         self.assertTrue(oround.run(upgrade, self.state, board=self.board, config=cfg))
         self.assertEqual(self.company.cash, start_cash - cfg.TRACK_LAYING_COSTS[Color.BROWN])
@@ -166,7 +169,7 @@ class OperatingRoundTrackTests(unittest.TestCase):
         first = OperatingRoundMove()
         first.player_id = "A"
         first.construct_track = True
-        first.track = Tile("1", "1", Color.YELLOW, "A1", 0)
+        first.track = Tile("57", "57", Color.YELLOW, "A1", 0)
         first.public_company = self.company
         oround = OperatingRound()
         self.assertTrue(oround.run(first, self.state, board=self.board, config=cfg))
@@ -174,7 +177,7 @@ class OperatingRoundTrackTests(unittest.TestCase):
         upgrade = OperatingRoundMove()
         upgrade.player_id = "A"
         upgrade.construct_track = True
-        upgrade.track = Tile("2", "2", Color.BROWN, "A1", 0)
+        upgrade.track = Tile("63", "63", Color.BROWN, "A1", 0)
         upgrade.public_company = self.company
         self.assertFalse(oround.run(upgrade, self.state, board=self.board, config=cfg))
 
@@ -292,8 +295,8 @@ class OperatingRoundTokenTests(unittest.TestCase):
 class OperatingRoundRouteTests(unittest.TestCase):
     def setUp(self):
         self.board = GameBoard()
-        self.board.setTrack(Tile("1", "1", Color.YELLOW, "A1", 0))
-        self.board.setTrack(Tile("2", "2", Color.YELLOW, "A2", 0))
+        self.board.setTrack(Tile("1", "1", Color.YELLOW, "A1", 0, revenue=10))
+        self.board.setTrack(Tile("2", "2", Color.YELLOW, "A3", 0, revenue=10))
         self.state = MutableGameState()
         self.state.players = [fake_player("A")]
         self.company = fake_company("A")
@@ -307,7 +310,7 @@ class OperatingRoundRouteTests(unittest.TestCase):
         move.player_id = "A"
         move.run_route = True
         move.pay_dividend = False
-        move.routes = [Route(["A1", "A2"])]
+        move.routes = [Route(["A1", "A3"])]
         move.public_company = self.company
         oround = OperatingRound()
         oround.run(move, self.state, board=self.board)
@@ -321,7 +324,7 @@ class OperatingRoundRouteTests(unittest.TestCase):
         move.player_id = "A"
         move.run_route = True
         move.pay_dividend = True
-        move.routes = [Route(["A1", "A2"])]
+        move.routes = [Route(["A1", "A3"])]
         move.public_company = self.company
         self.company.trains.append(Train("2", 100))
         oround = OperatingRound()
@@ -333,7 +336,7 @@ class OperatingRoundRouteTests(unittest.TestCase):
         move.player_id = "A"
         move.run_route = True
         move.pay_dividend = False
-        move.routes = [Route(["A1", "A2"])]
+        move.routes = [Route(["A1", "A3"])]
         move.public_company = self.company
         oround = OperatingRound()
         self.assertFalse(oround.run(move, self.state, board=self.board))
@@ -344,7 +347,7 @@ class OperatingRoundRouteTests(unittest.TestCase):
         move = OperatingRoundMove()
         move.player_id = "A"
         move.run_route = True
-        move.routes = [Route(["A1", "B1"])]
+        move.routes = [Route(["A1", "B2"])]
         move.public_company = self.company
         oround = OperatingRound()
         self.assertFalse(oround.run(move, self.state, board=self.board))
@@ -355,7 +358,7 @@ class OperatingRoundRouteTests(unittest.TestCase):
         move = OperatingRoundMove()
         move.player_id = "A"
         move.run_route = True
-        move.routes = [Route(["A1", "A2"]), Route(["A1", "A2"])]
+        move.routes = [Route(["A1", "A3"]), Route(["A1", "A3"])]
         move.public_company = self.company
         oround = OperatingRound()
         self.assertFalse(oround.run(move, self.state, board=self.board))
@@ -363,11 +366,11 @@ class OperatingRoundRouteTests(unittest.TestCase):
     def test_invalid_route_exceeds_capacity(self):
         token = Token(self.company, "A1", self.company.token_costs[0])
         self.board.setToken(token)
-        self.board.setTrack(Tile("3", "3", Color.YELLOW, "A3", 0))
+        self.board.setTrack(Tile("3", "3", Color.YELLOW, "A5", 0, revenue=10))
         move = OperatingRoundMove()
         move.player_id = "A"
         move.run_route = True
-        move.routes = [Route(["A1", "A2", "A3"])]
+        move.routes = [Route(["A1", "A3", "A5"])]
         move.public_company = self.company
         oround = OperatingRound()
         self.assertFalse(oround.run(move, self.state, board=self.board))
@@ -375,22 +378,74 @@ class OperatingRoundRouteTests(unittest.TestCase):
     def test_invalid_route_not_continuous(self):
         token = Token(self.company, "A1", self.company.token_costs[0])
         self.board.setToken(token)
-        self.board.setTrack(Tile("3", "3", Color.YELLOW, "A3", 0))
+        self.board.setTrack(Tile("3", "3", Color.YELLOW, "A5", 0, revenue=10))
         self.company.trains.append(Train("3", 180))
         move = OperatingRoundMove()
         move.player_id = "A"
         move.run_route = True
-        move.routes = [Route(["A1", "A3"])]
+        move.routes = [Route(["A1", "A5"])]
         move.public_company = self.company
         oround = OperatingRound()
         self.assertFalse(oround.run(move, self.state, board=self.board))
 
+    def test_route_follows_hex_adjacency(self):
+        self.board.setTrack(Tile("3", "3", Color.YELLOW, "B2", 0, revenue=10))
+        self.board.setTrack(Tile("4", "4", Color.YELLOW, "B4", 0, revenue=10))
+        self.board.setToken(Token(self.company, "B2", self.company.token_costs[0]))
+        move = OperatingRoundMove()
+        move.player_id = "A"
+        move.run_route = True
+        move.routes = [Route(["B2", "A3"])]
+        move.public_company = self.company
+        move.board = self.board
+        self.assertTrue(OperatingRound().isValidRoute(move))
+
+        move.routes = [Route(["A1", "B4"])]
+        self.assertFalse(OperatingRound().isValidRoute(move))
+
+
+class OperatingRoundMoveMessageTests(unittest.TestCase):
+    def test_from_message(self):
+        board = GameBoard()
+        board.setTrack(Tile("1", "1", Color.YELLOW, "A1", 0, revenue=10))
+        board.setTrack(Tile("2", "2", Color.YELLOW, "A3", 0, revenue=10))
+        state = MutableGameState()
+        state.players = [fake_player("A")]
+        company = fake_company("A")
+        company.trains.append(Train("2", 100))
+        state.public_companies = [company]
+        for msg in ({"player_id": "A", "public_company_id": "A", "purchase_token": True, "token": "A1"},
+                    {"player_id": "A", "public_company_id": "A", "run_route": True, "routes": [["A1", "A3"]]}):
+            logged = LoggedMove.fromMove(OperatingRoundMove.fromMove(Move.fromMessage(json.dumps(msg))))
+            move = logged.toMove()
+            self.assertIsInstance(move, OperatingRoundMove)
+            self.assertTrue(OperatingRound().run(move, state, board=board))
+            self.assertIs(move.public_company, company)
+        self.assertEqual(board.stations("A"), {"A1"})
+        self.assertEqual(company.cash, 1000 - 40 + 20)
+
+        track = OperatingRoundMove.fromMove(Move.fromMessage(json.dumps({
+            "player_id": "A", "construct_track": True,
+            "track": {"id": "9", "color": "YELLOW", "location": "A5", "rotation": 3},
+            "train": {"type": "3", "cost": 180, "rusts_on": "5"},
+        })))
+        self.assertEqual(track.track, Tile("9", "9", Color.YELLOW, "A5", 3))
+        self.assertEqual((track.train.type, track.train.cost, track.train.rusts_on), ("3", 180, "5"))
+
+    def test_unknown_company(self):
+        state = MutableGameState()
+        state.players = [fake_player("A")]
+        state.public_companies = [fake_company("A")]
+        move = OperatingRoundMove.fromMove(Move.fromMessage(json.dumps({"player_id": "A", "public_company_id": "X"})))
+        with self.assertRaises(ValueError):
+            move.backfill(state)
+
 
 class OperatingRoundPaymentOptionTests(unittest.TestCase):
     def setUp(self):
         self.board = GameBoard()
-        self.board.setTrack(Tile("1", "1", Color.YELLOW, "A1", 0))
-        self.board.setTrack(Tile("2", "2", Color.YELLOW, "A2", 0))
+        self.board.setTrack(Tile("1", "1", Color.YELLOW, "A1", 0, revenue=10))
+        self.board.setTrack(Tile("2", "2", Color.YELLOW, "A3", 0, revenue=10))
         self.state = MutableGameState()
         self.state.players = [fake_player("A")]
         self.company = fake_company("A")
@@ -421,7 +476,7 @@ class OperatingRoundPaymentOptionTests(unittest.TestCase):
         move.player_id = "A"
         move.run_route = True
         move.pay_dividend = True
-        move.routes = [Route(["A1", "A2"])]
+        move.routes = [Route(["A1", "A3"])]
         move.public_company = self.company
         self.company.trains.append(Train("2", 100))
         oround = OperatingRound()
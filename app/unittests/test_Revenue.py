@@ -0,0 +1,59 @@
+import unittest
+
+from app.base import GameBoard, Tile, Token, Color, Route, Train
+from app.revenue import DEFAULT_STOP_REVENUE
+from app.routing import find_routes
+from app.unittests.test_OperatingRoundMinigame import fake_company
+
+
+class RevenueTableTests(unittest.TestCase):
+    def setUp(self):
+        self.board = GameBoard()
+        self.board.setTrack(Tile("1", "1", Color.YELLOW, "A1", 0))
+        self.board.setTrack(Tile("57", "57", Color.YELLOW, "A3", 0, revenue=20))
+        self.board.setTrack(Tile("red", "red", Color.RED, "A5", 0, revenue=(30, 50, 70)))
+
+    def test_stop_values(self):
+        self.assertEqual(self.board.stopRevenue("A1"), DEFAULT_STOP_REVENUE)
+        self.assertEqual(self.board.stopRevenue("A1"), 0)  # No value on the tile
+        self.assertEqual(self.board.stopRevenue("C5"), 0)  # Empty hex
+        self.assertEqual(self.board.stopRevenue("A3"), 20)
+        self.assertEqual(self.board.stopRevenue("A5"), 30)
+        self.assertEqual(self.board.calculateRoute(Route(["A1", "A3", "A5"])), 50)
+
+    def test_phases(self):
+        self.board.setPhase(1)
+        self.assertEqual(self.board.calculateRoute(Route(["A3", "A5"])), 70)
+        self.board.setPhase(5)
+        self.assertEqual(self.board.stopRevenue("A5"), 70)
+        self.board.setTrack(Tile("red2", "red2", Color.RED, "B2", 0, revenue=(20, 40)))
+        self.assertEqual(self.board.stopRevenue("B2"), 40)
+
+    def test_upgrade_changes_value(self):
+        self.board.setTrack(Tile("15", "15", Color.GREEN, "A3", 0, revenue=30))
+        self.assertEqual(self.board.stopRevenue("A3"), 30)
+
+    def test_fork_and_snapshot(self):
+        fork = self.board.fork()
+        fork.setPhase(2)
+        self.assertEqual(fork.stopRevenue("A5"), 70)
+        self.assertEqual(self.board.stopRevenue("A5"), 30)
+        self.assertEqual(GameBoard.fromSnapshot(fork.snapshot()).stopRevenue("A5"), 70)
+
+    def test_score_many(self):
+        ids = [self.board.grid.hexId(location) for location in ["A1", "A3", "A5"]]
+        routes = [ids, ids[1:], ids[:1]]
+        self.assertEqual(self.board.revenue.scoreMany(routes), [50, 50, 0])
+        self.assertEqual(self.board.revenue.scoreMany([]), [])
+
+    def test_route_finder_prefers_valuable_stops(self):
+        self.board.setTrack(Tile("2", "2", Color.YELLOW, "B2", 0))
+        company = fake_company("A")
+        self.board.setToken(Token(company, "A3"))
+        plan = find_routes(self.board, company, [Train("2", 80)])
+        self.assertEqual(plan.routes, [Route(["A3", "A5"])])
+        self.assertEqual(plan.revenue, 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
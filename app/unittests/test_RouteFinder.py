@@ -0,0 +1,87 @@
+import time
+import unittest
+
+from app.base import GameBoard, Tile, Token, Color, Train, MutableGameState, Route
+from app.hexgrid import location_name
+from app.minigames.operating_round import OperatingRound, OperatingRoundMove
+from app.routing import find_routes
+from app.unittests.test_OperatingRoundMinigame import fake_company, fake_player
+
+
+def lay(board, *locations):
+    for location in locations:
+        board.setTrack(Tile("1", "1", Color.YELLOW, location, 0, revenue=10))
+
+
+class RouteFinderTests(unittest.TestCase):
+    def setUp(self):
+        self.board = GameBoard()
+        self.company = fake_company("A")
+
+    def is_valid(self, routes):
+        move = OperatingRoundMove()
+        move.routes = routes
+        move.public_company = self.company
+        move.board = self.board
+        return OperatingRound().isValidRoute(move)
+
+    def test_routes_need_a_station(self):
+        lay(self.board, "A1", "A3", "A5", "A7", "A9")
+        self.company.trains = [Train("3", 180), Train("2", 80)]
+        self.assertEqual(find_routes(self.board, self.company).routes, [])
+
+        self.board.setToken(Token(self.company, "A1"))
+        plan = find_routes(self.board, self.company)
+        self.assertEqual(plan.routes, [Route(["A1", "A3", "A5"])])
+        self.assertEqual(plan.revenue, 30)  # Only one route can use the single station.
+        self.assertTrue(plan.optimal)
+        self.assertTrue(self.is_valid(plan.routes))
+
+        self.board.setToken(Token(self.company, "A9"))
+        plan = find_routes(self.board, self.company)
+        self.assertEqual(plan.revenue, 50)
+        self.assertEqual(sorted(len(route.stops) for route in plan.routes), [2, 3])
+        self.assertTrue(self.is_valid(plan.routes))
+
+    def test_follows_hex_adjacency(self):
+        lay(self.board, "A1", "B2", "A3", "C7")
+        self.board.setToken(Token(self.company, "B2"))
+        plan = find_routes(self.board, self.company, [Train("D", 1100)])
+        self.assertEqual(sorted(plan.routes[0].stops), ["A1", "A3", "B2"])
+        self.assertEqual(plan.revenue, 30)
+        self.company.trains = [Train("D", 1100)]
+        self.assertTrue(self.is_valid(plan.routes))
+
+    def test_late_game_board_within_budget(self):
+        lay(self.board, *[location_name(row, column) for row in range(8)
+                          for column in range(1 + row % 2, 25, 2)])
+        self.board.setToken(Token(self.company, "A1"))
+        self.board.setToken(Token(self.company, "H12"))
+        self.board.setToken(Token(self.company, "D6"))
+        self.company.trains = [Train("D", 1100), Train("6", 630)]
+
+        start = time.perf_counter()
+        plan = find_routes(self.board, self.company, time_budget=0.3)
+        self.assertLess(time.perf_counter() - start, 0.6)
+        self.assertGreater(plan.revenue, 60)
+        self.assertTrue(self.is_valid(plan.routes))
+
+    def test_operating_round_finds_routes_when_none_given(self):
+        lay(self.board, "A1", "A3", "A5")
+        self.board.setToken(Token(self.company, "A1"))
+        self.company.trains = [Train("2", 80)]
+        state = MutableGameState()
+        state.players = [fake_player("A")]
+        state.public_companies = [self.company]
+
+        move = OperatingRoundMove()
+        move.player_id = "A"
+        move.run_route = True
+        move.public_company = self.company
+        self.assertTrue(OperatingRound().run(move, state, board=self.board))
+        self.assertEqual(move.routes, [Route(["A1", "A3"])])
+        self.assertEqual(self.company.cash, 1000 + 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
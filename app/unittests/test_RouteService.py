@@ -0,0 +1,89 @@
+import pickle
+import unittest
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+from app.base import GameBoard, Tile, Token, Color, Train, MutableGameState
+from app.hexgrid import location_name
+from app.minigames.operating_round import OperatingRound, OperatingRoundMove
+from app.route_service import RouteService
+from app.routing import find_routes
+from app.unittests.test_OperatingRoundMinigame import fake_company, fake_player
+
+
+class RouteServiceTests(unittest.TestCase):
+    def setUp(self):
+        self.board = GameBoard()
+        for row in range(3):
+            for column in range(1 + row % 2, 13, 2):
+                self.board.setTrack(Tile("1", "1", Color.YELLOW, location_name(row, column), 0, revenue=10))
+        self.a = fake_company("A")
+        self.b = fake_company("B")
+        self.a.trains = [Train("3", 180), Train("2", 80)]
+        self.b.trains = [Train("4", 300)]
+        self.board.setToken(Token(self.a, "A1"))
+        self.board.setToken(Token(self.b, "C11"))
+
+    def test_snapshot_round_trip(self):
+        snapshot = self.board.snapshot()
+        self.board.place_token(self.b, "A3")
+        board = GameBoard.fromSnapshot(snapshot)
+        self.assertEqual(board.stations("A"), {"A1"})
+        self.assertEqual(board.stations("B"), {"C11"})
+        self.assertEqual(board.occupancy("A3"), 0)
+        self.assertEqual(board.occupancy("A1"), 1)
+        self.assertIs(board.grid, self.board.grid)
+
+    def test_small_boards_solved_in_process(self):
+        with RouteService() as service:
+            plans = service.solve(self.board, [self.a, self.b])
+            self.assertIsNone(service._pool)
+        self.assertEqual(plans["A"], find_routes(self.board, self.a))
+        self.assertEqual(plans["B"].revenue, 40)
+
+    def test_process_pool(self):
+        with RouteService(max_workers=2, min_tiles=0) as service:
+            plans = service.solve(self.board, [self.a, self.b])
+            self.assertIsNotNone(service._pool)
+        self.assertEqual(plans["A"].revenue, find_routes(self.board, self.a).revenue)
+
+        state = MutableGameState()
+        state.players = [fake_player("A")]
+        state.public_companies = [self.a, self.b]
+        move = OperatingRoundMove()
+        move.player_id = "A"
+        move.run_route = True
+        move.routes = plans["A"].routes
+        move.public_company = self.a
+        self.assertTrue(OperatingRound().run(move, state, board=self.board))
+        self.assertEqual(self.a.cash, 1000 + plans["A"].revenue)
+
+    def test_broken_pool_falls_back_in_process(self):
+        class BrokenExecutor:
+            def __init__(self, error, at_submit):
+                self.error, self.at_submit = error, at_submit
+
+            def submit(self, *args):
+                if self.at_submit:
+                    raise self.error
+                future = Future()
+                future.set_exception(self.error)
+                return future
+
+            def shutdown(self, wait=True, cancel_futures=False):
+                pass
+
+        for error, at_submit in ((BrokenProcessPool("worker died"), False),
+                                 (pickle.PicklingError("can't pickle"), True)):
+            with self.subTest(error=error), RouteService(min_tiles=0) as service:
+                service._pool = BrokenExecutor(error, at_submit)
+                with self.assertLogs(level="WARNING"):
+                    plans = service.solve(self.board, [self.a, self.b])
+                self.assertEqual(plans["A"], find_routes(self.board, self.a))
+                self.assertEqual(plans["B"].revenue, 40)
+                self.assertTrue(service._pool_failed)
+                self.assertIsNone(service._pool)
+
+
+if __name__ == "__main__":
+    unittest.main()
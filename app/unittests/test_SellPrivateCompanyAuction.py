@@ -11,6 +11,7 @@ from app.base import Move, MutableGameState
 from app.minigames.StockRoundSellPrivateCompany.minigame_auction import Auction
 from app.minigames.StockRoundSellPrivateCompany.minigame_decision import AuctionDecision
 from app.minigames.StockRoundSellPrivateCompany.move import AuctionDecisionMove, AuctionBidMove
+from app.minigames.PrivateCompanyStockRoundAuction import move as stock_round_auction
 from app.unittests.test_PrivateCompanyMinigame import fake_player, fake_private_company
 from app.unittests.test_StockRoundMinigame import fake_public_company
 
@@ -323,6 +324,22 @@ class AuctionBidTests(unittest.TestCase):
             minigame.errors()
         )
 
+
+class AuctionMoveLookupTests(unittest.TestCase):
+    def test_missing_private_company(self):
+        state = MutableGameState()
+        state.players = [fake_player("A")]
+        state.private_companies = [fake_private_company(1)]
+        msg = json.dumps({"player_id": "A", "private_company_id": 9, "move_type": "PASS"})
+        for bid_class, decision_class in ((AuctionBidMove, AuctionDecisionMove),
+                                          (stock_round_auction.AuctionBidMove, stock_round_auction.AuctionDecisionMove)):
+            with self.assertRaisesRegex(ValueError, "Private company not found"):
+                bid_class.fromMove(Move.fromMessage(msg)).backfill(state)
+            with self.assertRaisesRegex(ValueError, "Private company not found"):
+                decision_class().find_private_company("9", state)
+            self.assertIs(decision_class().find_private_company("1", state), state.private_companies[0])
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,88 @@
+import unittest
+
+from app.base import ShareLedger, StockPurchaseSource, STOCK_CERTIFICATE, STOCK_PRESIDENT_CERTIFICATE
+from app.state import Game
+from app.unittests.test_PrivateCompanyMinigame import fake_player
+from app.unittests.test_StockRoundMinigame import fake_public_company
+
+
+class ShareLedgerTests(unittest.TestCase):
+    def setUp(self):
+        self.players = [fake_player("A", 1000, 0), fake_player("B", 1000, 1), fake_player("C", 1000, 2)]
+        self.companies = [fake_public_company(x) for x in ["ABC", "DEF"]]
+        self.ledger = ShareLedger.attach(self.players, self.companies)
+        for company in self.companies:
+            company.setInitialPrice(100)
+
+    def test_buy_writes_matrix(self):
+        a, b, c = self.players
+        abc, def_ = self.companies
+        abc.buy(a, StockPurchaseSource.IPO, STOCK_PRESIDENT_CERTIFICATE)
+        abc.buy(b, StockPurchaseSource.IPO, STOCK_CERTIFICATE)
+        def_.buy(b, StockPurchaseSource.IPO, STOCK_CERTIFICATE)
+
+        self.assertEqual(list(self.ledger.shares), [20, 0, 10, 10, 0, 0])
+        self.assertEqual(abc.owners[a], 20)
+        self.assertEqual(abc.owners[c], 0)
+        self.assertNotIn(c, abc.owners)
+        self.assertEqual(dict(abc.owners.items()), {a: 20, b: 10})
+        self.assertEqual(b.portfolio, {abc, def_})
+        self.assertEqual(abc.outstanding_shares, 30)
+
+    def test_existing_holdings_are_migrated(self):
+        company = fake_public_company("GHI")
+        company.owners = {self.players[1]: 30}
+        ShareLedger.attach(self.players, [company])
+        self.assertEqual(company.owners[self.players[1]], 30)
+        self.assertEqual(self.players[1].hasStock(company), 30)
+
+    def test_presidency_and_certificates(self):
+        a, b, c = self.players
+        abc = self.companies[0]
+        abc.setPresident(a)
+        abc.buy(a, StockPurchaseSource.IPO, STOCK_PRESIDENT_CERTIFICATE)
+        abc.buy(b, StockPurchaseSource.IPO, 30)
+        self.assertEqual(abc.potentialPresidents(), {a, b})
+        abc.checkPresident()
+        self.assertEqual(abc.president, b)
+        self.assertEqual(a.getCertificateCount(), 2)
+        self.assertEqual(b.getCertificateCount(), 2)
+
+        abc.sell(b, 20)
+        self.assertEqual(abc.potentialPresidents(), {a})
+        self.assertEqual(b.hasStock(abc), 10)
+
+    def test_pay_dividends(self):
+        a, b, c = self.players
+        abc = self.companies[0]
+        abc.owners = {a: 60, b: 20}
+        abc.stocks[StockPurchaseSource.IPO] = 20
+        abc.cash = 0
+        abc._income = 100
+        abc.payDividends()
+        self.assertEqual([p.cash for p in self.players], [1060, 1020, 1000])
+        self.assertEqual(abc.cash, 20)
+
+    def test_game_option(self):
+        config = type("cfg", (), {"PRIVATE_COMPANIES": [], "PUBLIC_COMPANIES": self.companies})
+        game = Game.initialize(self.players, config, share_ledger=True)
+        self.assertIsNotNone(game.state.share_ledger)
+        self.assertIs(game.state.public_companies[0].owners.ledger, game.state.share_ledger)
+        self.assertIs(self.companies[0].owners.ledger, self.ledger)  # The config's companies are left alone
+
+    def test_games_back_to_back(self):
+        # No config reload between the games: each keeps its own companies and ledger
+        games = [Game.start(["Alice", "Bob", "Carol"], variant="1830", share_ledger=True) for _ in range(2)]
+        for game in games:
+            company = game.state.public_companies[0]
+            company.setInitialPrice(90)
+            company.buy(game.state.players[0], StockPurchaseSource.IPO, STOCK_PRESIDENT_CERTIFICATE)
+        first, second = games
+        self.assertIsNot(first.state.public_companies[0], second.state.public_companies[0])
+        self.assertEqual(first.state.players[0].hasStock(first.state.public_companies[0]), 20)
+        self.assertEqual(second.state.share_ledger.holdings(second.state.players[0]),
+                         [(second.state.public_companies[0], 20)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from app.base import ShareLedger, ShareholderRanking, StockPurchaseSource, STOCK_CERTIFICATE, \
+    STOCK_PRESIDENT_CERTIFICATE
+from app.unittests.test_PrivateCompanyMinigame import fake_player
+from app.unittests.test_StockRoundMinigame import fake_public_company
+
+
+class ShareholderRankingTests(unittest.TestCase):
+    def setUp(self):
+        self.a = fake_player("A", 10000, 0)
+        self.b = fake_player("B", 10000, 1)
+        self.c = fake_player("C", 10000, 2)
+        self.company = fake_public_company("ABC")
+        self.company.setInitialPrice(100)
+
+    def test_ranking_follows_trades(self):
+        ranking = self.company._ranking
+        self.company.buy(self.a, StockPurchaseSource.IPO, STOCK_PRESIDENT_CERTIFICATE)
+        self.company.buy(self.b, StockPurchaseSource.IPO, STOCK_CERTIFICATE)
+        self.company.buy(self.c, StockPurchaseSource.IPO, STOCK_CERTIFICATE)
+        self.assertEqual(ranking.levels, [10, 20])
+        self.assertEqual(ranking.leaders(), [self.a])
+        self.assertEqual(ranking.holders[10], {self.b: None, self.c: None})
+
+        self.company.buy(self.b, StockPurchaseSource.IPO, STOCK_CERTIFICATE)
+        self.assertEqual(ranking.leaders(), [self.a, self.b])
+        self.assertEqual(self.company.potentialPresidents(), {self.a, self.b})
+        self.company.sell(self.c, STOCK_CERTIFICATE)
+        self.assertEqual(ranking.levels, [20])
+        self.assertNotIn(self.c, ranking.holding)
+
+    def test_can_dump_presidency(self):
+        self.company.setPresident(self.a)
+        self.company.buy(self.a, StockPurchaseSource.IPO, 30)
+        self.company.buy(self.b, StockPurchaseSource.IPO, STOCK_CERTIFICATE)
+        self.assertFalse(self.company.canDumpPresidency(self.a))
+        self.assertTrue(self.company.canDumpPresidency(self.b))  # A could take over
+        self.company.buy(self.b, StockPurchaseSource.IPO, STOCK_CERTIFICATE)
+        self.assertTrue(self.company.canDumpPresidency(self.a))
+        self.assertTrue(self.company.canDumpPresidency(self.b))
+        self.company.sell(self.a, 30)
+        self.company.checkPresident()
+        self.assertEqual(self.company.president, self.b)
+        self.assertFalse(self.company.canDumpPresidency(self.b))
+
+    def test_owners_assignment_and_ledger(self):
+        self.company.owners = {self.a: 30, self.b: 40}
+        self.company.checkPresident()
+        self.assertEqual(self.company.president, self.b)
+        ShareLedger.attach([self.a, self.b, self.c], [self.company])
+        self.company.buy(self.c, StockPurchaseSource.IPO, 50)
+        self.company.checkPresident()
+        self.assertEqual(self.company.president, self.c)
+        self.assertEqual(self.company.potentialPresidents(), {self.a, self.b, self.c})
+
+    def test_copy(self):
+        ranking = ShareholderRanking({self.a: 20, self.b: 10})
+        a = fake_player("A")
+        copied = ranking.copy(lambda player: a if player is self.a else player)
+        copied.move(self.b, 30)
+        self.assertIs(next(iter(copied.holders[20])), a)
+        self.assertEqual(ranking.leaders(), [self.a])
+        self.assertEqual(copied.leaders(), [self.b])
+
+
+if __name__ == "__main__":
+    unittest.main()
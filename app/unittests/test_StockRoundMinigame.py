@@ -7,8 +7,10 @@ import json
 import unittest
 
 from app.base import Move, PublicCompany, PrivateCompany, MutableGameState, StockPurchaseSource, STOCK_CERTIFICATE, \
-    STOCK_PRESIDENT_CERTIFICATE
-from app.minigames.StockRound.minigame_stockround import StockRound
+    STOCK_PRESIDENT_CERTIFICATE, StockMarket, Cell, Band
+from app.minigames.StockRound.const import VALID_IPO_PRICES
+from app.minigames.StockRound.minigame_stockround import StockRound, StockBuy
+from app.minigames.base import ValidationMode
 from app.minigames.StockRound.move import StockRoundMove
 from app.unittests.test_PrivateCompanyMinigame import fake_player
 
@@ -687,6 +689,177 @@ class StockRoundNoBuyAfterSellTests(unittest.TestCase):
         self.assertTrue(sr2.run(buy, state), sr2.errors())
 
 
+class StockRoundLegalMovesTests(unittest.TestCase):
+    def state(self) -> MutableGameState:
+        state = MutableGameState()
+        state.players = [fake_player("A"), fake_player("B"), fake_player("C")]
+        state.public_companies = [fake_public_company(name) for name in ["ABC", "DEF", "GHI", "JKL", "MNO"]]
+        state.stock_round_count = 2
+        state.sales = [{}, {}, {}]
+        state.purchases = [{}, {}, {}]
+        a, b, c = state.players
+        abc, def_, ghi, jkl, mno = state.public_companies
+
+        abc.setInitialPrice(90)
+        abc.buy(a, StockPurchaseSource.IPO, 40)  # Sole potential president
+        abc.buy(b, StockPurchaseSource.IPO, 10)
+        abc.stocks[StockPurchaseSource.BANK] = 30
+        def_.setInitialPrice(67)
+        def_.buy(a, StockPurchaseSource.IPO, 30)
+        def_.buy(b, StockPurchaseSource.IPO, 30)
+        ghi.setInitialPrice(76)
+        ghi.buy(a, StockPurchaseSource.IPO, 20)
+        ghi.buy(c, StockPurchaseSource.IPO, 20)
+        state.purchases[2][a] = [ghi]
+        jkl.setInitialPrice(82)
+        jkl.buy(b, StockPurchaseSource.IPO, 20)
+        a.sold_this_round.add(jkl)
+        a.cash = 600
+        return state
+
+    def move(self, message: dict) -> StockRoundMove:
+        return StockRoundMove.fromMove(Move.fromMessage(json.dumps(message)))
+
+    def legal_by_validation(self, state: MutableGameState, player_id: str):
+        minigame = StockRound()
+        buys = set()
+        for company in state.public_companies:
+            for source in StockPurchaseSource:
+                for ipo_price in [0] + VALID_IPO_PRICES:
+                    move = self.move({"move_type": "BUY", "player_id": player_id, "public_company_id": company.id,
+                                      "source": source.name, "ipo_price": ipo_price})
+                    move.backfill(state)
+                    first = minigame.isFirstPurchase(move)
+                    if first == (ipo_price == 0):
+                        continue
+                    if minigame.validateBuy(move, state) and (not first or minigame.validateFirstPurchase(move)):
+                        buys.add(StockBuy(company, source, ipo_price))
+        sales = {}
+        player = state.findPlayer(player_id)
+        for company in state.public_companies:
+            amounts = [amount for amount in range(STOCK_CERTIFICATE, 70, STOCK_CERTIFICATE)
+                       if minigame._validateSale(player, company, amount, state)]
+            if amounts:
+                sales[company] = amounts
+        return buys, sales
+
+    def test_matches_validation(self):
+        for player_id in "ABC":
+            state = self.state()
+            options = StockRound().legalMoves(state.findPlayer(player_id), state)
+            buys, sales = self.legal_by_validation(state, player_id)
+            self.assertEqual(set(options.buys), buys, player_id)
+            self.assertEqual(len(options.buys), len(buys))
+            self.assertEqual(options.sales, sales, player_id)
+
+    def test_expected_options(self):
+        state = self.state()
+        a = state.findPlayer("A")
+        options = StockRound().legalMoves(a, state)
+        abc, def_, ghi, jkl, mno = state.public_companies
+        self.assertEqual(options.sales, {abc: [10, 20], def_: [10, 20, 30]})
+        companies = {buy.company for buy in options.buys}
+        self.assertNotIn(jkl, companies)  # Sold this round
+        self.assertEqual([buy.ipo_price for buy in options.buys if buy.company is mno], VALID_IPO_PRICES)
+
+        a.cash = 150
+        options = StockRound().legalMoves(a, state)
+        self.assertEqual([buy.ipo_price for buy in options.buys if buy.company is mno], [71, 67])
+
+    def test_messages_are_accepted(self):
+        for message in StockRound().legalMoves(self.state().findPlayer("A"), self.state()).messages("A"):
+            state = self.state()
+            minigame = StockRound()
+            self.assertTrue(minigame.run(self.move(message), state), (message, minigame.errors()))
+
+    def test_first_stock_round_has_no_sales(self):
+        state = self.state()
+        state.stock_round_count = 1
+        self.assertEqual(StockRound().legalMoves(state.findPlayer("A"), state).sales, {})
+
+
+class StockRoundSalePlanTests(unittest.TestCase):
+    def state(self) -> MutableGameState:
+        state = MutableGameState()
+        state.players = [fake_player("A", order=0), fake_player("B", order=1)]
+        state.public_companies = [fake_public_company(name) for name in ["ABC", "DEF", "GHI"]]
+        state.stock_round_count = 2
+        state.sales = [{}, {}, {}]
+        state.purchases = [{}, {}, {}]
+        a, b = state.players
+        abc, def_, ghi = state.public_companies
+
+        # Prices drop by 5 per row down the market
+        grid = [[Cell(10 * (c + 1) + 5 * (4 - r), Band.WHITE, None) for c in range(12)] for r in range(5)]
+        abc.attach_market(StockMarket(grid), 1, 6)
+        abc.setPresident(a)
+        abc.buy(a, StockPurchaseSource.IPO, 40)
+        abc.buy(b, StockPurchaseSource.IPO, 10)
+        def_.setInitialPrice(67)
+        def_.setPresident(a)
+        def_.buy(a, StockPurchaseSource.IPO, 30)
+        def_.buy(b, StockPurchaseSource.IPO, 30)
+        ghi.setInitialPrice(76)
+        ghi.buy(a, StockPurchaseSource.IPO, 20)
+        state.purchases[2][a] = [ghi]
+        a.cash = 100
+        return state
+
+    def test_preview_matches_the_sale(self):
+        state = self.state()
+        a, b = state.players
+        abc, def_, ghi = state.public_companies
+        minigame = StockRound()
+        plan = minigame.evaluateSales(a, [(abc, 20), (def_, 20)], state)
+        self.assertTrue(plan.valid, [str(e) for e in plan.errors])
+        self.assertEqual(plan.proceeds, 2 * 85 + 2 * 67)  # At the prices before the sale
+        self.assertEqual([o.stock_pos for o in plan.outcomes], [(3, 6), (0, 0)])
+        self.assertEqual([o.price for o in plan.outcomes], [75, 47])
+        self.assertEqual([o.bank_pool for o in plan.outcomes], [20, 20])
+        self.assertEqual([o.president for o in plan.outcomes], [a, b])
+
+        # Nothing changed
+        self.assertEqual((a.cash, a.hasStock(abc), abc.stock_pos, def_.president), (100, 40, (1, 6), a))
+
+        move = StockRoundMove.fromMove(Move.fromMessage(json.dumps({
+            "player_id": "A", "move_type": "SELL", "for_sale_raw": [["ABC", 20], ["DEF", 20]]})))
+        self.assertTrue(minigame.run(move, state), minigame.errors())
+        self.assertEqual(a.cash, 100)  # Selling doesn't pay the seller
+        self.assertEqual(abc.stock_pos, plan.outcomes[0].stock_pos)
+        self.assertEqual(def_.stockPrice[StockPurchaseSource.BANK], plan.outcomes[1].price)
+        self.assertEqual(def_.president, b)
+        self.assertEqual(def_.availableStock(StockPurchaseSource.BANK), plan.outcomes[1].bank_pool)
+
+    def test_company_listed_twice(self):
+        state = self.state()
+        a, b = state.players
+        def_ = state.public_companies[1]
+        minigame = StockRound()
+        plan = minigame.evaluateSales(a, [(def_, 10), (def_, 10)], state)
+        self.assertEqual([(o.amount, o.price, o.president) for o in plan.outcomes], [(20, 47, b)])
+
+        move = StockRoundMove.fromMove(Move.fromMessage(json.dumps({
+            "player_id": "A", "move_type": "SELL", "for_sale_raw": [["DEF", 10], ["DEF", 10]]})))
+        self.assertTrue(minigame.run(move, state), minigame.errors())
+        self.assertEqual(def_.stockPrice[StockPurchaseSource.BANK], plan.outcomes[0].price)
+        self.assertEqual(def_.president, b)
+
+    def test_errors(self):
+        state = self.state()
+        a = state.players[0]
+        abc, def_, ghi = state.public_companies
+        minigame = StockRound()
+        # ABC three times adds up to dumping the presidency on nobody; GHI was bought this round, and has nobody
+        # to dump on either
+        plan = minigame.evaluateSales(a, [(abc, 10), (ghi, 10), (abc, 10), (abc, 10)], state)
+        self.assertFalse(plan.valid)
+        self.assertEqual(len(plan.errors), 3)
+        minigame.validation_mode = ValidationMode.FIRST_FAILURE
+        plan = minigame.evaluateSales(a, [(abc, 30), (ghi, 10)], state)
+        self.assertEqual(len(plan.errors), 1)
+        self.assertEqual(minigame.error_list, [])
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,118 @@
+import importlib
+import unittest
+
+from app.base import GameBoard, MutableGameState, Tile, Token, Color
+from app.config import load_config
+from app.minigames.operating_round import OperatingRound, OperatingRoundMove
+from app.tiles import STANDARD_TILES, TileManifest, manifest_for, rotate_edges
+from app.unittests.test_OperatingRoundMinigame import fake_company, fake_player
+
+
+class TileManifestTests(unittest.TestCase):
+    def setUp(self):
+        self.manifest = TileManifest(STANDARD_TILES.values(), {"9": 1, "57": 2, "14": 1})
+
+    def test_edge_masks(self):
+        self.assertEqual(self.manifest.edgeMask("9", 0), 0b001001)
+        self.assertEqual(self.manifest.edgeMask("9", 1), 0b010010)
+        self.assertEqual(self.manifest.edgeMask("7", 5), 0b100001)
+        self.assertEqual(rotate_edges(0b100001, 1), 0b000011)
+
+    def test_upgrades_keep_connections(self):
+        self.assertIn("14", self.manifest.upgrades["57"])
+        self.assertIn("15", self.manifest.upgrades["57"])
+        self.assertNotIn("16", self.manifest.upgrades["57"])  # A city stays a city
+        self.assertNotIn("63", self.manifest.upgrades["57"])  # Colours can't be skipped
+        self.assertTrue(self.manifest.canUpgrade("57", 0, "14", 0))
+        self.assertFalse(self.manifest.canUpgrade("57", 0, "14", 1))
+        self.assertTrue(self.manifest.canUpgrade("57", 1, "14", 4))  # Same relative turn as 0 -> 3
+        upgrades = self.manifest.upgradesFor("9", 1)
+        self.assertIn(("20", 1), upgrades)
+        self.assertIn(("20", 4), upgrades)
+        self.assertNotIn(("20", 2), upgrades)
+        self.assertFalse(any(tile_id in ("16", "25", "28", "29") for tile_id, _ in upgrades))  # None has a straight
+
+    def test_remaining(self):
+        board = GameBoard()
+        board.setTrack(Tile("57", "57", Color.YELLOW, "A1", 0))
+        self.assertEqual(self.manifest.remaining("57", board.placed("57")), 1)
+        board.setTrack(Tile("14", "14", Color.GREEN, "A1", 0))
+        self.assertEqual(self.manifest.remaining("57", board.placed("57")), 2)
+        self.assertEqual(self.manifest.remaining("14", board.fork().placed("14")), 0)
+
+    def test_variant_manifests(self):
+        for variant in ("1830", "1846", "1889"):
+            manifest = manifest_for(load_config(variant))
+            self.assertIn("57", manifest)
+            self.assertTrue(manifest.upgradesFor("57"))
+        self.assertTrue(manifest_for(load_config("1830")).complete)
+        self.assertFalse(manifest_for(load_config("1846")).complete)
+
+    def test_labelled_and_town_tiles(self):
+        manifest = manifest_for(load_config("1830"))
+        self.assertEqual(set(manifest.upgrades["59"]), {"64", "65", "66", "67", "68"})
+        self.assertTrue(manifest.canUpgrade("59", 0, "64", 0))
+        self.assertFalse(manifest.canUpgrade("59", 0, "64", 1))  # Must keep both stubs
+        self.assertEqual(set(manifest.upgrades["54"]), {"62"})
+        self.assertNotIn("14", manifest.upgrades["54"])
+        self.assertEqual(manifest.upgrades["58"], {})  # 1830 towns don't upgrade
+
+
+class TrackPlacementManifestTests(unittest.TestCase):
+    def setUp(self):
+        self.config = importlib.reload(load_config("1830"))
+        self.board = GameBoard.forVariant(self.config)
+        self.state = MutableGameState()
+        self.state.players = [fake_player("A")]
+        self.company = fake_company("A")
+        self.state.public_companies = [self.company]
+        self.board.setToken(Token(self.company, "C9", 0))
+
+    def lay(self, tile: Tile) -> bool:
+        move = OperatingRoundMove()
+        move.player_id = "A"
+        move.construct_track = True
+        move.track = tile
+        move.public_company = self.company
+        OperatingRound.onStart(self.state)
+        return OperatingRound().run(move, self.state, board=self.board, config=self.config)
+
+    def test_track_must_face_the_network(self):
+        # C9 is west of C11 (edge 3)
+        self.assertFalse(self.lay(Tile("7", "7", Color.YELLOW, "C11", 0)))
+        self.assertTrue(self.lay(Tile("9", "9", Color.YELLOW, "C11", 0)))
+
+    def test_upgrade_rotation(self):
+        self.assertTrue(self.lay(Tile("57", "57", Color.YELLOW, "C9", 0)))
+        self.assertFalse(self.lay(Tile("14", "14", Color.GREEN, "C9", 1)))
+        self.assertFalse(self.lay(Tile("16", "16", Color.GREEN, "C9", 0)))
+        self.assertTrue(self.lay(Tile("14", "14", Color.GREEN, "C9", 3)))
+
+    def test_unknown_and_used_up_tiles(self):
+        self.assertFalse(self.lay(Tile("5", "5", Color.YELLOW, "C9", 0)))  # Not an 1830 tile
+        for location in ("C9", "C11", "C13", "C15"):
+            self.board.setTrack(Tile("57", "57", Color.YELLOW, location, 0))
+        self.board.setToken(Token(self.company, "C15", 0))
+        self.assertFalse(self.lay(Tile("57", "57", Color.YELLOW, "C17", 0)))
+        self.assertTrue(self.lay(Tile("9", "9", Color.YELLOW, "C17", 0)))
+
+    def test_hex_labels(self):
+        # New York starts with its preprinted yellow track, which the manifest doesn't list
+        self.board.setTrack(Tile("NY", "NY", Color.YELLOW, "G19", 0))
+        self.assertFalse(self.lay(Tile("14", "14", Color.GREEN, "G19", 0)))
+        self.assertTrue(self.lay(Tile("54", "54", Color.GREEN, "G19", 0)))
+        self.board.setToken(Token(self.company, "E11", 0))
+        self.assertFalse(self.lay(Tile("57", "57", Color.YELLOW, "E11", 0)))
+        self.assertTrue(self.lay(Tile("59", "59", Color.YELLOW, "E11", 0)))
+        self.assertFalse(self.lay(Tile("59", "59", Color.YELLOW, "C11", 0)))
+
+    def test_incomplete_manifest(self):
+        self.config = importlib.reload(load_config("1846"))
+        self.board = GameBoard.forVariant(self.config)
+        self.board.setToken(Token(self.company, "B2", 0))
+        self.assertTrue(self.lay(Tile("3", "3", Color.YELLOW, "B2", 0)))  # Not listed, so only the colour counts
+        self.assertFalse(self.lay(Tile("3", "3", Color.GREEN, "B4", 0)))
+
+
+if __name__ == "__main__":
+    unittest.main()
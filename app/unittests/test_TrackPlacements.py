@@ -0,0 +1,108 @@
+import importlib
+import unittest
+
+from app.base import GameBoard, MutableGameState, Tile, Token, Color
+from app.config import load_config
+from app.minigames.operating_round import OperatingRound, OperatingRoundMove
+from app.placements import TrackPlacement, TrackPlacements, legal_track_placements
+from app.tiles import STANDARD_TILES
+from app.unittests.test_OperatingRoundMinigame import fake_company
+
+
+class TrackPlacementsTests(unittest.TestCase):
+    def setUp(self):
+        self.config = importlib.reload(load_config("1830"))
+        self.board = GameBoard.forVariant(self.config)
+        self.state = MutableGameState()
+        self.company = fake_company("A")
+        self.other = fake_company("B")
+        self.state.public_companies = [self.company, self.other]
+        self.board.setTrack(Tile("57", "57", Color.YELLOW, "C9", 0))
+        self.board.setTrack(Tile("9", "9", Color.YELLOW, "C11", 0))
+        self.board.setToken(Token(self.company, "C9", 0))
+        self.board.setToken(Token(self.other, "F10", 0))
+
+    def accepted(self, placement: TrackPlacement, company) -> bool:
+        move = OperatingRoundMove()
+        move.board = self.board
+        move.config = self.config
+        move.public_company = company
+        move.track = placement.tile()
+        return OperatingRound().isValidTrackPlacement(move, self.state)
+
+    def assertMatchesValidator(self, placements, company):
+        legal = set(placements)
+        manifest = TrackPlacements(self.board, self.config).manifest
+        for location in self.board.grid.locations:
+            if location[0] not in "BCDEFG" or int(location[1:]) > 16:
+                continue
+            for tile_id, spec in manifest.specs.items():
+                for rotation in range(6):
+                    placement = TrackPlacement(location, tile_id, rotation, spec.color)
+                    self.assertEqual(placement in legal, self.accepted(placement, company), placement)
+
+    def test_matches_validator(self):
+        placements = TrackPlacements(self.board, self.config)
+        self.assertMatchesValidator(placements.legal(self.company, self.state), self.company)
+        self.assertMatchesValidator(placements.legal(self.other, self.state), self.other)
+
+    def test_new_track_faces_the_network(self):
+        legal = legal_track_placements(self.board, self.company, self.config)
+        # C13 is east of C11; a straight must run east-west to join it
+        self.assertIn(TrackPlacement("C13", "9", 0, Color.YELLOW), legal)
+        self.assertNotIn(TrackPlacement("C13", "9", 1, Color.YELLOW), legal)
+        self.assertNotIn(TrackPlacement("C15", "9", 0, Color.YELLOW), legal)
+        # F10 is a station with no tile: any rotation of any unlabelled yellow tile joins it
+        legal = legal_track_placements(self.board, self.other, self.config)
+        yellow = [spec for spec in STANDARD_TILES.values()
+                  if spec.color == Color.YELLOW and spec.label is None and spec.id in self.config.TILE_MANIFEST]
+        self.assertEqual(sum(p.location == "F10" for p in legal), len(yellow) * 6)
+
+    def test_hex_labels(self):
+        self.board.setToken(Token(self.company, "E11", 0))  # An OO hex
+        legal = legal_track_placements(self.board, self.company, self.config)
+        self.assertEqual({p.tile_id for p in legal if p.location == "E11"}, {"59"})
+        labels = self.config.HEX_LABELS
+        self.assertTrue(all((p.tile_id == "59") == (labels.get(p.location) == "OO") for p in legal))
+
+    def test_track_laid_and_special_rules(self):
+        self.state.track_laid.add(self.company.id)
+        legal = legal_track_placements(self.board, self.company, self.config, self.state)
+        self.assertEqual({p.location for p in legal}, {"C9", "C11"})
+        self.assertTrue(all(p.color == Color.GREEN for p in legal))
+
+        self.board.setToken(Token(self.company, "G15", 0))
+        self.assertFalse(any(p.location == "G15" for p in legal_track_placements(self.board, self.company,
+                                                                                  self.config)))
+
+    def test_incremental_updates(self):
+        placements = TrackPlacements(self.board, self.config)
+        before = placements.legal(self.company, self.state)
+        cached = dict(placements._lays[self.company.id][1])
+
+        self.board.setTrack(Tile("9", "9", Color.YELLOW, "C13", 0))
+        after = placements.legal(self.company, self.state)
+        self.assertNotEqual(set(before), set(after))
+        self.assertMatchesValidator(after, self.company)
+        hexes = placements._lays[self.company.id][1]
+        self.assertIs(hexes["B10"], cached["B10"])  # Not next to C13, so not worked out again
+        self.assertIsNot(hexes["B12"], cached["B12"])  # Now touches C13 as well
+
+        fork = self.board.fork()
+        forked = placements.fork(fork)
+        fork.setTrack(Tile("14", "14", Color.GREEN, "C9", 0))
+        self.assertNotEqual(set(forked.legal(self.company, self.state)), set(after))
+        self.assertEqual(set(placements.legal(self.company, self.state)), set(after))
+
+    def test_used_up_tiles(self):
+        for location in ("D2", "D4", "D6", "D8"):
+            self.board.setTrack(Tile("57", "57", Color.YELLOW, location, 0))
+        self.assertFalse(any(p.tile_id == "57" for p in legal_track_placements(self.board, self.company,
+                                                                                self.config)))
+
+    def test_no_manifest(self):
+        self.assertEqual(legal_track_placements(self.board, self.company, None), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from app.base import TradeLog
+from app.unittests.test_PrivateCompanyMinigame import fake_player
+from app.unittests.test_StockRoundMinigame import fake_public_company
+
+
+class TradeLogTests(unittest.TestCase):
+    def setUp(self):
+        self.a, self.b = fake_player("A"), fake_player("B")
+        self.abc, self.xyz = fake_public_company("ABC"), fake_public_company("XYZ")
+
+    def test_reads_like_a_list_of_dicts(self):
+        log = TradeLog([{}, {self.a: [self.abc]}])
+        self.assertEqual(len(log), 2)
+        self.assertEqual(log[1][self.a], [self.abc])
+        self.assertNotIn(self.a, log[0])
+        self.assertEqual(log[0].get(self.a, []), [])
+        log[1][self.a] = [self.abc, self.xyz]
+        log[-1][self.b] = [self.xyz]
+        self.assertEqual(dict(log[1]), {self.a: [self.abc, self.xyz], self.b: [self.xyz]})
+        with self.assertRaises(ValueError):
+            log[1][self.a] = [self.xyz]  # Trades can be added to, not changed
+
+    def test_contains(self):
+        log = TradeLog()
+        log.record(0, self.a, self.abc)
+        log.record(1, self.b, self.abc)
+        self.assertTrue(log.contains(0, self.a, self.abc))
+        self.assertFalse(log.contains(0, self.b, self.abc))
+        self.assertTrue(log.contains(1, self.b, self.abc))
+        self.assertFalse(log.contains(1, self.a, self.abc))
+        self.assertFalse(log.contains(1, self.a, self.xyz))
+        self.assertFalse(log.contains(5, self.a, self.abc))
+        with self.assertRaises(ValueError):
+            log.record(0, self.a, self.xyz)  # Only the latest round takes new trades
+        self.assertEqual(list(log.round), [0, 1])
+        self.assertEqual(log.trades(1), [(self.b, self.abc)])
+
+    def test_contains_any_round(self):
+        log = TradeLog([{self.a: [self.abc]}, {self.b: [self.xyz]}, {}])
+        log.record(3, self.a, self.xyz)
+        for round in range(len(log)):
+            for player in (self.a, self.b):
+                for company in (self.abc, self.xyz):
+                    self.assertEqual(log.contains(round, player, company), (player, company) in log.trades(round))
+        self.assertFalse(log.contains(-1, self.a, self.xyz))
+
+    def test_copy(self):
+        log = TradeLog([{self.a: [self.abc]}])
+        a, abc = fake_player("A"), fake_public_company("ABC")
+        copies = {id(self.a): a, id(self.abc): abc}
+        copied = log.copy(lambda entity: copies.get(id(entity), entity))
+        copied.record(0, self.b, self.abc)
+        self.assertIs(copied[0].log.players[0], a)
+        self.assertEqual(copied.trades(0), [(a, abc), (self.b, abc)])
+        self.assertFalse(log.contains(0, self.b, self.abc))
+
+
+if __name__ == "__main__":
+    unittest.main()
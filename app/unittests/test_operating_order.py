@@ -1,6 +1,7 @@
+import random
 import unittest
 
-from app.base import StockMarket, Cell, Band, Direction, MutableGameState, StockPurchaseSource
+from app.base import StockMarket, Cell, Band, Direction, MutableGameState, StockPurchaseSource, OperatingOrder
 from app.state import Game
 from app.unittests.test_StockRoundMinigame import fake_public_company
 from app.unittests.test_OperatingRoundMinigame import fake_player
@@ -39,6 +40,54 @@ class OperatingOrderAndDividendTests(unittest.TestCase):
         self.assertEqual(game.sort_operating_order(), ["BO", "PRR"])
         self.assertEqual(game.sort_operating_order(), ["BO", "PRR"])
 
+    def test_order_follows_marker_moves(self):
+        companies = [fake_public_company(str(i)) for i in range(8)]
+        for i, company in enumerate(companies):
+            company.attach_market(self.market, i % 5, 5)
+            company._floated = True
+        game = self.make_game(companies)
+        previous = game.sort_operating_order()
+        rng = random.Random(3)
+        directions = [Direction.LEFT, Direction.RIGHT, Direction.UP, Direction.DOWN]
+        for _ in range(20):
+            for company in rng.sample(companies, 3):
+                self.market.move_marker(company, rng.choice(directions))
+            expected = sorted(companies, key=lambda c: (-self.market.cell(*c.stock_pos).price, c.stock_pos[0],
+                                                        previous.index(c.id)))
+            previous = game.sort_operating_order()
+            self.assertEqual(previous, [c.id for c in expected])
+
+    def test_float_and_bankruptcy(self):
+        bo, prr, nyc = (fake_public_company(name) for name in ("BO", "PRR", "NYC"))
+        for company, col in ((bo, 3), (prr, 5), (nyc, 4)):
+            company.attach_market(self.market, 2, col)
+        bo._floated = prr._floated = True
+        game = self.make_game([bo, prr, nyc])
+        self.assertEqual(game.sort_operating_order(), ["PRR", "BO"])
+
+        order = game.operatingOrder()
+        nyc.stocks[StockPurchaseSource.IPO] = 40
+        nyc.checkFloated()
+        self.assertEqual(order.after("PRR").id, "NYC")
+        prr.bankrupt = True
+        self.assertIsNone(order.position("PRR"))
+        self.assertEqual(game.sort_operating_order(), ["NYC", "BO"])
+
+    def test_fork_keeps_its_own_order(self):
+        bo, prr = fake_public_company("BO"), fake_public_company("PRR")
+        bo.attach_market(self.market, 2, 3)
+        prr.attach_market(self.market, 2, 5)
+        bo._floated = prr._floated = True
+        game = self.make_game([bo, prr])
+        game.sort_operating_order()
+        fork = game.fork()
+        forked_bo = fork.state.public_companies[0]
+        self.market.move_marker(forked_bo, Direction.RIGHT, 3)
+        self.assertEqual(fork.sort_operating_order(), ["BO", "PRR"])
+        self.assertEqual(game.sort_operating_order(), ["PRR", "BO"])
+        self.assertIsInstance(forked_bo._operating_order, OperatingOrder)
+        self.assertIsNot(forked_bo._operating_order, bo._operating_order)
+
     def test_pay_right_edge_ignored(self):
         corp = fake_public_company("NYC")
         corp.attach_market(self.market, 2, self.market.max_col())
@@ -1,6 +1,8 @@
+import importlib
 import unittest
 
-from app.base import StockMarket, Cell, Band, Direction
+from app.base import StockMarket, Cell, Band, Direction, MarketEvent, MarketProjection, \
+    StockPurchaseSource
 from app.unittests.test_StockRoundMinigame import fake_public_company
 
 
@@ -51,6 +53,69 @@ class StockMarketMovementTests(unittest.TestCase):
         self.market.on_withhold(company)
         self.assertEqual(company.stock_pos, (2, 0))
 
+    def test_tables_match_stepping(self):
+        market = importlib.import_module("app.config.1830").STOCK_MARKET
+
+        def walk(row, col, direction, steps):
+            for _ in range(steps):
+                nr, nc = market.next_coord(row, col, direction)
+                if not market.in_bounds(nr, nc):
+                    break
+                row, col = nr, nc
+            return row, col
+
+        for row, col in market.coords:
+            cell = market.cell(row, col)
+            if cell.arrow:
+                payout = walk(row, col, cell.arrow, 1)
+            elif cell.band == Band.YELLOW:
+                payout = row, col
+            else:
+                payout = walk(row, col, Direction.UP_RIGHT if cell.band == Band.BROWN else Direction.RIGHT, 1)
+            withhold = walk(row, col, Direction.DOWN_LEFT if cell.arrow == Direction.DOWN_LEFT else Direction.LEFT, 1)
+            self.assertEqual(market.destination(row, col, MarketEvent.PAYOUT), payout)
+            self.assertEqual(market.destination(row, col, MarketEvent.WITHHOLD), withhold)
+            self.assertEqual(market.destination(row, col, MarketEvent.SOLD_OUT), walk(row, col, Direction.UP, 1))
+            for shares in range(8):
+                self.assertEqual(market.destination(row, col, MarketEvent.SALE, shares),
+                                 walk(row, col, Direction.DOWN, shares))
+            for direction in Direction:
+                self.assertEqual(market.coords[market.walk(direction, 3)[market.index(row, col)]],
+                                 walk(row, col, direction, 3))
+
+    def test_apply_many(self):
+        companies = [fake_public_company(str(i)) for i in range(4)]
+        starts = [(1, 1), (2, 2), (3, 5), (0, 11)]
+        events = [(MarketEvent.PAYOUT, 0), (MarketEvent.WITHHOLD, 0), (MarketEvent.SALE, 2), (MarketEvent.PAYOUT, 0)]
+        for company, start in zip(companies, starts):
+            company.attach_market(self.market, *start)
+        self.market.applyMany([(company, event, shares) for company, (event, shares) in zip(companies, events)])
+        self.assertEqual([company.stock_pos for company in companies], [(0, 2), (2, 1), (4, 5), (0, 11)])
+        self.assertEqual(companies[2].stockPrice, {source: 60 for source in companies[2].stockPrice})
+
+
+    def test_projection(self):
+        company = fake_public_company("PRR")
+        company.attach_market(self.market, 3, 5)
+        events = [MarketEvent.PAYOUT, MarketEvent.PAYOUT, MarketEvent.WITHHOLD, (MarketEvent.SALE, 3)]
+        projection = company.projectPrice(events)
+        self.assertEqual(company.stock_pos, (3, 5))  # Unmoved
+
+        self.market.applyMany([(company, MarketEvent.PAYOUT, 0)])
+        self.market.on_payout(company)
+        self.market.on_withhold(company)
+        self.market.on_sale(company, 30)
+        self.assertEqual(projection, MarketProjection(company.stock_pos, company.stockPrice[StockPurchaseSource.BANK]))
+
+    def test_project_many(self):
+        sequences = [[], [MarketEvent.PAYOUT] * 3, [MarketEvent.WITHHOLD, (MarketEvent.SALE, 2)],
+                     [MarketEvent.SOLD_OUT]]
+        starts = [(2, 2), (1, 1), (0, 0), (4, 11)]
+        projections = self.market.projectMany(starts, sequences)
+        self.assertEqual(projections, [self.market.project(*start, events) for start, events in zip(starts, sequences)])
+        self.assertEqual(projections[0], MarketProjection((2, 2), 30))
+        self.assertEqual(projections[2].stock_pos, (2, 0))
+        self.assertEqual(projections[3].stock_pos, (3, 11))
 
 if __name__ == "__main__":
     unittest.main()